@@ -2,12 +2,12 @@ from loguru import logger
 from sqlalchemy import delete, exc, func, insert, select, update
 
 from app.address.exceptions import MaximumAddressLimitReachedError
-from app.address.models import AddressCreateModel
+from app.address.models import AddressCreateModel, AddressResponseModel
 from app.address.schema import Address
 from app.config import MAXIMUM_ADDRESS_CREATION_LIMIT_PER_USER
 from app.database import DatabaseManager
 from app.exceptions import EntityNotFoundError
-from app.repository import BaseRepository
+from app.repository import BaseRepository, Page
 
 
 class AddressRepository(BaseRepository):
@@ -15,7 +15,7 @@ class AddressRepository(BaseRepository):
         self.db = DatabaseManager._instance
 
     async def address_limit_reached(self, user_id: int):
-        async with self.db.engine.begin() as connection:
+        async with self.db.begin() as connection:
             try:
                 q = select(func.count(Address.id)).where(
                     Address.user_id == user_id
@@ -32,7 +32,7 @@ class AddressRepository(BaseRepository):
                 raise e
 
     async def create(self, user_id: int, address: AddressCreateModel) -> int:
-        async with self.db.engine.begin() as connection:
+        async with self.db.begin() as connection:
             try:
                 if await self.address_limit_reached(user_id):
                     raise MaximumAddressLimitReachedError()
@@ -61,7 +61,7 @@ class AddressRepository(BaseRepository):
                 raise e
 
     async def get(self, user_id: int, address_id: int) -> dict:
-        async with self.db.engine.begin() as connection:
+        async with self.db.begin() as connection:
             try:
                 q = (
                     select(Address)
@@ -86,20 +86,28 @@ class AddressRepository(BaseRepository):
         address_id: int | None = None,
         page: int = 1,
         page_size: int = 10,
-    ):
+        cursor: str | None = None,
+        with_total: bool = True,
+    ) -> Page:
         try:
             query = select(Address).where(Address.user_id == user_id)
             if address_id is not None:
                 query = query.where(Address.id == address_id)
 
-            items, total = await self.get_paginated(query, page, page_size)
-            return {
-                "items": items,
-                "total": total,
-                "page": page,
-                "page_size": page_size,
-                "total_pages": (total + page_size - 1) // page_size,
-            }
+            result = await self.get_paginated(
+                query,
+                page,
+                page_size,
+                cursor=cursor,
+                keys=[Address.id],
+                with_total=with_total,
+            )
+            return result._replace(
+                items=[
+                    AddressResponseModel.model_construct(**item)
+                    for item in result.items
+                ]
+            )
         except Exception as e:
             logger.error(f"Error getting addresses: {e}")
             raise e
@@ -107,7 +115,7 @@ class AddressRepository(BaseRepository):
     async def update(
         self, user_id: int, address_id: int, address: AddressCreateModel
     ):
-        async with self.db.engine.begin() as connection:
+        async with self.db.begin() as connection:
             try:
                 q = (
                     select(Address)
@@ -141,7 +149,7 @@ class AddressRepository(BaseRepository):
                 raise e
 
     async def delete(self, user_id: int, address_id: int):
-        async with self.db.engine.begin() as connection:
+        async with self.db.begin() as connection:
             try:
                 q = (
                     select(Address)
@@ -13,7 +13,12 @@ from app.address.exceptions import MaximumAddressLimitReachedError
 from app.address.models import AddressCreateModel, AddressResponseModel
 from app.address.repository import AddressRepository
 from app.exceptions import EntityNotFoundError
-from app.models import PaginatedResponse, PaginationParams
+from app.models import (
+    PaginatedResponse,
+    PaginationParams,
+    RawJSONResponse,
+    encode_page,
+)
 from app.permissions.utils import allowed_permissions
 from app.users.utils import get_current_user_id
 
@@ -73,16 +78,17 @@ async def get_all_address(
             address_id=address_id,
             page=pagination.page,
             page_size=pagination.page_size,
+            cursor=pagination.cursor,
+            with_total=pagination.with_total,
         )
 
-        return PaginatedResponse(
-            items=[
-                AddressResponseModel(**address) for address in result["items"]
-            ],
-            total=result["total"],
-            page=result["page"],
-            page_size=result["page_size"],
-            total_pages=result["total_pages"],
+        return RawJSONResponse(
+            encode_page(
+                PaginatedResponse[AddressResponseModel],
+                result,
+                pagination.page,
+                pagination.page_size,
+            )
         )
     except Exception as e:
         logger.exception(f"While reading all addresses: {e}")
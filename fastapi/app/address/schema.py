@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Integer, String
+from sqlalchemy import Column, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 from app.config import Base
@@ -6,6 +6,10 @@ from app.config import Base
 
 class Address(Base):
     __tablename__ = "addresses"
+    __table_args__ = (
+        # Addresses are always listed per user
+        Index("ix_addresses_user_id", "user_id"),
+    )
 
     id: int = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -0,0 +1,103 @@
+"""Run the micro-benchmarks, or compare two of their results.
+
+    python -m app.benchmarks run [--filter TEXT] [--output PATH]
+    python -m app.benchmarks compare BASE.json NEW.json [--threshold 0.1]
+
+``run`` applies the migrations and seeds the database named by the
+``DB_*`` settings, point them at a disposable database. Results are
+saved to ``.benchmarks/<commit>.json`` by default.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+import app.main  # noqa: F401, registers every model on Base.metadata
+from app.benchmarks import cases, runner
+from app.database import DatabaseManager
+from app.migrations import runner as migrations
+from app.seeding.runner import run_seeders
+
+
+async def run(arguments: argparse.Namespace) -> int:
+    database_manager = DatabaseManager()
+    await database_manager.connect()
+    try:
+        await migrations.upgrade()
+        await run_seeders()
+        context = await cases.setup()
+
+        results = {**runner.machine_info(), "benchmarks": {}}
+        for benchmark in runner.BENCHMARKS:
+            name = f"{benchmark.group}: {benchmark.name}"
+            if arguments.filter and arguments.filter not in name:
+                continue
+
+            stats = await runner.measure(
+                lambda: benchmark.func(context),
+                rounds=arguments.rounds,
+                warmup=arguments.warmup,
+                min_time=arguments.min_time,
+            )
+            results["benchmarks"][name] = {
+                "group": benchmark.group,
+                "stats": stats,
+            }
+            print(
+                f"{name:<60} median {stats['median'] * 1000:>9.3f} ms "
+                f"p95 {stats['p95'] * 1000:>9.3f} ms {stats['ops']:>9.1f} ops"
+            )
+    finally:
+        await database_manager.disconnect()
+
+    output = arguments.output or os.path.join(
+        ".benchmarks", f"{results['commit'] or 'unknown'}.json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    runner.save(results, output)
+    print(f"Saved results to {output}")
+    return 0
+
+
+def compare(arguments: argparse.Namespace) -> int:
+    rows = runner.compare(
+        runner.load(arguments.base),
+        runner.load(arguments.new),
+        threshold=arguments.threshold,
+    )
+    for row in rows:
+        print(
+            f"{row['name']:<60} {row['before'] * 1000:>9.3f} ms -> "
+            f"{row['after'] * 1000:>9.3f} ms {row['change']:>+8.1%} "
+            f"{row['status']}"
+        )
+    return 1 if any(row["status"] == "regression" for row in rows) else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m app.benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("--filter", help="only names containing this")
+    run_parser.add_argument("--rounds", type=int, default=50)
+    run_parser.add_argument("--warmup", type=int, default=5)
+    run_parser.add_argument(
+        "--min-time", type=float, default=0.5, help="seconds per benchmark"
+    )
+    run_parser.add_argument("--output", help="path of the results file")
+
+    compare_parser = commands.add_parser(
+        "compare", help="compare the medians of two results"
+    )
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument(
+        "--threshold", type=float, default=runner.REGRESSION_THRESHOLD
+    )
+
+    arguments = parser.parse_args()
+    if arguments.command == "run":
+        sys.exit(asyncio.run(run(arguments)))
+    sys.exit(compare(arguments))
@@ -0,0 +1,231 @@
+"""Benchmarks of the authorization and repository hot paths.
+
+Every benchmark is an async function of the context built by ``setup``,
+registered under the group of the code path it times.
+"""
+
+import time
+from datetime import timedelta
+
+from sqlalchemy import func, select
+from starlette.requests import Request
+
+from app.benchmarks.runner import benchmark
+from app.cart.models import (
+    AddItemsToCartRequestModel,
+    CartItemRequestModel,
+    CreateCartRequestModel,
+)
+from app.cart.repository import CartRepository
+from app.database import DatabaseManager
+from app.loadtest.generator import DataGenerator
+from app.permissions.cache import permission_cache
+from app.permissions.utils import allowed_permissions, create_permission_claims
+from app.products.repository import ProductRepository
+from app.products.schema import Product
+from app.repository import BaseRepository
+from app.subcategories.schema import product_subcategory_association
+from app.users.schema import User
+from app.users.token import OAuth2TokenExtractor, TokenDecoder, TokenManager
+from app.users.utils import create_access_token, token_manager
+
+# Products loaded by ``setup`` when the database has fewer
+MIN_PRODUCTS = 5_000
+
+CART_ITEMS = 10
+
+
+async def setup(min_products: int = MIN_PRODUCTS) -> dict:
+    """Make sure there is data to query and return what benchmarks use.
+
+    Loads generated rows into an emptier database, and gives the seeded
+    customer a fresh cart with items.
+    """
+    db_instance = DatabaseManager._instance
+    async with db_instance.engine.connect() as connection:
+        products = await connection.scalar(
+            select(func.count()).select_from(Product)
+        )
+    if products < min_products:
+        await DataGenerator(
+            users=500,
+            products=min_products - products,
+            carts=1_000,
+            prefix=f"bench_{int(time.time())}",
+        ).run()
+
+    async with db_instance.engine.connect() as connection:
+        customer = (
+            await connection.execute(
+                select(User.id, User.role_id).where(
+                    User.username == "customer"
+                )
+            )
+        ).one()
+        product = (
+            await connection.execute(
+                select(Product).where(Product.is_active).limit(1)
+            )
+        ).one()
+        product_ids = (
+            await connection.scalars(
+                select(Product.id).order_by(Product.id).limit(CART_ITEMS)
+            )
+        ).all()
+        sub_category_id = await connection.scalar(
+            select(product_subcategory_association.c.sub_category_id).limit(1)
+        )
+
+    cart_repository = CartRepository()
+    cart_id = await cart_repository.create(
+        customer.id, CreateCartRequestModel(name="Benchmark")
+    )
+    await cart_repository.add_items(
+        customer.id,
+        AddItemsToCartRequestModel(
+            cart_id=cart_id,
+            items=[
+                CartItemRequestModel(product_id=id, quantity=1)
+                for id in product_ids
+            ],
+        ),
+    )
+
+    claims = {"user_id": customer.id}
+    permission_claims = await create_permission_claims(customer.role_id)
+    token = create_access_token(data=claims, expires_delta=timedelta(days=1))
+    return {
+        "user_id": customer.id,
+        "claims": claims,
+        "embedded_claims": {**claims, **permission_claims},
+        "token": token,
+        "cart_id": cart_id,
+        "product": product,
+        "sub_category_id": sub_category_id,
+    }
+
+
+def _request(token: str, cookie: bool = False) -> Request:
+    if cookie:
+        header = (b"cookie", f"access_token=Bearer {token}".encode())
+    else:
+        header = (b"authorization", f"Bearer {token}".encode())
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/",
+            "query_string": b"",
+            "headers": [header],
+        }
+    )
+
+
+# Authorization
+
+_read_cart = allowed_permissions(["read_cart"])
+
+
+@benchmark("allowed_permissions", "embedded claims")
+async def allowed_permissions_embedded(context):
+    await _read_cart(claims=dict(context["embedded_claims"]))
+
+
+@benchmark("allowed_permissions", "cached role")
+async def allowed_permissions_cached(context):
+    await _read_cart(claims=dict(context["claims"]))
+
+
+@benchmark("allowed_permissions", "cold cache")
+async def allowed_permissions_cold(context):
+    permission_cache.invalidate_all()
+    await _read_cart(claims=dict(context["claims"]))
+
+
+# Token decoding
+
+_uncached_token_manager = TokenManager(
+    [OAuth2TokenExtractor(TokenDecoder(ttl=0))]
+)
+
+
+@benchmark("TokenManager.get_user_id", "bearer")
+async def get_user_id_bearer(context):
+    await token_manager.get_user_id(_request(context["token"]))
+
+
+@benchmark("TokenManager.get_user_id", "cookie")
+async def get_user_id_cookie(context):
+    await token_manager.get_user_id(_request(context["token"], cookie=True))
+
+
+@benchmark("TokenManager.get_user_id", "uncached decode")
+async def get_user_id_uncached(context):
+    await _uncached_token_manager.get_user_id(_request(context["token"]))
+
+
+# Product listings, one benchmark per filter
+
+PRODUCT_FILTERS = {
+    "no filter": lambda p, c: {},
+    "id": lambda p, c: {"id": p.id},
+    "name": lambda p, c: {"name": p.name.split()[0]},
+    "slug": lambda p, c: {"slug": p.slug},
+    "price range": lambda p, c: {"min_price": 100, "max_price": 5_000},
+    "discount range": lambda p, c: {"min_discount": 1, "max_discount": 50},
+    "tax range": lambda p, c: {"min_tax": 1, "max_tax": 50},
+    "stock range": lambda p, c: {"min_stock": 10, "max_stock": 500},
+    "category_id": lambda p, c: {"category_id": p.category_id},
+    "sub_category_id": lambda p, c: {"sub_category_id": c["sub_category_id"]},
+    "is_active": lambda p, c: {"is_active": True},
+    "q": lambda p, c: {"q": p.name.split()[0]},
+    "tags any": lambda p, c: {"tags": p.tags, "tags_match": "any"},
+    "tags all": lambda p, c: {"tags": p.tags, "tags_match": "all"},
+    "sort by price": lambda p, c: {"sort_by": "price", "sort_order": "desc"},
+}
+
+
+def _product_benchmark(make_filters):
+    async def get_products(context):
+        filters = make_filters(context["product"], context)
+        await ProductRepository().get_products(filters, page_size=20)
+
+    return get_products
+
+
+for _name, _make_filters in PRODUCT_FILTERS.items():
+    benchmark("ProductRepository.get_products", _name)(
+        _product_benchmark(_make_filters)
+    )
+
+
+# Carts
+
+
+@benchmark("CartRepository.get_all", "with items")
+async def cart_get_all_items(context):
+    await CartRepository().get_all(context["user_id"], get_items=True)
+
+
+@benchmark("CartRepository.get_all", "without items")
+async def cart_get_all(context):
+    await CartRepository().get_all(context["user_id"], get_items=False)
+
+
+# Offset pagination, deeper pages skip more rows
+
+
+def _paginated_benchmark(page: int):
+    async def get_paginated(context):
+        repository = BaseRepository(DatabaseManager._instance)
+        await repository.get_paginated(
+            select(Product), page=page, page_size=20, keys=[Product.id]
+        )
+
+    return get_paginated
+
+
+for _page in (1, 10, 100, 1_000):
+    benchmark("BaseRepository.get_paginated", f"page {_page}")(
+        _paginated_benchmark(_page)
+    )
@@ -0,0 +1,129 @@
+import json
+import math
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, NamedTuple
+
+# Median slowdown, as a fraction, above which ``compare`` reports a
+# regression
+REGRESSION_THRESHOLD = 0.1
+
+
+class Benchmark(NamedTuple):
+    name: str
+    group: str
+    func: Callable[[dict], Awaitable]
+
+
+BENCHMARKS: list[Benchmark] = []
+
+
+def benchmark(group: str, name: str | None = None):
+    """Register an async ``func(context)`` as a benchmark of ``group``."""
+
+    def decorator(func):
+        BENCHMARKS.append(Benchmark(name or func.__name__, group, func))
+        return func
+
+    return decorator
+
+
+async def measure(
+    func: Callable[[], Awaitable],
+    rounds: int = 50,
+    warmup: int = 5,
+    min_time: float = 0.0,
+) -> dict:
+    """Time ``rounds`` calls of ``func`` after ``warmup`` untimed ones.
+
+    Keeps calling past ``rounds`` until ``min_time`` seconds were spent,
+    so that very fast functions get enough samples.
+    """
+    for _ in range(warmup):
+        await func()
+
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < rounds or time.perf_counter() - started < min_time:
+        start = time.perf_counter()
+        await func()
+        timings.append(time.perf_counter() - start)
+
+    timings.sort()
+    mean = statistics.fmean(timings)
+    return {
+        "rounds": len(timings),
+        "min": timings[0],
+        "max": timings[-1],
+        "mean": mean,
+        "median": statistics.median(timings),
+        "stddev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        "p95": timings[max(math.ceil(0.95 * len(timings)) - 1, 0)],
+        "ops": 1 / mean if mean else 0.0,
+    }
+
+
+def _git(*args: str) -> str | None:
+    try:
+        return subprocess.run(
+            ["git", *args], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def machine_info() -> dict:
+    return {
+        "commit": _git("rev-parse", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "node": platform.node(),
+    }
+
+
+def save(results: dict, path: str):
+    with open(path, "w") as file:
+        json.dump(results, file, indent=2, sort_keys=True)
+
+
+def load(path: str) -> dict:
+    with open(path) as file:
+        return json.load(file)
+
+
+def compare(
+    base: dict, new: dict, threshold: float = REGRESSION_THRESHOLD
+) -> list[dict]:
+    """Compare the medians of the benchmarks present in both results.
+
+    ``change`` is the relative change of the median, positive when
+    slower, and ``status`` says whether it goes beyond ``threshold``.
+    """
+    rows = []
+    for name, stats in new["benchmarks"].items():
+        if name not in base["benchmarks"]:
+            continue
+        before = base["benchmarks"][name]["stats"]["median"]
+        after = stats["stats"]["median"]
+        change = (after - before) / before if before else 0.0
+        if change > threshold:
+            status = "regression"
+        elif change < -threshold:
+            status = "improvement"
+        else:
+            status = "unchanged"
+        rows.append(
+            {
+                "name": name,
+                "before": before,
+                "after": after,
+                "change": change,
+                "status": status,
+            }
+        )
+    return rows
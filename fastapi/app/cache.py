@@ -0,0 +1,218 @@
+import hashlib
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+import redis.asyncio as redis
+from fastapi import Request, Response
+from loguru import logger
+from starlette.status import HTTP_304_NOT_MODIFIED
+
+from app.config import RESPONSE_CACHE_CONFIGS, STATE_CACHE_CONFIGS
+
+
+class TTLCache:
+    """Bounded LRU mapping whose entries expire ``ttl`` seconds after set.
+
+    Not thread-safe; it is meant to be used from the event loop only.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 60) -> None:
+        if max_size < 1:
+            raise ValueError("Cache max_size must be at least 1")
+
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Hashable, tuple[Any, float]] = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        if (entry := self._data.get(key)) is None:
+            self.misses += 1
+            return default
+
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None):
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            self.delete(key)
+            return
+
+        self._data[key] = (value, time.monotonic() + ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def delete(self, key: Hashable):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class CacheBackend(ABC):
+    """Shared byte store behind ``ResponseCache``."""
+
+    # Whether every process sees the same entries
+    shared = False
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float): ...
+
+    @abstractmethod
+    async def get_counter(self, key: str) -> int: ...
+
+    @abstractmethod
+    async def incr(self, key: str) -> int: ...
+
+    async def close(self):
+        pass
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Process-local backend, other processes do not see its entries."""
+
+    def __init__(self, max_size: int = 1024, ttl: float = 60) -> None:
+        self.values = TTLCache(max_size=max_size, ttl=ttl)
+        # Counters are kept apart so that eviction never resets them
+        self.counters: dict[str, int] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self.values.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float):
+        self.values.set(key, value, ttl=ttl)
+
+    async def get_counter(self, key: str) -> int:
+        return self.counters.get(key, 0)
+
+    async def incr(self, key: str) -> int:
+        self.counters[key] = self.counters.get(key, 0) + 1
+        return self.counters[key]
+
+
+class RedisCacheBackend(CacheBackend):
+    """Backend shared by every process, on any Redis-compatible server."""
+
+    shared = True
+
+    def __init__(self, url: str) -> None:
+        self.client = redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float):
+        await self.client.set(key, value, px=int(ttl * 1000))
+
+    async def get_counter(self, key: str) -> int:
+        return int(await self.client.get(key) or 0)
+
+    async def incr(self, key: str) -> int:
+        return await self.client.incr(key)
+
+    async def close(self):
+        await self.client.aclose()
+
+
+def create_cache_backend(configs: dict) -> CacheBackend:
+    if configs["backend"] == "redis":
+        return RedisCacheBackend(configs["url"])
+    if configs["backend"] == "memory":
+        return MemoryCacheBackend(
+            max_size=configs["max_size"], ttl=configs["ttl"]
+        )
+    raise ValueError(f"Unknown cache backend {configs['backend']}")
+
+
+class ResponseCache:
+    """Caches serialized responses of one namespace in a ``CacheBackend``.
+
+    Entries are keyed by the namespace generation, so ``invalidate``
+    drops every entry of the namespace at once by bumping it.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        backend: CacheBackend,
+        ttl: float = RESPONSE_CACHE_CONFIGS["ttl"],
+    ) -> None:
+        self.namespace = namespace
+        self.backend = backend
+        self.ttl = ttl
+        self.generation_key = f"{namespace}:generation"
+
+    @staticmethod
+    def make_key(*parts) -> str:
+        """Build a key from JSON serializable parts, e.g. query params."""
+        raw = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+    @staticmethod
+    def make_etag(body: bytes) -> str:
+        if not isinstance(body, bytes):
+            raise TypeError(f"Response body must be bytes, not {type(body)}")
+        return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+    async def respond(
+        self,
+        request: Request,
+        key: str,
+        build: Callable[[], Awaitable[bytes]],
+    ) -> Response:
+        """Serve the JSON body cached under key, building it on a miss.
+
+        Responses carry a content ETag; a request whose If-None-Match
+        has it gets an empty 304 instead of the body.
+        """
+        # Read the generation before building, so that a body built
+        # while an invalidation happens is stored under the old one
+        generation = await self.backend.get_counter(self.generation_key)
+        full_key = f"{self.namespace}:{generation}:{key}"
+        if (body := await self.backend.get(full_key)) is None:
+            body = await build()
+            if not isinstance(body, bytes):
+                raise TypeError(
+                    f"{self.namespace} responses must be built as bytes, "
+                    f"not {type(body)}"
+                )
+            await self.backend.set(full_key, body, self.ttl)
+
+        etag = self.make_etag(body)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if_none_match = request.headers.get("if-none-match", "")
+        if etag in (
+            tag.strip().removeprefix("W/") for tag in if_none_match.split(",")
+        ):
+            return Response(status_code=HTTP_304_NOT_MODIFIED, headers=headers)
+
+        return Response(
+            content=body, media_type="application/json", headers=headers
+        )
+
+    async def invalidate(self):
+        logger.debug(f"Invalidating cached {self.namespace} responses")
+        await self.backend.incr(self.generation_key)
+
+
+cache_backend = create_cache_backend(RESPONSE_CACHE_CONFIGS)
+state_backend = create_cache_backend(STATE_CACHE_CONFIGS)
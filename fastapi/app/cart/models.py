@@ -1,4 +1,5 @@
 from datetime import datetime
+from decimal import Decimal
 from typing import Optional
 
 from pydantic import (
@@ -44,16 +45,59 @@ class CartResponseModel(BaseModel):
 class AddToCartRequestModel(BaseModel):
     cart_id: int = Field(..., description="ID of the cart")
     product_id: int = Field(..., description="ID of the product")
-    quantity: int = Field(..., le=10, description="Quantity of the product")
+    quantity: int = Field(
+        ..., gt=0, le=10, description="Quantity of the product"
+    )
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class CartItemRequestModel(BaseModel):
+    product_id: int = Field(..., description="ID of the product")
+    quantity: int = Field(
+        ..., gt=0, le=10, description="Quantity of the product"
+    )
+
+
+class AddItemsToCartRequestModel(BaseModel):
+    cart_id: int = Field(..., description="ID of the cart")
+    items: list[CartItemRequestModel] = Field(
+        ..., min_length=1, max_length=50, description="Items to add"
+    )
+
+    def merged_quantities(self) -> dict[int, int]:
+        """Sum the quantities of items repeating a product"""
+        quantities = {}
+        for item in self.items:
+            quantities[item.product_id] = (
+                quantities.get(item.product_id, 0) + item.quantity
+            )
+        return quantities
+
+
+class CartItemProductModel(BaseModel):
+    """Snapshot of the product of a cart item, as of the cart read"""
+
+    name: str = Field(..., description="Name of the product")
+    price: Decimal = Field(..., description="Price of the product in INR")
+    discount: Decimal = Field(
+        Decimal("0.0"), description="Discount percentage"
+    )
+    tax: Decimal = Field(Decimal("0.0"), description="Tax percentage")
+
+    @field_serializer("price", "discount", "tax")
+    def decimal_serializer(self, value: Decimal) -> str:
+        return str(value)
+
+
 class CartItemsResponseModel(BaseModel):
     id: int = Field(..., description="ID of the cart item")
     cart_id: int = Field(..., description="ID of the cart")
     product_id: int = Field(..., description="ID of the product")
     quantity: int = Field(..., description="Quantity of the product")
+    product: Optional[CartItemProductModel] = Field(
+        None, description="Product of the cart item"
+    )
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -80,3 +124,17 @@ class SingleCartResponseModel(CartsResponseModel):
     items: list[CartItemsResponseModel]
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class CartTotalsResponseModel(BaseModel):
+    cart_id: int = Field(..., description="ID of the cart")
+    items_count: int = Field(..., description="Number of distinct products")
+    quantity: int = Field(..., description="Number of units in the cart")
+    subtotal: Decimal = Field(..., description="Sum of the item prices")
+    discount: Decimal = Field(..., description="Sum of the item discounts")
+    tax: Decimal = Field(..., description="Tax on the discounted prices")
+    total: Decimal = Field(..., description="Amount to pay")
+
+    @field_serializer("subtotal", "discount", "tax", "total")
+    def decimal_serializer(self, value: Decimal) -> str:
+        return str(value)
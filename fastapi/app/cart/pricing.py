@@ -0,0 +1,140 @@
+import time
+from typing import Optional
+
+from loguru import logger
+from sqlalchemy import Numeric, bindparam, cast, func, select
+
+from app.cache import CacheBackend, cache_backend, state_backend
+from app.cart.models import CartTotalsResponseModel
+from app.cart.schema import Cart, CartItems
+from app.config import CART_PRICING_CONFIGS
+from app.database import DatabaseManager
+from app.exceptions import EntityNotFoundError
+from app.products.schema import Product
+
+
+def _totals_query():
+    price = cast(Product.price, Numeric) * CartItems.quantity
+    discount = price * cast(func.coalesce(Product.discount, 0), Numeric)
+    discount = discount / 100
+    tax = (price - discount) * cast(func.coalesce(Product.tax, 0), Numeric)
+    tax = tax / 100
+
+    def total(value):
+        return func.round(func.coalesce(func.sum(value), 0), 2)
+
+    return (
+        select(
+            func.count(CartItems.id).label("items_count"),
+            func.coalesce(func.sum(CartItems.quantity), 0).label("quantity"),
+            total(price).label("subtotal"),
+            total(discount).label("discount"),
+            total(tax).label("tax"),
+        )
+        .select_from(Cart)
+        .outerjoin(CartItems, CartItems.cart_id == Cart.id)
+        .outerjoin(Product, Product.id == CartItems.product_id)
+        .where(Cart.id == bindparam("cart_id"))
+        .where(Cart.user_id == bindparam("user_id"))
+        .group_by(Cart.id)
+    )
+
+
+_TOTALS_QUERY = _totals_query()
+
+
+class CartPricing:
+    """Computes cart totals in SQL and caches them per cart version.
+
+    A cart gets a new version whenever its items change, and all carts
+    a new generation whenever product prices may have changed; either
+    makes the cached totals unreachable. Versions are unique tokens
+    which outlive the totals cached under them, so that a version which
+    expires can not bring back old totals.
+
+    Versions and the generation live in the state backend, so that
+    cached responses can not evict them. Invalidations reach only the
+    backends of the process which made them, so totals are cached only
+    when both backends are shared by every process; otherwise they are
+    computed on each call.
+    """
+
+    GENERATION_KEY = "cart_totals:generation"
+
+    def __init__(
+        self,
+        backend: CacheBackend = cache_backend,
+        state: CacheBackend = state_backend,
+        ttl: float = CART_PRICING_CONFIGS["cache_ttl"],
+    ) -> None:
+        self.backend = backend
+        self.state = state
+        self.ttl = ttl
+        self.enabled = backend.shared and state.shared and ttl > 0
+
+    @staticmethod
+    def _version_key(cart_id: int) -> str:
+        return f"cart_totals:{cart_id}:version"
+
+    async def _get_cached(self, key: str) -> Optional[CartTotalsResponseModel]:
+        if (cached := await self.backend.get(key)) is None:
+            return None
+        return CartTotalsResponseModel.model_validate_json(cached)
+
+    async def get_totals(
+        self, user_id: int, cart_id: int
+    ) -> CartTotalsResponseModel:
+        if not self.enabled:
+            return await self._compute(user_id, cart_id)
+
+        generation = await self.state.get_counter(self.GENERATION_KEY)
+        version = await self.state.get(self._version_key(cart_id))
+        version = version.decode() if version else "0"
+        key = f"cart_totals:{generation}:{user_id}:{cart_id}:{version}"
+        if (totals := await self._get_cached(key)) is not None:
+            return totals
+
+        totals = await self._compute(user_id, cart_id)
+        await self.backend.set(
+            key, totals.model_dump_json().encode(), self.ttl
+        )
+        return totals
+
+    async def _compute(
+        self, user_id: int, cart_id: int
+    ) -> CartTotalsResponseModel:
+        db_instance = DatabaseManager._instance
+        async with db_instance.begin() as connection:
+            result = await connection.execute(
+                _TOTALS_QUERY, {"user_id": user_id, "cart_id": cart_id}
+            )
+            if not (row := result.fetchone()):
+                raise EntityNotFoundError(entity="Cart")
+
+        return CartTotalsResponseModel(
+            cart_id=cart_id,
+            items_count=row.items_count,
+            quantity=row.quantity,
+            subtotal=row.subtotal,
+            discount=row.discount,
+            tax=row.tax,
+            total=row.subtotal - row.discount + row.tax,
+        )
+
+    async def invalidate_cart(self, cart_id: int):
+        if not self.enabled:
+            return
+        logger.debug(f"Invalidating cached totals of {cart_id=}")
+        version = str(time.time_ns()).encode()
+        await self.state.set(
+            self._version_key(cart_id), version, ttl=2 * self.ttl
+        )
+
+    async def invalidate_all(self):
+        if not self.enabled:
+            return
+        logger.debug("Invalidating all cached cart totals")
+        await self.state.incr(self.GENERATION_KEY)
+
+
+cart_pricing = CartPricing()
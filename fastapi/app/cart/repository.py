@@ -1,23 +1,102 @@
-import datetime
-from math import ceil
+from functools import partial
 
 from loguru import logger
-from sqlalchemy import delete, exc, func, insert, select, update
-
-from app.cart.models import AddToCartRequestModel, CreateCartRequestModel
-from app.cart.schema import Cart, CartItems, CartStatus
+from sqlalchemy import (
+    JSON,
+    bindparam,
+    delete,
+    exc,
+    func,
+    insert,
+    literal_column,
+    select,
+    type_coerce,
+    update,
+)
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.cart.models import (
+    AddItemsToCartRequestModel,
+    AddToCartRequestModel,
+    CreateCartRequestModel,
+)
+from app.cart.pricing import cart_pricing
+from app.cart.schema import Cart, CartItems
 from app.database import DatabaseManager
 from app.exceptions import EntityNotFoundError
+from app.models import get_total_pages
 from app.products.schema import Product
 from app.repository import BaseRepository
 
 
+def _json_object(**fields):
+    """Build a json_build_object() call, with the keys inlined as SQL."""
+    args = []
+    for key, value in fields.items():
+        args.extend((literal_column(f"'{key}'"), value))
+    return func.json_build_object(*args)
+
+
+def _carts_query(user_id, with_items: bool = True):
+    """Select the carts of a user, with their items as a JSON array.
+
+    Each item carries a snapshot of its product, so a cart and
+    everything shown with it come back in a single statement.
+    """
+    columns = [Cart.id, Cart.name, Cart.reminder_date, Cart.status]
+    if with_items:
+        item = _json_object(
+            id=CartItems.id,
+            cart_id=CartItems.cart_id,
+            product_id=CartItems.product_id,
+            quantity=CartItems.quantity,
+            product=_json_object(
+                name=Product.name,
+                price=Product.price,
+                discount=Product.discount,
+                tax=Product.tax,
+            ),
+        )
+        items = (
+            select(
+                func.coalesce(
+                    func.json_agg(aggregate_order_by(item, CartItems.id)),
+                    literal_column("'[]'::json"),
+                )
+            )
+            .join(Product, Product.id == CartItems.product_id)
+            .where(CartItems.cart_id == Cart.id)
+            .scalar_subquery()
+        )
+        columns.append(type_coerce(items, JSON).label("items"))
+
+    return select(*columns).where(Cart.user_id == user_id)
+
+
+_CART_QUERY = _carts_query(bindparam("user_id")).where(
+    Cart.id == bindparam("cart_id")
+)
+_CHECK_ITEMS_QUERY = select(
+    select(Cart.id)
+    .where(Cart.user_id == bindparam("user_id"))
+    .where(Cart.id == bindparam("cart_id"))
+    .exists()
+    .label("cart_exists"),
+    func.array(
+        select(Product.id)
+        .where(Product.id.in_(bindparam("product_ids", expanding=True)))
+        .scalar_subquery()
+    ).label("product_ids"),
+)
+
+
 class CartRepository(BaseRepository):
     def __init__(self):
-        self.db = DatabaseManager._instance
+        super().__init__(DatabaseManager._instance)
 
     async def create(self, user_id: int, cart: CreateCartRequestModel) -> int:
-        async with self.db.engine.begin() as connection:
+        async with self.db.begin() as connection:
             try:
                 q = (
                     insert(Cart)
@@ -38,52 +117,16 @@ class CartRepository(BaseRepository):
                 logger.error(f"Error creating cart: {e=}")
                 raise e
 
-    async def update_cart_status(self, cart: dict) -> dict:
-        def reminder_date_is_passed(
-            reminder_date: datetime.datetime, by: int = 0
-        ):
-            reminder_date_timezone = reminder_date.tzinfo
-            reminder_date += datetime.timedelta(days=by)
-            if reminder_date < datetime.datetime.now(
-                tz=reminder_date_timezone
-            ):
-                return True
-
-            return False
-
-        async with self.db.engine.begin() as connection:
-            if reminder_date_is_passed(cart["reminder_date"], by=3):
-                q = (
-                    update(Cart)
-                    .where(Cart.id == cart["id"])
-                    .values(reminder_date=None, status=CartStatus.ABANDONED)
-                ).returning(Cart)
-
-                result = await connection.execute(q)
-                cart = result.fetchone()
-                return cart._asdict()
-
-            return cart
-
     async def get(self, user_id: int, cart_id: int) -> dict:
-        async with self.db.engine.begin() as connection:
+        async with self.db.begin() as connection:
             try:
-                q = (
-                    select(Cart)
-                    .where(Cart.user_id == user_id)
-                    .where(Cart.id == cart_id)
+                result = await connection.execute(
+                    _CART_QUERY, {"user_id": user_id, "cart_id": cart_id}
                 )
-                result = await connection.execute(q)
                 if not (cart := result.fetchone()):
                     raise EntityNotFoundError(entity="Cart")
 
-                cart = await self.update_cart_status(cart._asdict())
-
-                q = select(CartItems).where(CartItems.cart_id == cart["id"])
-                result = await connection.execute(q)
-
-                cart["items"] = [item._asdict() for item in result.fetchall()]
-                return cart
+                return cart._asdict()
             except exc.SQLAlchemyError as e:
                 logger.exception(f"Error getting cart: {e=}")
                 raise e
@@ -91,52 +134,6 @@ class CartRepository(BaseRepository):
                 logger.error(f"Error getting cart: {e=}")
                 raise e
 
-    async def _get_total_carts(self, connection, user_id: int) -> int:
-        """Get total number of carts for a user."""
-        count_query = select(func.count(Cart.id)).where(
-            Cart.user_id == user_id
-        )
-        return await connection.scalar(count_query)
-
-    async def _get_paginated_carts(
-        self, connection, cart_id: int, user_id: int, offset: int, limit: int
-    ) -> list[dict]:
-        """Get paginated cart records."""
-        carts_query = select(Cart).where(Cart.user_id == user_id)
-        if cart_id:
-            carts_query = carts_query.where(Cart.id == cart_id)
-
-        carts_query = carts_query.order_by(Cart.id).offset(offset).limit(limit)
-        carts_result = await connection.execute(carts_query)
-        return [cart._asdict() for cart in carts_result.fetchall()]
-
-    async def _get_cart_items(
-        self, connection, cart_ids: list[int]
-    ) -> list[dict]:
-        """Get items for multiple carts."""
-        if not cart_ids:
-            return []
-
-        items_query = select(CartItems).where(CartItems.cart_id.in_(cart_ids))
-        items_result = await connection.execute(items_query)
-        return [item._asdict() for item in items_result.fetchall()]
-
-    async def _associate_items_with_carts(
-        self, carts: list[dict], items: list[dict]
-    ) -> list[dict]:
-        """Associate items with their respective carts."""
-        items_by_cart = {}
-        for item in items:
-            cart_id = item["cart_id"]
-            if cart_id not in items_by_cart:
-                items_by_cart[cart_id] = []
-            items_by_cart[cart_id].append(item)
-
-        for cart in carts:
-            cart["items"] = items_by_cart.get(cart["id"], [])
-
-        return carts
-
     async def get_all(
         self,
         user_id: int,
@@ -144,55 +141,49 @@ class CartRepository(BaseRepository):
         get_items: bool = True,
         page: int = 1,
         page_size: int = 10,
+        cursor: str | None = None,
+        with_total: bool = True,
     ) -> dict:
         """Get paginated list of carts with their items."""
-        async with self.db.engine.begin() as connection:
-            try:
+        try:
+            q = _carts_query(user_id, with_items=get_items)
+            if cart_id:
+                q = q.where(Cart.id == cart_id)
+
+            result = await self.get_paginated(
+                q,
+                page,
+                page_size,
+                cursor=cursor,
+                keys=[Cart.id],
+                with_total=with_total,
+            )
+            total = result.total
+            if cart_id and total is not None:
+                # A lookup by id always reports a single result
                 total = 1
-                if not cart_id:
-                    total = await self._get_total_carts(connection, user_id)
-
-                offset = (page - 1) * page_size
-                carts = await self._get_paginated_carts(
-                    connection, cart_id, user_id, offset, page_size
-                )
 
-                cart_ids = [cart["id"] for cart in carts]
-
-                if get_items:
-                    items = await self._get_cart_items(connection, cart_ids)
-                    carts = await self._associate_items_with_carts(
-                        carts, items
-                    )
-
-                for cart in carts:
-                    if not cart.get("reminder_date"):
-                        continue
-
-                    try:
-                        cart = await self.update_cart_status(cart)
-                    except Exception as e:
-                        logger.error(f"Error updating cart status: {e}")
-
-                return {
-                    "items": carts if carts else [],
-                    "total": total,
-                    "page": page,
-                    "page_size": page_size,
-                    "total_pages": max(
-                        ceil(total / page_size) if total > 0 else 1, 1
-                    ),
-                }
-
-            except exc.SQLAlchemyError as e:
-                logger.exception(f"Error getting carts: {e=}")
-                raise e
-            except Exception as e:
-                logger.error(f"Error getting carts: {e=}")
-                raise e
+            # An empty listing is still one (empty) page
+            total_pages = get_total_pages(total, page_size)
+            if total_pages is not None:
+                total_pages = max(1, total_pages)
+            return {
+                "items": result.items,
+                "total": total,
+                "page": page,
+                "page_size": page_size,
+                "total_pages": total_pages,
+                "next_cursor": result.next_cursor,
+            }
+        except exc.SQLAlchemyError as e:
+            logger.exception(f"Error getting carts: {e=}")
+            raise e
+        except Exception as e:
+            logger.error(f"Error getting carts: {e=}")
+            raise e
 
     async def delete(self, user_id: int, cart_id: int):
-        async with self.db.engine.begin() as connection:
+        async with self.db.begin() as connection:
             try:
                 q = (
                     select(Cart)
@@ -210,7 +201,6 @@ class CartRepository(BaseRepository):
                     .where(Cart.id == cart_id)
                 )
                 await connection.execute(q)
-                return cart_id
             except exc.SQLAlchemyError as e:
                 logger.exception(f"Error deleting cart: {e=}")
                 raise e
@@ -218,10 +208,15 @@ class CartRepository(BaseRepository):
                 logger.error(f"Error deleting cart: {e=}")
                 raise e
 
+        await self.db.after_commit(
+            partial(cart_pricing.invalidate_cart, cart_id)
+        )
+        return cart_id
+
     async def update(
         self, user_id: int, cart_id: int, cart: CreateCartRequestModel
     ) -> int:
-        async with self.db.engine.begin() as connection:
+        async with self.db.begin() as connection:
             try:
                 q = (
                     select(Cart)
@@ -251,36 +246,81 @@ class CartRepository(BaseRepository):
                 logger.error(f"Error updating cart: {e=}")
                 raise e
 
+    async def _check_items(
+        self, connection, user_id: int, cart_id: int, product_ids: list[int]
+    ):
+        """Check cart ownership and that every product exists, at once."""
+        result = await connection.execute(
+            _CHECK_ITEMS_QUERY,
+            {
+                "user_id": user_id,
+                "cart_id": cart_id,
+                "product_ids": product_ids,
+            },
+        )
+        result = result.one()
+        if not result.cart_exists:
+            logger.warning(f"Unauthorized access report: {user_id=}")
+            raise EntityNotFoundError(entity="Cart")
+
+        if missing := set(product_ids) - set(result.product_ids):
+            logger.warning(f"Products not found: {missing=}")
+            raise EntityNotFoundError(entity="Product")
+
+    def _upsert_items(self, cart_id: int, quantities: dict[int, int]):
+        """Insert the items, adding to the quantity of existing ones."""
+        q = pg_insert(CartItems).values(
+            [
+                {
+                    "cart_id": cart_id,
+                    "product_id": product_id,
+                    "quantity": quantity,
+                }
+                for product_id, quantity in quantities.items()
+            ]
+        )
+        return q.on_conflict_do_update(
+            index_elements=[CartItems.cart_id, CartItems.product_id],
+            set_={"quantity": CartItems.quantity + q.excluded.quantity},
+        )
+
     async def add_item(self, user_id: int, item: AddToCartRequestModel):
-        async with self.db.engine.begin() as connection:
+        async with self.db.begin() as connection:
             try:
-                q = (
-                    select(Cart)
-                    .where(Cart.user_id == user_id)
-                    .where(Cart.id == item.cart_id)
+                await self._check_items(
+                    connection, user_id, item.cart_id, [item.product_id]
                 )
-                result = await connection.execute(q)
-                if not result.scalar():
-                    logger.warning(f"Unauthorized access report: {user_id=}")
-                    raise EntityNotFoundError(entity="Cart")
 
-                q = select(Product).where(Product.id == item.product_id)
+                q = self._upsert_items(
+                    item.cart_id, {item.product_id: item.quantity}
+                ).returning(CartItems.id)
                 result = await connection.execute(q)
-                if not result.scalar():
-                    logger.warning(f"Product not found: {item.product_id=}")
-                    raise EntityNotFoundError(entity="Product")
+                item_id = result.fetchone()[0]
+            except exc.SQLAlchemyError as e:
+                logger.exception(f"Error adding items to cart: {e=}")
+                raise e
+            except Exception as e:
+                logger.error(f"Error adding items to cart: {e=}")
+                raise e
 
-                q = (
-                    insert(CartItems)
-                    .values(
-                        cart_id=item.cart_id,
-                        product_id=item.product_id,
-                        quantity=item.quantity,
-                    )
-                    .returning(CartItems.id)
+        await self.db.after_commit(
+            partial(cart_pricing.invalidate_cart, item.cart_id)
+        )
+        return item_id
+
+    async def add_items(
+        self, user_id: int, items: AddItemsToCartRequestModel
+    ) -> dict:
+        """Add several products to a cart and return the updated cart."""
+        quantities = items.merged_quantities()
+        async with self.db.begin() as connection:
+            try:
+                await self._check_items(
+                    connection, user_id, items.cart_id, list(quantities)
+                )
+                await connection.execute(
+                    self._upsert_items(items.cart_id, quantities)
                 )
-                result = await connection.execute(q)
-                return result.fetchone()[0]
             except exc.SQLAlchemyError as e:
                 logger.exception(f"Error adding items to cart: {e=}")
                 raise e
@@ -288,8 +328,13 @@ class CartRepository(BaseRepository):
                 logger.error(f"Error adding items to cart: {e=}")
                 raise e
 
+        await self.db.after_commit(
+            partial(cart_pricing.invalidate_cart, items.cart_id)
+        )
+        return await self.get(user_id, items.cart_id)
+
     async def remove_item(self, user_id: int, cart_id: int, product_id: int):
-        async with self.db.engine.begin() as connection:
+        async with self.db.begin() as connection:
             try:
                 q = (
                     select(Cart)
@@ -310,12 +355,20 @@ class CartRepository(BaseRepository):
                 if not result.scalar():
                     raise EntityNotFoundError(entity="Item")
 
-                q = delete(CartItems).where(CartItems.cart_id == cart_id)
+                q = (
+                    delete(CartItems)
+                    .where(CartItems.cart_id == cart_id)
+                    .where(CartItems.product_id == product_id)
+                )
                 await connection.execute(q)
-                return cart_id
             except exc.SQLAlchemyError as e:
                 logger.exception(f"Error removing items from cart: {e=}")
                 raise e
             except Exception as e:
                 logger.error(f"Error removing items from cart: {e=}")
                 raise e
+
+        await self.db.after_commit(
+            partial(cart_pricing.invalidate_cart, cart_id)
+        )
+        return cart_id
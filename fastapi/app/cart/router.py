@@ -9,14 +9,21 @@ from starlette.status import (
 )
 
 from app.cart.models import (
+    AddItemsToCartRequestModel,
     AddToCartRequestModel,
     CartResponseModel,
     CartsResponseModel,
+    CartTotalsResponseModel,
     CreateCartRequestModel,
     SingleCartResponseModel,
 )
+from app.cart.pricing import cart_pricing
 from app.cart.repository import CartRepository
-from app.exceptions import EntityIntegrityError, EntityNotFoundError
+from app.exceptions import (
+    EntityIntegrityError,
+    EntityNotFoundError,
+    InvalidCursorError,
+)
 from app.models import PaginatedResponse, PaginationParams
 from app.permissions.utils import allowed_permissions
 from app.users.utils import get_current_user_id
@@ -79,9 +86,13 @@ async def get_all_carts(
             get_items=get_items,
             page=pagination.page,
             page_size=pagination.page_size,
+            cursor=pagination.cursor,
+            with_total=pagination.with_total,
         )
         logger.debug(f"Get all carts result: {result}")
         return PaginatedResponse[CartsResponseModel](**result)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail=str(e))
     except EntityIntegrityError as e:
         raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail=str(e))
     except EntityNotFoundError as e:
@@ -94,6 +105,31 @@ async def get_all_carts(
         )
 
 
+@router.get(
+    "/totals/{cart_id}",
+    response_model=CartTotalsResponseModel,
+    status_code=HTTP_200_OK,
+    dependencies=[
+        Depends(allowed_permissions(["read_cart"])),
+    ],
+    openapi_extra={
+        "security": [
+            {"cookieAuth": [], "oauth2Auth": []},
+        ]
+    },
+)
+async def get_cart_totals(
+    cart_id: int, user_id: int = Depends(get_current_user_id)
+):
+    try:
+        return await cart_pricing.get_totals(user_id, cart_id)
+    except EntityNotFoundError as e:
+        raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error getting cart totals: {e=}")
+        raise HTTPException(status_code=HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 @router.delete(
     "",
     response_model=CartResponseModel,
@@ -182,6 +218,36 @@ async def add_item_to_cart(
         raise HTTPException(status_code=HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@router.post(
+    "/add-items",
+    response_model=SingleCartResponseModel,
+    status_code=HTTP_200_OK,
+    dependencies=[
+        Depends(allowed_permissions(["update_cart"])),
+    ],
+    openapi_extra={
+        "security": [
+            {"cookieAuth": [], "oauth2Auth": []},
+        ]
+    },
+)
+async def add_items_to_cart(
+    items: AddItemsToCartRequestModel,
+    user_id: int = (Depends(get_current_user_id)),
+):
+    try:
+        repo = CartRepository()
+        cart = await repo.add_items(user_id, items=items)
+        return SingleCartResponseModel(**cart)
+    except EntityNotFoundError as e:
+        raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail=str(e))
+    except EntityIntegrityError as e:
+        raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error adding items to cart: {e=}")
+        raise HTTPException(status_code=HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 @router.delete(
     "/remove-item/{cart_id}/{product_id}",
     response_model=CartResponseModel,
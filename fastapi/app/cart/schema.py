@@ -1,6 +1,14 @@
 from enum import Enum as PyEnum
 
-from sqlalchemy import Column, DateTime, Enum, ForeignKey, Integer, String
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+)
 from sqlalchemy.orm import relationship
 
 from app.config import Base
@@ -14,6 +22,12 @@ class CartStatus(PyEnum):
 
 class Cart(Base):
     __tablename__ = "carts"
+    __table_args__ = (
+        # Serves the sweep for abandoned carts, see app/cart/sweeper.py
+        Index("ix_carts_status_reminder_date", "status", "reminder_date"),
+        # Carts are always listed per user
+        Index("ix_carts_user_id", "user_id"),
+    )
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -34,6 +48,18 @@ class Cart(Base):
 
 class CartItems(Base):
     __tablename__ = "cart_items"
+    __table_args__ = (
+        # A product appears once per cart, adding it again sums quantities
+        Index(
+            "uq_cart_items_cart_id_product_id",
+            "cart_id",
+            "product_id",
+            unique=True,
+        ),
+        # The index above serves lookups by cart_id, this one by product,
+        # e.g. when a product is deleted
+        Index("ix_cart_items_product_id", "product_id"),
+    )
 
     id = Column(Integer, primary_key=True)
     cart_id = Column(Integer, ForeignKey("carts.id"))
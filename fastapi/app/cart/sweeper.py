@@ -0,0 +1,76 @@
+import asyncio
+import datetime
+from typing import Optional
+
+from loguru import logger
+from sqlalchemy import update
+
+from app.cart.schema import Cart, CartStatus
+from app.config import CART_SWEEPER_CONFIGS
+from app.database import DatabaseManager
+
+
+class AbandonedCartSweeper:
+    """Periodically marks carts abandoned once their reminder is stale.
+
+    A cart is abandoned ``abandon_after_days`` after its reminder date.
+    Every sweep is a single UPDATE served by the (status, reminder_date)
+    index, and running it from several processes at once is harmless.
+    """
+
+    def __init__(
+        self,
+        interval: float = CART_SWEEPER_CONFIGS["interval"],
+        abandon_after_days: int = CART_SWEEPER_CONFIGS["abandon_after_days"],
+    ) -> None:
+        self.interval = interval
+        self.abandon_after = datetime.timedelta(days=abandon_after_days)
+        self._task: Optional[asyncio.Task] = None
+
+    async def sweep(self) -> int:
+        """Mark the stale carts abandoned, return how many there were."""
+        now = datetime.datetime.now(tz=datetime.timezone.utc)
+        q = (
+            update(Cart)
+            .where(Cart.status.in_([CartStatus.ACTIVE, CartStatus.INACTIVE]))
+            .where(Cart.reminder_date < now - self.abandon_after)
+            .values(reminder_date=None, status=CartStatus.ABANDONED)
+        )
+
+        db_instance = DatabaseManager._instance
+        async with db_instance.begin() as connection:
+            result = await connection.execute(q)
+
+        if result.rowcount:
+            logger.info(f"Marked {result.rowcount} carts as abandoned")
+        return result.rowcount
+
+    async def _run(self):
+        while True:
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error(f"Error sweeping abandoned carts: {e=}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self.interval <= 0:
+            logger.info("Abandoned cart sweeper is disabled")
+            return
+
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+abandoned_cart_sweeper = AbandonedCartSweeper()
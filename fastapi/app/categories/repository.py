@@ -4,10 +4,12 @@ from sqlalchemy.exc import IntegrityError
 from app.categories.models import (
     AllCategoriesResponseModel,
     CategoryCreateModel,
+    CategoryResponseModel,
 )
 from app.categories.schema import Category
 from app.database import DatabaseManager
 from app.exceptions import EntityIntegrityError, EntityNotFoundError
+from app.products.cache import product_cache
 
 
 class ProductCategoryRepository:
@@ -15,12 +17,11 @@ class ProductCategoryRepository:
         self.db = DatabaseManager._instance
 
     async def create(self, category: CategoryCreateModel):
-        async with self.db.engine.begin() as connection:
+        async with self.db.begin() as connection:
             try:
                 result = await connection.execute(
                     insert(Category).values(name=category.name)
                 )
-                await connection.commit()
                 return {
                     "id": result.inserted_primary_key[0],
                     "name": category.name,
@@ -29,7 +30,7 @@ class ProductCategoryRepository:
                 raise EntityIntegrityError(entity="Category")
 
     async def get_by_id(self, id: int) -> Category:
-        async with self.db.engine.begin() as connection:
+        async with self.db.begin(readonly=True) as connection:
             result = await connection.execute(
                 select(Category).where(Category.id == id)
             )
@@ -40,18 +41,19 @@ class ProductCategoryRepository:
             return category._asdict()
 
     async def get_all(self) -> AllCategoriesResponseModel:
-        async with self.db.engine.begin() as connection:
+        async with self.db.begin(readonly=True) as connection:
             result = await connection.execute(select(Category))
-            categories = result.fetchall()
-            return AllCategoriesResponseModel(
+            return AllCategoriesResponseModel.model_construct(
                 categories=[
-                    {"id": category.id, "name": category.name}
-                    for category in categories
+                    CategoryResponseModel.model_construct(
+                        id=category.id, name=category.name
+                    )
+                    for category in result
                 ]
             )
 
     async def delete(self, id: int):
-        async with self.db.engine.begin() as connection:
+        async with self.db.begin() as connection:
             result = await connection.execute(
                 select(Category).where(Category.id == id)
             )
@@ -61,5 +63,5 @@ class ProductCategoryRepository:
             await connection.execute(
                 delete(Category).where(Category.id == category.id)
             )
-            await connection.commit()
+            await self.db.after_commit(product_cache.invalidate)
             return category._asdict()
@@ -16,6 +16,7 @@ from app.categories.models import (
 )
 from app.categories.repository import ProductCategoryRepository
 from app.exceptions import EntityIntegrityError, EntityNotFoundError
+from app.models import RawJSONResponse, encode_json
 from app.permissions.utils import allowed_permissions
 
 router = APIRouter(prefix="/api/v1/category", tags=["Category"])
@@ -91,8 +92,8 @@ async def get_category():
     try:
         repo = ProductCategoryRepository()
         all_categories = await repo.get_all()
-        return JSONResponse(
-            content=all_categories.model_dump(),
+        return RawJSONResponse(
+            encode_json(all_categories),
             status_code=(
                 HTTP_200_OK if all_categories else HTTP_404_NOT_FOUND
             ),
@@ -23,7 +23,34 @@ DB_CONFIGS = {
     "user": os.getenv("DB_USER", "postgres"),
     "password": os.getenv("DB_PASSWORD", "postgres"),
     "database": os.getenv("DB_DATABASE", "postgres"),
-    "pool_size": os.getenv("DB_POOL_SIZE", 20),
+    "pool_size": int(os.getenv("DB_POOL_SIZE", 20)),
+    # Connections opened beyond pool_size under load, closed when returned
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", 10)),
+    # Seconds to wait for a connection before failing the request
+    "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", 30)),
+    # Seconds after which a connection is replaced, -1 keeps them forever
+    "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", 1800)),
+    "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "false").lower()
+    in ("1", "true", "yes"),
+    # Prepared statements kept per connection, 0 disables the cache
+    "statement_cache_size": int(os.getenv("DB_STATEMENT_CACHE_SIZE", 100)),
+    # Compiled SQL strings kept by SQLAlchemy per engine, 0 disables it
+    "query_cache_size": int(os.getenv("DB_QUERY_CACHE_SIZE", 500)),
+    # Milliseconds before the server cancels a statement, 0 never does
+    "statement_timeout": int(os.getenv("DB_STATEMENT_TIMEOUT", 0)),
+    # Seconds between two pool stats log lines, 0 disables them
+    "pool_stats_interval": float(os.getenv("DB_POOL_STATS_INTERVAL", 0)),
+    # Comma separated "host[:port]" of read replicas, reads stay on the
+    # primary when empty
+    "replica_hosts": [
+        host.strip()
+        for host in os.getenv("DB_REPLICA_HOSTS", "").split(",")
+        if host.strip()
+    ],
+    # Seconds a user's reads stay on the primary after they wrote
+    "read_your_writes_window": float(
+        os.getenv("DB_READ_YOUR_WRITES_WINDOW", 5)
+    ),
 }
 
 
@@ -34,3 +61,75 @@ TESTMODE = os.getenv("TESTMODE", False)
 MAXIMUM_ADDRESS_CREATION_LIMIT_PER_USER = os.getenv(
     "MAXIMUM_ADDRESS_CREATION_LIMIT_PER_USER", 5
 )
+
+PERMISSION_CACHE_CONFIGS = {
+    "ttl": float(os.getenv("PERMISSION_CACHE_TTL", 60)),
+    "max_size": int(os.getenv("PERMISSION_CACHE_MAX_SIZE", 1024)),
+}
+
+TOKEN_CACHE_CONFIGS = {
+    "ttl": float(os.getenv("TOKEN_CACHE_TTL", 300)),
+    "max_size": int(os.getenv("TOKEN_CACHE_MAX_SIZE", 4096)),
+}
+
+PASSWORD_HASHING_CONFIGS = {
+    # "thread" or "process"; bcrypt releases the GIL, so threads suffice
+    "executor": os.getenv("PASSWORD_HASHING_EXECUTOR", "thread"),
+    "max_workers": int(os.getenv("PASSWORD_HASHING_MAX_WORKERS", 4)),
+    "max_concurrency": int(os.getenv("PASSWORD_HASHING_MAX_CONCURRENCY", 0)),
+}
+
+PAGINATION_CONFIGS = {
+    # Unfiltered listings of tables with at least this many rows report
+    # the planner's estimate instead of an exact count, 0 disables it
+    "estimate_threshold": int(os.getenv("PAGINATION_ESTIMATE_THRESHOLD", 0)),
+    "estimate_ttl": float(os.getenv("PAGINATION_ESTIMATE_TTL", 60)),
+}
+
+PRODUCT_FACETS_CONFIGS = {
+    # Lower bounds of the price buckets, the last one is open ended
+    "price_buckets": [
+        float(bound)
+        for bound in os.getenv(
+            "PRODUCT_FACETS_PRICE_BUCKETS", "0,500,1000,5000,10000,50000"
+        ).split(",")
+    ],
+    "max_tags": int(os.getenv("PRODUCT_FACETS_MAX_TAGS", 20)),
+}
+
+RESPONSE_CACHE_CONFIGS = {
+    # "memory" is per process, "redis" is shared by every process
+    "backend": os.getenv("RESPONSE_CACHE_BACKEND", "memory"),
+    "url": os.getenv("RESPONSE_CACHE_URL", "redis://localhost:6379/0"),
+    "ttl": float(os.getenv("RESPONSE_CACHE_TTL", 30)),
+    "max_size": int(os.getenv("RESPONSE_CACHE_MAX_SIZE", 1024)),
+}
+
+STATE_CACHE_CONFIGS = {
+    # Small keys whose loss changes behaviour, like recent write markers
+    # and cart totals versions, kept apart from the cached responses so
+    # that those can not evict them; point Redis at a noeviction server
+    "backend": os.getenv(
+        "STATE_CACHE_BACKEND", RESPONSE_CACHE_CONFIGS["backend"]
+    ),
+    "url": os.getenv("STATE_CACHE_URL", RESPONSE_CACHE_CONFIGS["url"]),
+    "ttl": float(os.getenv("STATE_CACHE_TTL", 300)),
+    "max_size": int(os.getenv("STATE_CACHE_MAX_SIZE", 65536)),
+}
+
+CART_SWEEPER_CONFIGS = {
+    # Seconds between two sweeps for abandoned carts, 0 disables them
+    "interval": float(os.getenv("CART_SWEEPER_INTERVAL", 60)),
+    "abandon_after_days": int(os.getenv("CART_ABANDON_AFTER_DAYS", 3)),
+}
+
+METRICS_CONFIGS = {
+    # Add a Server-Timing header with the database time to responses
+    "server_timing": os.getenv("METRICS_SERVER_TIMING", "false").lower()
+    in ("1", "true", "yes"),
+}
+
+CART_PRICING_CONFIGS = {
+    # Totals are only cached when both cache backends are shared
+    "cache_ttl": float(os.getenv("CART_PRICING_CACHE_TTL", 300)),
+}
@@ -1,7 +1,200 @@
+import inspect
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Optional
+
 from loguru import logger
-from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy import event
+from sqlalchemy.engine.default import CACHE_HIT, CACHE_MISS
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncEngine,
+    create_async_engine,
+)
+
+from app.cache import state_backend
+from app.config import DB_CONFIGS
+from app.metrics import current_request_metrics
+
+# Set on the info of primary connections which ran INSERT, UPDATE or DELETE
+WROTE_KEY = "wrote"
+
+# The unit of work of the running request or standalone operation
+_current_unit_of_work: ContextVar[Optional["UnitOfWork"]] = ContextVar(
+    "current_unit_of_work", default=None
+)
+
+
+class PoolWaitMetrics:
+    """Histogram of the seconds spent waiting for a pool connection.
+
+    Bucket counts are cumulative, each one counts the checkouts which
+    waited at most its upper bound.
+    """
+
+    BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(self.BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.timeouts = 0
+
+    def observe(self, seconds: float):
+        for i, bound in enumerate(self.BUCKETS):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def histogram(self) -> dict[str, int]:
+        histogram, cumulative = {}, 0
+        for bound, count in zip((*self.BUCKETS, "+Inf"), self.counts):
+            cumulative += count
+            histogram[str(bound)] = cumulative
+        return histogram
+
+    def stats(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "max": self.max,
+            "timeouts": self.timeouts,
+            "buckets": self.histogram(),
+        }
+
+
+class UnitOfWork:
+    """One primary transaction shared by everything in a scope.
+
+    Connections are checked out on first use, so scopes which never
+    touch the database, e.g. cached responses, never wait on the pool.
+    The transactions commit when the scope exits cleanly, or early on
+    ``release``, and roll back when it raises. Callbacks registered with
+    ``after_commit`` run once a commit succeeded and are dropped by a
+    rollback.
+
+    Read only work goes to a replica, unless the scope already uses the
+    primary or its user wrote within the read-your-writes window. A
+    scope which reads and then writes holds a replica connection and a
+    primary connection together until it finishes.
+    """
+
+    def __init__(self, db: "DatabaseManager") -> None:
+        self.db = db
+        self.user_id: int | None = None
+        self._connection: AsyncConnection | None = None
+        self._replica_connection: AsyncConnection | None = None
+        self._primary_only = not db.replica_engines
+        self._callbacks = []
+        self._token = None
+
+    async def connection(self, readonly: bool = False) -> AsyncConnection:
+        if readonly and self._connection is None:
+            if self._replica_connection is None and not self._primary_only:
+                if await self.db.wrote_recently(self.user_id):
+                    self._primary_only = True
+                else:
+                    self._replica_connection = await self.db.checkout(
+                        self.db.next_replica()
+                    )
+                    await self._replica_connection.begin()
+
+            if self._replica_connection is not None:
+                return self._replica_connection
+
+        if self._connection is None:
+            self._connection = await self.db.checkout()
+            self._connection.info[WROTE_KEY] = False
+            await self._connection.begin()
+        return self._connection
+
+    def after_commit(self, callback):
+        self._callbacks.append(callback)
+
+    async def _finish(self, commit: bool):
+        connections = [
+            connection
+            for connection in (self._connection, self._replica_connection)
+            if connection is not None
+        ]
+        wrote = self._connection is not None and self._connection.info.get(
+            WROTE_KEY
+        )
+        self._connection = self._replica_connection = None
+        error = None
+        try:
+            for connection in connections:
+                try:
+                    # Once a commit failed, the other connections roll back
+                    if commit and error is None:
+                        await connection.commit()
+                    else:
+                        await connection.rollback()
+                except Exception as exc:
+                    error = error or exc
+        finally:
+            # Even when cancelled, every connection goes back to its pool
+            for connection in connections:
+                try:
+                    await connection.close()
+                except Exception:
+                    logger.exception("Failed to close a database connection")
+
+        callbacks, self._callbacks = self._callbacks, []
+        if error is not None:
+            raise error
+        if not commit:
+            return
+
+        if wrote:
+            await self.db.record_write(self.user_id)
+        for callback in callbacks:
+            await _call(callback)
+
+    async def release(self):
+        """Commit early and return the connections to their pools.
+
+        Callbacks registered so far run now, so that they are not lost
+        if the scope raises later on. Statements issued afterwards check
+        out new connections.
+        """
+        await self._finish(commit=True)
+
+    async def __aenter__(self) -> "UnitOfWork":
+        self._token = _current_unit_of_work.set(self)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        _current_unit_of_work.reset(self._token)
+        await self._finish(commit=exc_type is None)
+
+
+def _recent_write_key(user_id: int) -> str:
+    return f"recent_write:{user_id}"
+
+
+def _pool_usage(engine: AsyncEngine) -> dict:
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        # Negative until every pooled connection has been opened
+        "overflow": max(pool.overflow(), 0),
+    }
+
 
-from app.config import DB_CONFIGS, Base
+async def _call(callback):
+    if inspect.isawaitable(result := callback()):
+        await result
 
 
 class DatabaseManager:
@@ -32,32 +225,234 @@ class DatabaseManager:
         self.database = database
         self.initialized = True
         self.engine = None
+        self.replica_hosts = DB_CONFIGS["replica_hosts"]
+        self.replica_engines: list[AsyncEngine] = []
+        self._next_replica = 0
+        self.pool_wait = PoolWaitMetrics()
+        # Statements executed per outcome of the compiled SQL cache
+        self.statement_cache = {"hits": 0, "misses": 0, "uncached": 0}
 
-    def get_url(self, _async: bool = True):
+    def get_url(self, _async: bool = True, host=None, port=None):
+        host = host or self.host
+        port = port or self.port
         if not _async:
             return (
                 f"postgresql://"
                 f"{self.user}:"
                 f"{self.password}@"
-                f"{self.host}:"
-                f"{self.port}/{self.database}"
+                f"{host}:"
+                f"{port}/{self.database}"
             )
 
         return (
             f"postgresql+asyncpg://"
             f"{self.user}:"
             f"{self.password}@"
-            f"{self.host}:"
-            f"{self.port}/"
+            f"{host}:"
+            f"{port}/"
             f"{self.database}"
         )
 
+    def get_engine_options(self) -> dict:
+        connect_args = {
+            # asyncpg statements prepared and kept by each connection
+            "prepared_statement_cache_size": DB_CONFIGS[
+                "statement_cache_size"
+            ],
+        }
+        if DB_CONFIGS["statement_timeout"] > 0:
+            connect_args["server_settings"] = {
+                "statement_timeout": str(DB_CONFIGS["statement_timeout"])
+            }
+
+        return {
+            "pool_size": DB_CONFIGS["pool_size"],
+            "max_overflow": DB_CONFIGS["max_overflow"],
+            "pool_timeout": DB_CONFIGS["pool_timeout"],
+            "pool_recycle": DB_CONFIGS["pool_recycle"],
+            "pool_pre_ping": DB_CONFIGS["pool_pre_ping"],
+            "query_cache_size": DB_CONFIGS["query_cache_size"],
+            "connect_args": connect_args,
+        }
+
     async def connect(self):
         self.engine = create_async_engine(
-            self.get_url(), pool_size=DB_CONFIGS["pool_size"]
+            self.get_url(), **self.get_engine_options()
         )
-        async with self.engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
+        for replica in self.replica_hosts:
+            host, _, port = replica.partition(":")
+            self.replica_engines.append(
+                create_async_engine(
+                    self.get_url(host=host, port=port),
+                    **self.get_engine_options(),
+                )
+            )
+        if self.replica_engines and not state_backend.shared:
+            logger.warning(
+                "Read replicas are enabled but recent writes are tracked "
+                "per process, users may not read their own writes when "
+                "served by another process; use a shared STATE_CACHE_BACKEND"
+            )
+
+        for engine in (self.engine, *self.replica_engines):
+            event.listen(
+                engine.sync_engine,
+                "before_cursor_execute",
+                self._before_cursor_execute,
+            )
+            event.listen(
+                engine.sync_engine,
+                "after_cursor_execute",
+                self._after_cursor_execute,
+            )
+
+    def _before_cursor_execute(
+        self, conn, cursor, statement, parameters, context, many
+    ):
+        # The execution context is per statement, unlike the connection
+        context._metrics_started = time.perf_counter()
+
+    def _after_cursor_execute(
+        self, conn, cursor, statement, parameters, context, many
+    ):
+        if (metrics := current_request_metrics()) is not None:
+            metrics.statements += 1
+            metrics.db_time += time.perf_counter() - context._metrics_started
+
+        if context.isinsert or context.isupdate or context.isdelete:
+            conn.info[WROTE_KEY] = True
+
+        if context.cache_hit == CACHE_HIT:
+            self.statement_cache["hits"] += 1
+        elif context.cache_hit == CACHE_MISS:
+            self.statement_cache["misses"] += 1
+        else:
+            self.statement_cache["uncached"] += 1
+
+    def next_replica(self) -> AsyncEngine:
+        """Pick the replicas in turn."""
+        replica = self.replica_engines[self._next_replica]
+        self._next_replica = (self._next_replica + 1) % len(
+            self.replica_engines
+        )
+        return replica
+
+    async def wrote_recently(self, user_id: int | None) -> bool:
+        """Whether the user wrote within the read-your-writes window."""
+        if user_id is None:
+            return False
+        return await state_backend.get(_recent_write_key(user_id)) is not None
+
+    async def record_write(self, user_id: int | None):
+        window = DB_CONFIGS["read_your_writes_window"]
+        if user_id is None or not self.replica_engines or window <= 0:
+            return
+        await state_backend.set(_recent_write_key(user_id), b"1", window)
+
+    async def checkout(self, engine: AsyncEngine = None) -> AsyncConnection:
+        """Check a connection out of the pool, recording the wait."""
+        start = time.perf_counter()
+        try:
+            connection = await (engine or self.engine).connect()
+        except PoolTimeoutError:
+            self.pool_wait.timeouts += 1
+            logger.error("Timed out waiting for a database connection")
+            raise
+        waited = time.perf_counter() - start
+        self.pool_wait.observe(waited)
+        if (metrics := current_request_metrics()) is not None:
+            metrics.connections += 1
+            metrics.pool_wait += waited
+        return connection
+
+    def pool_stats(self) -> dict:
+        return {
+            **_pool_usage(self.engine),
+            "max_overflow": DB_CONFIGS["max_overflow"],
+            "wait": self.pool_wait.stats(),
+            "replicas": [
+                {"host": host, **_pool_usage(engine)}
+                for host, engine in zip(
+                    self.replica_hosts, self.replica_engines
+                )
+            ],
+        }
+
+    def statement_stats(self) -> dict:
+        """Report how often statements skipped compilation.
+
+        A cache hit reuses the SQL string of an earlier execution, which
+        also lets asyncpg reuse the statement it prepared for it on that
+        connection.
+        """
+        compiled_cache = self.engine.sync_engine._compiled_cache
+        return {
+            **self.statement_cache,
+            "compiled_cache_entries": len(compiled_cache or ()),
+            "query_cache_size": DB_CONFIGS["query_cache_size"],
+            "prepared_statement_cache_size": DB_CONFIGS[
+                "statement_cache_size"
+            ],
+        }
+
+    @asynccontextmanager
+    async def begin(self, readonly: bool = False):
+        """Yield the connection of the current unit of work.
+
+        Outside of a request, e.g. in seeders and background tasks, the
+        outermost call starts a unit of work of its own which nested
+        calls share, and which commits when that call exits.
+
+        ``readonly`` work may be served by a replica.
+        """
+        if (unit_of_work := _current_unit_of_work.get()) is not None:
+            yield await unit_of_work.connection(readonly)
+            return
+
+        async with UnitOfWork(self) as unit_of_work:
+            yield await unit_of_work.connection(readonly)
+
+    @staticmethod
+    def set_user(user_id: int):
+        """Attribute the current unit of work to ``user_id``.
+
+        The user's reads then follow their own writes for the
+        read-your-writes window instead of going to a lagging replica.
+        """
+        if (unit_of_work := _current_unit_of_work.get()) is not None:
+            unit_of_work.user_id = user_id
+
+    async def after_commit(self, callback):
+        """Run ``callback`` once the current unit of work has committed.
+
+        Outside of a unit of work there is nothing left to commit and the
+        callback runs right away.
+        """
+        if (unit_of_work := _current_unit_of_work.get()) is not None:
+            unit_of_work.after_commit(callback)
+        else:
+            await _call(callback)
+
+    async def release(self):
+        """Return the connection of the current unit of work to the pool.
+
+        For requests which go on with slow work that needs no database.
+        """
+        if (unit_of_work := _current_unit_of_work.get()) is not None:
+            await unit_of_work.release()
 
     async def disconnect(self):
         await self.engine.dispose()
+        for replica in self.replica_engines:
+            await replica.dispose()
+        self.replica_engines = []
+
+
+async def unit_of_work():
+    """Request dependency sharing one unit of work across repositories.
+
+    FastAPI exits dependencies before sending the response, so a request
+    is only answered once its writes are committed.
+    """
+    async with UnitOfWork(DatabaseManager._instance):
+        yield
@@ -18,3 +18,9 @@ class NotEnoughPermissionsError(Exception):
     def __init__(self, message: str = "Not enough permissions"):
         self.message = message
         super().__init__(self.message)
+
+
+class InvalidCursorError(Exception):
+    def __init__(self, message: str = "Invalid pagination cursor"):
+        self.message = message
+        super().__init__(self.message)
@@ -0,0 +1,46 @@
+from pydantic import BaseModel, Field
+
+
+class PoolWaitStatsModel(BaseModel):
+    count: int = Field(..., description="Connections checked out")
+    sum: float = Field(..., description="Seconds spent waiting in total")
+    max: float = Field(..., description="Longest wait in seconds")
+    timeouts: int = Field(..., description="Checkouts which timed out")
+    buckets: dict[str, int] = Field(
+        ...,
+        description="Checkouts which waited at most each bound in seconds",
+    )
+
+
+class StatementStatsResponseModel(BaseModel):
+    hits: int = Field(..., description="Executions with cached SQL")
+    misses: int = Field(..., description="Executions which compiled SQL")
+    uncached: int = Field(..., description="Executions not cacheable")
+    compiled_cache_entries: int = Field(
+        ..., description="SQL strings in the compiled cache"
+    )
+    query_cache_size: int = Field(
+        ..., description="Capacity of the compiled cache"
+    )
+    prepared_statement_cache_size: int = Field(
+        ..., description="Prepared statements kept per connection"
+    )
+
+
+class PoolUsageModel(BaseModel):
+    size: int = Field(..., description="Connections kept in the pool")
+    checked_out: int = Field(..., description="Connections in use")
+    checked_in: int = Field(..., description="Idle connections")
+    overflow: int = Field(..., description="Connections beyond the size")
+
+
+class ReplicaPoolStatsModel(PoolUsageModel):
+    host: str = Field(..., description="Host of the replica")
+
+
+class PoolStatsResponseModel(PoolUsageModel):
+    max_overflow: int = Field(..., description="Allowed overflow")
+    wait: PoolWaitStatsModel
+    replicas: list[ReplicaPoolStatsModel] = Field(
+        default_factory=list, description="Pools of the read replicas"
+    )
@@ -0,0 +1,8 @@
+from app.permissions.models import PermissionCreateModel
+
+PERMISSIONS = [
+    PermissionCreateModel(
+        name="read_internal_stats",
+        description="Read the runtime statistics of the application",
+    ),
+]
@@ -0,0 +1,67 @@
+import asyncio
+from typing import Optional
+
+from loguru import logger
+
+from app.config import DB_CONFIGS
+from app.database import DatabaseManager
+
+
+class PoolStatsReporter:
+    """Periodically logs the connection pool and statement statistics."""
+
+    def __init__(
+        self, interval: float = DB_CONFIGS["pool_stats_interval"]
+    ) -> None:
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def report(self):
+        db_instance = DatabaseManager._instance
+        stats = db_instance.pool_stats()
+        wait = stats["wait"]
+        average = wait["sum"] / wait["count"] if wait["count"] else 0.0
+        logger.info(
+            f"Database pool: checked_out={stats['checked_out']} "
+            f"checked_in={stats['checked_in']} "
+            f"overflow={stats['overflow']}/{stats['max_overflow']} "
+            f"wait_avg={average:.4f}s wait_max={wait['max']:.4f}s "
+            f"timeouts={wait['timeouts']} buckets={wait['buckets']}"
+        )
+
+        statements = db_instance.statement_stats()
+        logger.info(
+            f"Statement cache: hits={statements['hits']} "
+            f"misses={statements['misses']} "
+            f"uncached={statements['uncached']} "
+            f"entries={statements['compiled_cache_entries']}"
+        )
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.report()
+            except Exception as e:
+                logger.error(f"Error reporting pool stats: {e=}")
+
+    def start(self):
+        if self.interval <= 0:
+            return
+
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+pool_stats_reporter = PoolStatsReporter()
@@ -0,0 +1,67 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from app.database import DatabaseManager
+from app.internal.models import (
+    PoolStatsResponseModel,
+    StatementStatsResponseModel,
+)
+from app.metrics import request_metrics
+from app.permissions.utils import allowed_permissions
+from app.users.hashing import password_hasher
+
+router = APIRouter(prefix="/api/v1/internal", tags=["Internal"])
+
+
+@router.get(
+    "/pool-stats",
+    response_model=PoolStatsResponseModel,
+    dependencies=[
+        Depends(allowed_permissions(["read_internal_stats"])),
+    ],
+    openapi_extra={
+        "security": [
+            {"cookieAuth": [], "oauth2Auth": []},
+        ]
+    },
+)
+async def get_pool_stats():
+    return DatabaseManager._instance.pool_stats()
+
+
+@router.get(
+    "/statement-stats",
+    response_model=StatementStatsResponseModel,
+    dependencies=[
+        Depends(allowed_permissions(["read_internal_stats"])),
+    ],
+    openapi_extra={
+        "security": [
+            {"cookieAuth": [], "oauth2Auth": []},
+        ]
+    },
+)
+async def get_statement_stats():
+    return DatabaseManager._instance.statement_stats()
+
+
+@router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    dependencies=[
+        Depends(allowed_permissions(["read_internal_stats"])),
+    ],
+    openapi_extra={
+        "security": [
+            {"cookieAuth": [], "oauth2Auth": []},
+        ]
+    },
+)
+async def get_metrics():
+    """Per-route request metrics in the Prometheus text format."""
+    return PlainTextResponse(
+        request_metrics.render(
+            DatabaseManager._instance.pool_stats(), password_hasher.stats()
+        ),
+        media_type="text/plain; version=0.0.4",
+    )
@@ -0,0 +1,347 @@
+"""Bulk load synthetic users, products, carts and addresses with COPY.
+
+    python -m app.loadtest.generator --users 100000 --products 1000000
+
+Rows are built from the columns of the schema classes and streamed to
+Postgres in batches. Users are named ``<prefix>_<n>`` and share the
+password ``PASSWORD``, so that the load harness can log in as them; use
+another prefix to load more rows into the same database. Ids are
+reserved from the table sequences up front, run it against a database
+nobody else writes to.
+"""
+
+import argparse
+import asyncio
+import datetime
+import random
+from typing import Iterable, Iterator
+
+from loguru import logger
+from sqlalchemy import Table, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+import app.main  # noqa: F401, registers every model on Base.metadata
+from app.address.schema import Address
+from app.cart.schema import Cart, CartItems, CartStatus
+from app.categories.schema import Category
+from app.database import DatabaseManager
+from app.products.schema import Product
+from app.roles.schema import Role
+from app.users.schema import User
+from app.users.utils import hash_password
+
+PASSWORD = "loadtest123"
+
+WORDS = (
+    "alpha amber arctic azure bold bright cedar classic cobalt compact "
+    "copper crimson crystal deluxe eco elite ember fresh golden granite "
+    "indigo ivory jade lunar maple marble mini modern nova onyx orbit "
+    "pearl pine pixel prime pro quartz rapid royal ruby sage silver slim "
+    "smart solar sonic steel storm swift titan ultra velvet vivid zen"
+).split()
+
+TAGS = (
+    "audio books camera fashion fitness garden gaming home kitchen "
+    "laptop mobile music office outdoor pets phone sports tablet toys "
+    "travel tv watch"
+).split()
+
+CITIES = (
+    ("Mumbai", "Maharashtra"),
+    ("Pune", "Maharashtra"),
+    ("Delhi", "Delhi"),
+    ("Bengaluru", "Karnataka"),
+    ("Chennai", "Tamil Nadu"),
+    ("Kolkata", "West Bengal"),
+    ("Jaipur", "Rajasthan"),
+    ("Hyderabad", "Telangana"),
+)
+
+
+def copy_columns(table: Table) -> list[str]:
+    """Columns COPY writes, generated columns are computed by Postgres."""
+    return [column.name for column in table.columns if column.computed is None]
+
+
+async def reserve_ids(connection: AsyncConnection, table: Table, count: int):
+    """Advance the id sequence of ``table`` by ``count``, return the first."""
+    last = await connection.scalar(
+        text(
+            "SELECT setval(pg_get_serial_sequence(:table, 'id'), "
+            "nextval(pg_get_serial_sequence(:table, 'id')) + :count - 1)"
+        ),
+        {"table": table.name, "count": count},
+    )
+    return last - count + 1
+
+
+async def copy_rows(
+    connection: AsyncConnection,
+    table: Table,
+    rows: Iterable[dict],
+    batch_size: int,
+) -> int:
+    """Stream ``rows`` into ``table`` with COPY, return how many."""
+    columns = copy_columns(table)
+    raw_connection = await connection.get_raw_connection()
+    driver_connection = raw_connection.driver_connection
+
+    count = 0
+    batch = []
+    for row in rows:
+        batch.append(tuple(row[column] for column in columns))
+        if len(batch) >= batch_size:
+            await driver_connection.copy_records_to_table(
+                table.name, records=batch, columns=columns
+            )
+            count += len(batch)
+            batch = []
+            logger.info(f"Copied {count} rows into {table.name}")
+
+    if batch:
+        await driver_connection.copy_records_to_table(
+            table.name, records=batch, columns=columns
+        )
+        count += len(batch)
+    logger.info(f"Copied {count} rows into {table.name}")
+    return count
+
+
+class DataGenerator:
+    """Generates related rows for every table the API reads at scale.
+
+    One in ``sellers_every`` users is a seller and owns products, the
+    others are customers owning carts and addresses.
+    """
+
+    def __init__(
+        self,
+        users: int = 10_000,
+        products: int = 100_000,
+        categories: int = 50,
+        carts: int = 20_000,
+        max_items_per_cart: int = 10,
+        max_addresses_per_user: int = 3,
+        sellers_every: int = 100,
+        prefix: str = "load",
+        seed: int = 0,
+        batch_size: int = 10_000,
+    ) -> None:
+        self.users = users
+        self.products = products
+        self.categories = categories
+        self.carts = carts
+        self.max_items_per_cart = max_items_per_cart
+        self.max_addresses_per_user = max_addresses_per_user
+        self.sellers_every = sellers_every
+        self.prefix = prefix
+        self.batch_size = batch_size
+        self.random = random.Random(seed)
+        self.now = datetime.datetime.now(tz=datetime.timezone.utc)
+
+    def _words(self, count: int) -> str:
+        return " ".join(self.random.choices(WORDS, k=count))
+
+    def _is_seller(self, n: int) -> bool:
+        return n % self.sellers_every == 0
+
+    def category_rows(self, first_id: int) -> Iterator[dict]:
+        for n in range(self.categories):
+            yield {"id": first_id + n, "name": f"{self.prefix}_category_{n}"}
+
+    def user_rows(self, first_id: int, roles: dict, password: str):
+        for n in range(self.users):
+            role = "seller" if self._is_seller(n) else "customer"
+            yield {
+                "id": first_id + n,
+                "username": f"{self.prefix}_{n}",
+                "password": password,
+                "email": f"{self.prefix}_{n}@example.com",
+                "full_name": self._words(2).title(),
+                "role_id": roles[role],
+                "phone": f"9{self.random.randrange(10**9):09d}",
+                "created_at": self.now,
+                "is_internal_user": False,
+                "date_joined": self.now,
+                "last_active": self.now,
+            }
+
+    def product_rows(self, first_id: int, sellers, categories):
+        for n in range(self.products):
+            id = first_id + n
+            price = round(self.random.uniform(10, 100_000), 2)
+            yield {
+                "id": id,
+                "name": self._words(3).title(),
+                "description": self._words(20),
+                "user_id": self.random.choice(sellers),
+                "price": price,
+                "slug": f"{self.prefix}-product-{id}",
+                "tags": ",".join(self.random.sample(TAGS, k=3)),
+                "discount": round(
+                    price * self.random.choice((0, 0.05, 0.1)), 2
+                ),
+                "tax": round(price * 0.18, 2),
+                "stock": self.random.randrange(1000),
+                "category_id": self.random.choice(categories),
+                "is_active": self.random.random() > 0.05,
+            }
+
+    def address_counts(self, customers) -> list[int]:
+        return [
+            self.random.randint(0, self.max_addresses_per_user)
+            for _ in customers
+        ]
+
+    def address_rows(self, first_id: int, customers, counts):
+        id = first_id
+        for user_id, count in zip(customers, counts):
+            for n in range(count):
+                city, state = self.random.choice(CITIES)
+                yield {
+                    "id": id,
+                    "user_id": user_id,
+                    "name": ("home", "office", "other")[n % 3],
+                    "address": f"{self.random.randint(1, 999)} "
+                    f"{self._words(2).title()} Road",
+                    "city": city,
+                    "state": state,
+                    "pincode": f"{self.random.randrange(10**6):06d}",
+                    "country": "India",
+                }
+                id += 1
+
+    def cart_rows(self, first_id: int, customers):
+        statuses = list(CartStatus)
+        for n in range(self.carts):
+            status = self.random.choices(statuses, weights=(6, 2, 2))[0]
+            reminder = self.now + datetime.timedelta(
+                days=self.random.randint(-10, 10)
+            )
+            yield {
+                "id": first_id + n,
+                "user_id": self.random.choice(customers),
+                "name": f"Cart {n}",
+                "reminder_date": (
+                    None if status is CartStatus.ABANDONED else reminder
+                ),
+                "status": status.name,
+            }
+
+    def cart_item_counts(self) -> list[int]:
+        return [
+            self.random.randint(1, self.max_items_per_cart)
+            for _ in range(self.carts)
+        ]
+
+    def cart_item_rows(self, first_id, first_cart_id, counts, products):
+        id = first_id
+        for n, count in enumerate(counts):
+            for product_id in self.random.sample(products, k=count):
+                yield {
+                    "id": id,
+                    "cart_id": first_cart_id + n,
+                    "product_id": product_id,
+                    "quantity": self.random.randint(1, 5),
+                }
+                id += 1
+
+    async def _load(self, table: Table, count: int, make_rows) -> range:
+        """Reserve ``count`` ids of ``table`` and copy the rows made."""
+        if count == 0:
+            return range(0)
+
+        db_instance = DatabaseManager._instance
+        async with db_instance.engine.begin() as connection:
+            first_id = await reserve_ids(connection, table, count)
+            await copy_rows(
+                connection, table, make_rows(first_id), self.batch_size
+            )
+        return range(first_id, first_id + count)
+
+    async def run(self):
+        db_instance = DatabaseManager._instance
+        async with db_instance.engine.connect() as connection:
+            result = await connection.execute(select(Role.name, Role.id))
+            roles = {row.name: row.id for row in result}
+
+        # Every user shares one hash, hashing each password would take hours
+        password = await hash_password(PASSWORD)
+
+        category_ids = await self._load(
+            Category.__table__, self.categories, self.category_rows
+        )
+        user_ids = await self._load(
+            User.__table__,
+            self.users,
+            lambda first_id: self.user_rows(first_id, roles, password),
+        )
+        sellers = [id for n, id in enumerate(user_ids) if self._is_seller(n)]
+        customers = [
+            id for n, id in enumerate(user_ids) if not self._is_seller(n)
+        ]
+
+        product_ids = await self._load(
+            Product.__table__,
+            self.products,
+            lambda first_id: self.product_rows(
+                first_id, sellers, category_ids
+            ),
+        )
+        address_counts = self.address_counts(customers)
+        await self._load(
+            Address.__table__,
+            sum(address_counts),
+            lambda first_id: self.address_rows(
+                first_id, customers, address_counts
+            ),
+        )
+
+        cart_ids = await self._load(
+            Cart.__table__,
+            self.carts,
+            lambda first_id: self.cart_rows(first_id, customers),
+        )
+        counts = self.cart_item_counts()
+        await self._load(
+            CartItems.__table__,
+            sum(counts),
+            lambda first_id: self.cart_item_rows(
+                first_id, cart_ids.start, counts, product_ids
+            ),
+        )
+
+        # Give the planner statistics for the new rows right away
+        async with db_instance.engine.connect() as connection:
+            connection = await connection.execution_options(
+                isolation_level="AUTOCOMMIT"
+            )
+            for table in (Category, User, Product, Address, Cart, CartItems):
+                await connection.execute(
+                    text(f"ANALYZE {table.__tablename__}")
+                )
+        logger.info("Generated the load test data")
+
+
+async def main(arguments: argparse.Namespace):
+    database_manager = DatabaseManager()
+    await database_manager.connect()
+    try:
+        await DataGenerator(**vars(arguments)).run()
+    finally:
+        await database_manager.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m app.loadtest.generator")
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--categories", type=int, default=50)
+    parser.add_argument("--carts", type=int, default=20_000)
+    parser.add_argument("--max-items-per-cart", type=int, default=10)
+    parser.add_argument("--max-addresses-per-user", type=int, default=3)
+    parser.add_argument("--sellers-every", type=int, default=100)
+    parser.add_argument("--prefix", default="load")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    asyncio.run(main(parser.parse_args()))
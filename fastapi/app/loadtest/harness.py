@@ -0,0 +1,324 @@
+"""Replay a mix of shopper sessions against the API and report latency.
+
+    python -m app.loadtest.harness --duration 60 --concurrency 32
+    python -m app.loadtest.harness --url http://localhost:5000
+
+Without ``--url`` the application runs in process, behind an ASGI
+transport. Virtual users log in as the users made by
+``app.loadtest.generator``, or as the seeded customer when ``--users``
+is 0, then pick actions by the weights of ``--mix`` until the duration
+is over. Latency percentiles and throughput are reported per route.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import math
+import random
+import time
+from collections import defaultdict
+from typing import Optional
+
+from asgi_lifespan import LifespanManager
+from httpx import ASGITransport, AsyncClient
+
+from app.loadtest.generator import PASSWORD, WORDS
+from app.main import app
+
+DEFAULT_MIX = "browse=60,search=10,cart=20,login=10"
+
+
+def percentile(values: list[float], percent: float) -> float:
+    """Nearest-rank percentile of sorted ``values``."""
+    if not values:
+        return 0.0
+    rank = math.ceil(percent / 100 * len(values))
+    return values[max(rank - 1, 0)]
+
+
+class Recorder:
+    """Collects the latency and status of every request, per route."""
+
+    def __init__(self) -> None:
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+
+    async def request(
+        self, client: AsyncClient, route: str, method, url, **kw
+    ):
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kw)
+        except Exception:
+            self.errors[route] += 1
+            raise
+        finally:
+            self.latencies[route].append(time.perf_counter() - start)
+
+        if response.status_code >= 400:
+            self.errors[route] += 1
+        return response
+
+    def report(self) -> dict:
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        routes = {}
+        for route, latencies in sorted(self.latencies.items()):
+            latencies = sorted(latencies)
+            routes[route] = {
+                "requests": len(latencies),
+                "errors": self.errors[route],
+                "throughput": len(latencies) / elapsed,
+                "p50": percentile(latencies, 50),
+                "p95": percentile(latencies, 95),
+                "p99": percentile(latencies, 99),
+                "max": latencies[-1],
+            }
+        return {
+            "elapsed": elapsed,
+            "requests": sum(route["requests"] for route in routes.values()),
+            "errors": sum(route["errors"] for route in routes.values()),
+            "routes": routes,
+        }
+
+
+def format_report(report: dict) -> str:
+    lines = [
+        f"{'route':<40} {'reqs':>7} {'errs':>5} {'req/s':>8} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    ]
+    for route, stats in report["routes"].items():
+        lines.append(
+            f"{route:<40} {stats['requests']:>7} {stats['errors']:>5} "
+            f"{stats['throughput']:>8.1f} {stats['p50'] * 1000:>8.1f} "
+            f"{stats['p95'] * 1000:>8.1f} {stats['p99'] * 1000:>8.1f}"
+        )
+    lines.append(
+        f"{report['requests']} requests, {report['errors']} errors in "
+        f"{report['elapsed']:.1f}s, "
+        f"{report['requests'] / report['elapsed']:.1f} req/s"
+    )
+    return "\n".join(lines)
+
+
+class VirtualUser:
+    """A shopper with its own token, cart and random choices."""
+
+    def __init__(
+        self,
+        client: AsyncClient,
+        recorder: Recorder,
+        rng: random.Random,
+        username: str,
+        password: str,
+        products: list[dict],
+    ) -> None:
+        self.client = client
+        self.recorder = recorder
+        self.random = rng
+        self.username = username
+        self.password = password
+        self.products = products
+        self.headers: dict = {}
+        self.cart_id: Optional[int] = None
+
+    async def login(self):
+        response = await self.recorder.request(
+            self.client,
+            "POST /api/v1/users/login",
+            "POST",
+            "/api/v1/users/login",
+            data={"username": self.username, "password": self.password},
+        )
+        if response.status_code == 200:
+            token = response.json()["access_token"]
+            self.headers = {"Authorization": f"Bearer {token}"}
+
+    async def browse(self):
+        params = {"page": self.random.randint(1, 20), "page_size": 20}
+        if self.products and self.random.random() < 0.5:
+            product = self.random.choice(self.products)
+            params["category_id"] = product["category_id"]
+        await self.recorder.request(
+            self.client,
+            "GET /api/v1/product",
+            "GET",
+            "/api/v1/product",
+            params=params,
+        )
+        if self.random.random() < 0.2:
+            await self.recorder.request(
+                self.client,
+                "GET /api/v1/product/facets",
+                "GET",
+                "/api/v1/product/facets",
+                params={k: v for k, v in params.items() if "page" not in k},
+            )
+
+    async def search(self):
+        await self.recorder.request(
+            self.client,
+            "GET /api/v1/product?q",
+            "GET",
+            "/api/v1/product",
+            params={"q": self.random.choice(WORDS), "page_size": 20},
+        )
+
+    async def cart(self):
+        if not self.products:
+            return
+        if self.cart_id is None:
+            response = await self.recorder.request(
+                self.client,
+                "POST /api/v1/cart/create",
+                "POST",
+                "/api/v1/cart/create",
+                json={"name": "Load test"},
+                headers=self.headers,
+            )
+            if response.status_code != 201:
+                return
+            self.cart_id = response.json()["id"]
+
+        product = self.random.choice(self.products)
+        await self.recorder.request(
+            self.client,
+            "POST /api/v1/cart/add-item",
+            "POST",
+            "/api/v1/cart/add-item",
+            json={
+                "cart_id": self.cart_id,
+                "product_id": product["id"],
+                "quantity": 1,
+            },
+            headers=self.headers,
+        )
+        await self.recorder.request(
+            self.client,
+            "GET /api/v1/cart/totals/{cart_id}",
+            "GET",
+            f"/api/v1/cart/totals/{self.cart_id}",
+            headers=self.headers,
+        )
+        if self.random.random() < 0.3:
+            await self.recorder.request(
+                self.client,
+                "GET /api/v1/cart",
+                "GET",
+                "/api/v1/cart",
+                params={"get_items": True},
+                headers=self.headers,
+            )
+
+    async def run(self, deadline: float, actions: list[str], weights):
+        await self.login()
+        while time.perf_counter() < deadline:
+            action = self.random.choices(actions, weights=weights)[0]
+            try:
+                await getattr(self, action)()
+            except Exception:
+                # Already counted as an error of its route
+                pass
+
+
+def parse_mix(mix: str) -> dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        action, _, weight = part.partition("=")
+        if action not in ("browse", "search", "cart", "login"):
+            raise ValueError(f"Unknown action {action}")
+        weights[action] = float(weight or 1)
+    return weights
+
+
+async def sample_products(client: AsyncClient) -> list[dict]:
+    response = await client.get(
+        "/api/v1/product", params={"page_size": 100, "with_total": False}
+    )
+    response.raise_for_status()
+    return response.json()["items"]
+
+
+async def run(
+    url: Optional[str] = None,
+    duration: float = 30,
+    concurrency: int = 16,
+    mix: str = DEFAULT_MIX,
+    users: int = 0,
+    prefix: str = "load",
+    sellers_every: int = 100,
+    seed: int = 0,
+) -> dict:
+    """Run the load test and return its report."""
+    weights = parse_mix(mix)
+    rng = random.Random(seed)
+
+    async with contextlib.AsyncExitStack() as stack:
+        if url:
+            client = AsyncClient(base_url=url, timeout=30)
+        else:
+            manager = await stack.enter_async_context(LifespanManager(app))
+            client = AsyncClient(
+                transport=ASGITransport(app=manager.app),
+                base_url="http://loadtest",
+                timeout=30,
+            )
+        await stack.enter_async_context(client)
+
+        products = await sample_products(client)
+        recorder = Recorder()
+        deadline = time.perf_counter() + duration
+        virtual_users = []
+        for _ in range(concurrency):
+            if users:
+                # Sellers own no carts, log in as the customer next to them
+                n = rng.randrange(users)
+                if n % sellers_every == 0 and n + 1 < users:
+                    n += 1
+                credentials = (f"{prefix}_{n}", PASSWORD)
+            else:
+                credentials = ("customer", "customer123")
+            virtual_users.append(
+                VirtualUser(
+                    client,
+                    recorder,
+                    random.Random(rng.random()),
+                    *credentials,
+                    products,
+                )
+            )
+
+        await asyncio.gather(
+            *(
+                user.run(deadline, list(weights), list(weights.values()))
+                for user in virtual_users
+            )
+        )
+        recorder.finished = time.perf_counter()
+
+    return recorder.report()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m app.loadtest.harness")
+    parser.add_argument("--url", help="test a running server instead")
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument(
+        "--users", type=int, default=0, help="users made by the generator"
+    )
+    parser.add_argument("--prefix", default="load")
+    parser.add_argument("--sellers-every", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the report to this file")
+    arguments = vars(parser.parse_args())
+    output = arguments.pop("json")
+
+    report = asyncio.run(run(**arguments))
+    print(format_report(report))
+    if output:
+        with open(output, "w") as file:
+            json.dump(report, file, indent=2)
@@ -2,7 +2,7 @@ import os
 from contextlib import asynccontextmanager
 from http import HTTPStatus
 
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.exceptions import RequestValidationError, ResponseValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
@@ -10,18 +10,23 @@ from loguru import logger
 from pydantic import ValidationError
 
 from app.address.router import router as address_router
+from app.cache import cache_backend, state_backend
+from app.cart.pricing import cart_pricing
 from app.cart.router import router as cart_router
+from app.cart.sweeper import abandoned_cart_sweeper
 from app.categories.router import router as category_router
 from app.config import APP_CONFIGS, SHARED_FOLDER
-from app.database import DatabaseManager
+from app.database import DatabaseManager, unit_of_work
+from app.internal.reporter import pool_stats_reporter
+from app.internal.router import router as internal_router
+from app.metrics import MetricsMiddleware
 from app.permissions.router import router as permissions_router
-from app.permissions.seeder import Seeder as PermissionSeeder
 from app.products.router import router as products_router
 from app.roles.router import router as roles_router
-from app.roles.seeder import Seeder as RoleSeeder
+from app.seeding.runner import run_seeders
 from app.subcategories.router import router as subcategory_router
+from app.users.hashing import password_hasher
 from app.users.router import router as users_router
-from app.users.seeder import Seeder as UserSeeder
 
 
 @asynccontextmanager
@@ -32,15 +37,25 @@ async def lifespan(app):
     await database_manager.connect()
 
     logger.info("Seeding database")
-    await PermissionSeeder().run()
-    await RoleSeeder().run()
-    await UserSeeder().run()
+    await run_seeders()
 
     os.makedirs(SHARED_FOLDER, exist_ok=True)
+    if not cart_pricing.enabled:
+        logger.warning(
+            "Cart totals are not cached, caching them needs shared "
+            "RESPONSE_CACHE_BACKEND and STATE_CACHE_BACKEND"
+        )
+    abandoned_cart_sweeper.start()
+    pool_stats_reporter.start()
     yield
 
     logger.info("Stopping application")
+    await abandoned_cart_sweeper.stop()
+    await pool_stats_reporter.stop()
     await database_manager.disconnect()
+    await cache_backend.close()
+    await state_backend.close()
+    password_hasher.shutdown()
 
 
 app = FastAPI(
@@ -51,6 +66,8 @@ app = FastAPI(
     docs_url="/api/docs",
     redoc_url="/api/redoc",
     lifespan=lifespan,
+    # One unit of work per request, shared by repositories
+    dependencies=[Depends(unit_of_work)],
 )
 
 app.add_middleware(
@@ -60,6 +77,8 @@ app.add_middleware(
     allow_methods=APP_CONFIGS["allow_methods"],
     allow_headers=APP_CONFIGS["allow_headers"],
 )
+# Added last so that it wraps every other middleware
+app.add_middleware(MetricsMiddleware)
 
 app.get(
     "/api/v1/welcome",
@@ -78,6 +97,7 @@ app.include_router(router=category_router)
 app.include_router(router=subcategory_router)
 app.include_router(router=products_router)
 app.include_router(router=cart_router)
+app.include_router(router=internal_router)
 
 
 # Define exception handlers
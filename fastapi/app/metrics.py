@@ -0,0 +1,276 @@
+import time
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from starlette.datastructures import MutableHeaders
+
+from app.config import METRICS_CONFIGS
+
+# Upper bounds of the histogram buckets, in seconds or in statements
+DURATION_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+class RequestMetrics:
+    """What one request spent, filled in by the database event hooks."""
+
+    __slots__ = (
+        "started",
+        "duration",
+        "statements",
+        "db_time",
+        "connections",
+        "pool_wait",
+    )
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.duration = 0.0
+        self.statements = 0
+        self.db_time = 0.0
+        self.connections = 0
+        self.pool_wait = 0.0
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        return (
+            f'db;dur={self.db_time * 1000:.3f};desc="{self.statements} '
+            f'statements", pool;dur={self.pool_wait * 1000:.3f}, '
+            f"app;dur={self.elapsed() * 1000:.3f}"
+        )
+
+
+# The metrics of the request being served, None outside of requests
+_current_request_metrics: ContextVar[Optional[RequestMetrics]] = ContextVar(
+    "current_request_metrics", default=None
+)
+
+
+def current_request_metrics() -> Optional[RequestMetrics]:
+    return _current_request_metrics.get()
+
+
+class Histogram:
+    """Cumulative histogram in the Prometheus exposition format."""
+
+    def __init__(self, buckets: tuple) -> None:
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+
+    def lines(self, name: str, labels: str) -> Iterator[str]:
+        for bound, count in zip(self.buckets, self.counts):
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {count}'
+        yield f'{name}_bucket{{{labels},le="+Inf"}} {self.count}'
+        yield f"{name}_sum{{{labels}}} {self.sum}"
+        yield f"{name}_count{{{labels}}} {self.count}"
+
+
+class RouteMetrics:
+    def __init__(self) -> None:
+        self.statuses: dict[int, int] = {}
+        self.duration = Histogram(DURATION_BUCKETS)
+        self.statements = Histogram(STATEMENT_BUCKETS)
+        self.db_time = Histogram(DURATION_BUCKETS)
+        self.pool_wait = Histogram(DURATION_BUCKETS)
+        self.connections = 0
+
+
+def _label(value) -> str:
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\n", "\\n")
+    )
+
+
+class RequestMetricsRegistry:
+    """Aggregates request metrics per method and route template.
+
+    Routes are labelled by their template, e.g. ``/api/v1/cart/{cart_id}``,
+    so that the number of series stays bounded.
+    """
+
+    HISTOGRAMS = (
+        (
+            "duration",
+            "http_request_duration_seconds",
+            "Time spent serving requests.",
+        ),
+        (
+            "statements",
+            "http_request_db_statements",
+            "SQL statements executed per request.",
+        ),
+        (
+            "db_time",
+            "http_request_db_duration_seconds",
+            "Time spent executing SQL statements per request.",
+        ),
+        (
+            "pool_wait",
+            "http_request_db_pool_wait_seconds",
+            "Time spent waiting for pool connections per request.",
+        ),
+    )
+
+    def __init__(self) -> None:
+        self.routes: dict[tuple[str, str], RouteMetrics] = {}
+
+    def observe(
+        self, method: str, route: str, status: int, metrics: RequestMetrics
+    ):
+        if (route_metrics := self.routes.get((method, route))) is None:
+            route_metrics = self.routes[(method, route)] = RouteMetrics()
+
+        route_metrics.statuses[status] = (
+            route_metrics.statuses.get(status, 0) + 1
+        )
+        route_metrics.duration.observe(metrics.duration)
+        route_metrics.statements.observe(metrics.statements)
+        route_metrics.db_time.observe(metrics.db_time)
+        route_metrics.pool_wait.observe(metrics.pool_wait)
+        route_metrics.connections += metrics.connections
+
+    def render(
+        self,
+        pool_stats: Optional[dict] = None,
+        password_hash_stats: Optional[dict] = None,
+    ) -> str:
+        """Render every series in the Prometheus text format."""
+        routes = sorted(self.routes.items())
+        lines = [
+            "# HELP http_requests_total Requests served.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route), route_metrics in routes:
+            labels = f'method="{_label(method)}",route="{_label(route)}"'
+            for status, count in sorted(route_metrics.statuses.items()):
+                lines.append(
+                    f'http_requests_total{{{labels},status="{status}"}} '
+                    f"{count}"
+                )
+
+        for attribute, name, description in self.HISTOGRAMS:
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} histogram")
+            for (method, route), route_metrics in routes:
+                labels = f'method="{_label(method)}",route="{_label(route)}"'
+                histogram = getattr(route_metrics, attribute)
+                lines.extend(histogram.lines(name, labels))
+
+        lines.append(
+            "# HELP http_request_db_connections_total "
+            "Connections checked out by requests."
+        )
+        lines.append("# TYPE http_request_db_connections_total counter")
+        for (method, route), route_metrics in routes:
+            labels = f'method="{_label(method)}",route="{_label(route)}"'
+            lines.append(
+                f"http_request_db_connections_total{{{labels}}} "
+                f"{route_metrics.connections}"
+            )
+
+        if pool_stats is not None:
+            for key in ("size", "checked_out", "checked_in", "overflow"):
+                lines.append(f"# TYPE db_pool_{key} gauge")
+                lines.append(f"db_pool_{key} {pool_stats[key]}")
+            lines.append("# TYPE db_pool_timeouts_total counter")
+            lines.append(
+                f"db_pool_timeouts_total {pool_stats['wait']['timeouts']}"
+            )
+
+        if password_hash_stats is not None:
+            for key in ("in_flight", "waiting", "max_concurrency"):
+                lines.append(f"# TYPE password_hash_{key} gauge")
+                lines.append(f"password_hash_{key} {password_hash_stats[key]}")
+            lines.append("# TYPE password_hash_completed_total counter")
+            lines.append(
+                "password_hash_completed_total "
+                f"{password_hash_stats['completed']}"
+            )
+
+        return "\n".join(lines) + "\n"
+
+    def clear(self):
+        self.routes.clear()
+
+
+request_metrics = RequestMetricsRegistry()
+
+
+class MetricsMiddleware:
+    """Records the latency and database work of every HTTP request.
+
+    With ``server_timing``, responses also carry a ``Server-Timing``
+    header with the database and total time spent before the response
+    started.
+    """
+
+    def __init__(
+        self,
+        app,
+        registry: RequestMetricsRegistry = request_metrics,
+        server_timing: bool = METRICS_CONFIGS["server_timing"],
+    ) -> None:
+        self.app = app
+        self.registry = registry
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = RequestMetrics()
+        status = 500
+
+        async def send_with_metrics(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", metrics.server_timing())
+            await send(message)
+
+        token = _current_request_metrics.set(metrics)
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            _current_request_metrics.reset(token)
+            metrics.duration = metrics.elapsed()
+            # The router stores the matched route in the scope
+            route = scope.get("route")
+            self.registry.observe(
+                scope["method"],
+                getattr(route, "path", UNMATCHED_ROUTE),
+                status,
+                metrics,
+            )
@@ -0,0 +1,54 @@
+"""Apply or list the schema migrations, or look for missing indexes.
+
+    python -m app.migrations upgrade [--to VERSION]
+    python -m app.migrations status
+    python -m app.migrations advise [--min-rows ROWS]
+"""
+
+import argparse
+import asyncio
+import sys
+
+import app.main  # noqa: F401, registers every model on Base.metadata
+from app.database import DatabaseManager
+from app.migrations import advisor, runner
+
+
+async def main(arguments: argparse.Namespace):
+    database_manager = DatabaseManager()
+    await database_manager.connect()
+    try:
+        if arguments.command == "upgrade":
+            await runner.upgrade(target=arguments.to)
+        elif arguments.command == "advise":
+            findings = await advisor.advise(min_rows=arguments.min_rows)
+            for finding in findings:
+                print(
+                    f"{finding.scenario}: sequential scan of "
+                    f"{finding.relation} (~{finding.rows} rows), "
+                    f"filter {finding.filter}"
+                )
+            return 1 if findings else 0
+        else:
+            for migration, applied in await runner.status():
+                state = "applied" if applied else "pending"
+                print(f"{migration.version:04d} {migration.name}: {state}")
+    finally:
+        await database_manager.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m app.migrations")
+    commands = parser.add_subparsers(dest="command", required=True)
+    upgrade_parser = commands.add_parser("upgrade", help="apply migrations")
+    upgrade_parser.add_argument(
+        "--to", type=int, help="stop after this version"
+    )
+    commands.add_parser("status", help="list the migrations")
+    advise_parser = commands.add_parser(
+        "advise", help="flag sequential scans of repository queries"
+    )
+    advise_parser.add_argument(
+        "--min-rows", type=int, default=1000, help="ignore smaller tables"
+    )
+    sys.exit(asyncio.run(main(parser.parse_args())))
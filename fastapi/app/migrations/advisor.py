@@ -0,0 +1,218 @@
+"""Flag sequential scans in the plans of the repository queries.
+
+Every scenario calls repository methods with ids sampled from the
+database, in a transaction which is rolled back, while the statements
+they send are recorded. Each recorded statement is then explained, and
+sequential scans of tables with at least ``min_rows`` rows are reported.
+Run it against a database seeded at a realistic scale, on small tables
+Postgres rightly prefers sequential scans.
+"""
+
+import json
+from typing import NamedTuple
+
+from loguru import logger
+from sqlalchemy import event, func, select, text
+
+from app.address.repository import AddressRepository
+from app.address.schema import Address
+from app.cart.pricing import cart_pricing
+from app.cart.repository import CartRepository
+from app.cart.schema import Cart
+from app.database import DatabaseManager, UnitOfWork
+from app.products.repository import ProductRepository
+from app.products.schema import Product
+from app.users.repository import UserRepository
+
+
+class Finding(NamedTuple):
+    scenario: str
+    relation: str
+    rows: int
+    filter: str | None
+    statement: str
+
+
+# Scenario name, the samples it needs and the repository calls it makes
+SCENARIOS = (
+    (
+        "cart.get_all",
+        ("user_id",),
+        lambda s: CartRepository().get_all(s["user_id"]),
+    ),
+    (
+        "cart.get_all without items",
+        ("user_id",),
+        lambda s: CartRepository().get_all(s["user_id"], get_items=False),
+    ),
+    (
+        "cart.get",
+        ("user_id", "cart_id"),
+        lambda s: CartRepository().get(s["user_id"], s["cart_id"]),
+    ),
+    (
+        "cart.totals",
+        ("user_id", "cart_id"),
+        lambda s: cart_pricing.get_totals(s["user_id"], s["cart_id"]),
+    ),
+    (
+        "address.get_all",
+        ("address_user_id",),
+        lambda s: AddressRepository().get_all(s["address_user_id"]),
+    ),
+    (
+        "address.address_limit_reached",
+        ("address_user_id",),
+        lambda s: AddressRepository().address_limit_reached(
+            s["address_user_id"]
+        ),
+    ),
+    (
+        "products.get_products",
+        (),
+        lambda s: ProductRepository().get_products({}),
+    ),
+    (
+        "products.get_products by category",
+        ("category_id",),
+        lambda s: ProductRepository().get_products(
+            {"category_id": s["category_id"]}
+        ),
+    ),
+    (
+        "products.get_products by price",
+        (),
+        lambda s: ProductRepository().get_products(
+            {"sort_by": "price", "sort_order": "desc"}
+        ),
+    ),
+    (
+        "products.get_facets",
+        (),
+        lambda s: ProductRepository().get_facets({}),
+    ),
+    (
+        "users.get_by_id",
+        ("user_id",),
+        lambda s: UserRepository().get_by_id(s["user_id"]),
+    ),
+)
+
+
+class _Rollback(Exception):
+    pass
+
+
+async def get_samples(connection) -> dict:
+    """Pick the ids the scenarios run with, from the busiest owners."""
+    samples = {}
+    row = (
+        await connection.execute(
+            select(Cart.user_id, func.max(Cart.id).label("cart_id"))
+            .group_by(Cart.user_id)
+            .order_by(func.count().desc())
+            .limit(1)
+        )
+    ).fetchone()
+    if row is not None:
+        samples.update(user_id=row.user_id, cart_id=row.cart_id)
+
+    samples["address_user_id"] = await connection.scalar(
+        select(Address.user_id)
+        .group_by(Address.user_id)
+        .order_by(func.count().desc())
+        .limit(1)
+    )
+    samples["category_id"] = await connection.scalar(
+        select(Product.category_id)
+        .group_by(Product.category_id)
+        .order_by(func.count().desc())
+        .limit(1)
+    )
+    return {name: value for name, value in samples.items() if value}
+
+
+def _seq_scans(plan: dict):
+    if plan["Node Type"] == "Seq Scan":
+        yield plan
+    for child in plan.get("Plans", ()):
+        yield from _seq_scans(child)
+
+
+async def _record(db_instance: DatabaseManager, call, samples) -> list:
+    statements = []
+
+    def before_cursor_execute(
+        conn, cursor, statement, parameters, context, many
+    ):
+        if not many and statement.lstrip().upper().startswith(
+            ("SELECT", "WITH", "UPDATE", "DELETE")
+        ):
+            statements.append((statement, tuple(parameters)))
+
+    engines = (db_instance.engine, *db_instance.replica_engines)
+    for engine in engines:
+        event.listen(
+            engine.sync_engine, "before_cursor_execute", before_cursor_execute
+        )
+    try:
+        async with UnitOfWork(db_instance):
+            await call(samples)
+            raise _Rollback()
+    except _Rollback:
+        pass
+    finally:
+        for engine in engines:
+            event.remove(
+                engine.sync_engine,
+                "before_cursor_execute",
+                before_cursor_execute,
+            )
+    return statements
+
+
+async def advise(min_rows: int = 1000) -> list[Finding]:
+    """Run the scenarios and return the sequential scans they cause."""
+    db_instance = DatabaseManager._instance
+    async with db_instance.engine.connect() as connection:
+        samples = await get_samples(connection)
+
+    findings = []
+    row_estimates = {}
+    for name, needs, call in SCENARIOS:
+        if missing := [need for need in needs if need not in samples]:
+            logger.warning(f"Skipping {name}, no data for {missing}")
+            continue
+
+        statements = await _record(db_instance, call, samples)
+        async with db_instance.engine.connect() as connection:
+            for statement, parameters in statements:
+                result = await connection.exec_driver_sql(
+                    f"EXPLAIN (FORMAT JSON) {statement}", parameters
+                )
+                plan = result.scalar()
+                plan = json.loads(plan) if isinstance(plan, str) else plan
+                for scan in _seq_scans(plan[0]["Plan"]):
+                    relation = scan["Relation Name"]
+                    if relation not in row_estimates:
+                        row_estimates[relation] = await connection.scalar(
+                            text(
+                                "SELECT reltuples::bigint FROM pg_class "
+                                "WHERE oid = to_regclass(:table)"
+                            ),
+                            {"table": relation},
+                        )
+                    rows = row_estimates[relation] or 0
+                    if rows >= min_rows:
+                        findings.append(
+                            Finding(
+                                name,
+                                relation,
+                                rows,
+                                scan.get("Filter"),
+                                statement,
+                            )
+                        )
+            await connection.rollback()
+
+    return findings
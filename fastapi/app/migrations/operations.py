@@ -0,0 +1,32 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+async def create_index_concurrently(
+    connection: AsyncConnection, name: str, definition: str
+):
+    """Build index ``name`` without locking its table against writes.
+
+    ``definition`` is the rest of the statement after the index name,
+    e.g. ``ON carts (user_id)``, written out in the migration so that
+    later changes to the models never alter it.
+
+    Needs an autocommit connection. A failed concurrent build leaves an
+    invalid index behind, which is dropped first so that running the
+    migration again rebuilds it instead of keeping it.
+    """
+    valid = await connection.scalar(
+        text(
+            "SELECT indisvalid FROM pg_index "
+            "WHERE indexrelid = to_regclass(:index)"
+        ),
+        {"index": name},
+    )
+    if valid is False:
+        await connection.execute(
+            text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+        )
+
+    await connection.exec_driver_sql(
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} {definition}"
+    )
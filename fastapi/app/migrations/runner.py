@@ -0,0 +1,160 @@
+import importlib
+import pkgutil
+from types import ModuleType
+from typing import Awaitable, Callable, NamedTuple, Optional
+
+from loguru import logger
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    func,
+    insert,
+    select,
+    text,
+)
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.database import DatabaseManager
+from app.migrations import versions
+
+# Serializes the processes of a deploy which migrate at the same time
+MIGRATION_LOCK_ID = 0x3A9_2A7E
+
+# Kept out of ``Base.metadata`` so that the baseline migration, which
+# creates every model table, never creates it ahead of the runner
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("name", String(255), nullable=False),
+    Column(
+        "applied_at",
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    ),
+)
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    upgrade: Callable[[AsyncConnection], Awaitable[None]]
+    # Non transactional migrations run in autocommit mode, as CREATE INDEX
+    # CONCURRENTLY requires. They must be safe to run again after failing.
+    transactional: bool = True
+
+
+def _load(module: ModuleType) -> Migration:
+    prefix, _, name = module.__name__.rpartition(".")[2].partition("_")
+    return Migration(
+        version=int(prefix.lstrip("v")),
+        name=name,
+        upgrade=module.upgrade,
+        transactional=getattr(module, "TRANSACTIONAL", True),
+    )
+
+
+def get_migrations() -> list[Migration]:
+    """Return the migrations in ``app/migrations/versions`` by version.
+
+    Modules are named ``v<version>_<name>.py`` and define an async
+    ``upgrade(connection)``, and ``TRANSACTIONAL = False`` when needed.
+    """
+    migrations = [
+        _load(importlib.import_module(f"{versions.__name__}.{info.name}"))
+        for info in pkgutil.iter_modules(versions.__path__)
+        if info.name.startswith("v")
+    ]
+    migrations.sort(key=lambda migration: migration.version)
+
+    seen = set()
+    for migration in migrations:
+        if migration.version in seen:
+            raise ValueError(f"Duplicate migration {migration.version}")
+        seen.add(migration.version)
+    return migrations
+
+
+async def get_applied_versions(connection: AsyncConnection) -> set[int]:
+    await connection.run_sync(schema_migrations.create, checkfirst=True)
+    result = await connection.execute(select(schema_migrations.c.version))
+    return set(result.scalars())
+
+
+async def _apply(db_instance: DatabaseManager, migration: Migration):
+    record = insert(schema_migrations).values(
+        version=migration.version, name=migration.name
+    )
+    if migration.transactional:
+        async with db_instance.engine.begin() as connection:
+            # Rewriting big tables may outlast the request statement timeout
+            await connection.execute(text("SET LOCAL statement_timeout = 0"))
+            await migration.upgrade(connection)
+            await connection.execute(record)
+        return
+
+    async with db_instance.engine.connect() as connection:
+        connection = await connection.execution_options(
+            isolation_level="AUTOCOMMIT"
+        )
+        await connection.execute(text("SET statement_timeout = 0"))
+        try:
+            await migration.upgrade(connection)
+            await connection.execute(record)
+        finally:
+            await connection.execute(text("RESET statement_timeout"))
+
+
+async def upgrade(target: Optional[int] = None) -> list[Migration]:
+    """Apply the pending migrations up to ``target``, return them.
+
+    A session advisory lock is held for the whole run, so concurrent
+    runs wait for each other and the later ones find nothing to do.
+    """
+    db_instance = DatabaseManager._instance
+    applied = []
+    async with db_instance.engine.connect() as lock_connection:
+        lock_connection = await lock_connection.execution_options(
+            isolation_level="AUTOCOMMIT"
+        )
+        await lock_connection.execute(
+            text("SELECT pg_advisory_lock(:lock_id)"),
+            {"lock_id": MIGRATION_LOCK_ID},
+        )
+        try:
+            done = await get_applied_versions(lock_connection)
+            for migration in get_migrations():
+                if migration.version in done:
+                    continue
+                if target is not None and migration.version > target:
+                    break
+
+                logger.info(
+                    f"Applying migration {migration.version} {migration.name}"
+                )
+                await _apply(db_instance, migration)
+                applied.append(migration)
+        finally:
+            await lock_connection.execute(
+                text("SELECT pg_advisory_unlock(:lock_id)"),
+                {"lock_id": MIGRATION_LOCK_ID},
+            )
+
+    logger.info(f"Applied {len(applied)} migrations")
+    return applied
+
+
+async def status() -> list[tuple[Migration, bool]]:
+    """Return every migration along with whether it was applied."""
+    db_instance = DatabaseManager._instance
+    async with db_instance.engine.begin() as connection:
+        done = await get_applied_versions(connection)
+    return [
+        (migration, migration.version in done)
+        for migration in get_migrations()
+    ]
@@ -0,0 +1,236 @@
+"""Create the tables, and bring databases predating migrations up to date.
+
+The DDL is a snapshot of the models when migrations were introduced, so
+that later changes to the models never leak into it; they belong to the
+migrations which make them. Databases created by ``create_all`` before
+then only lack some columns and indexes, which are added here. Every
+statement is idempotent.
+"""
+
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+CREATE_CART_STATUS = """
+DO $$ BEGIN
+    CREATE TYPE cartstatus AS ENUM ('ACTIVE', 'INACTIVE', 'ABANDONED');
+EXCEPTION WHEN duplicate_object THEN NULL;
+END $$
+"""
+
+CREATE_TABLES = (
+    """
+    CREATE TABLE IF NOT EXISTS categories (
+        id SERIAL NOT NULL,
+        name VARCHAR(50) NOT NULL,
+        PRIMARY KEY (id),
+        UNIQUE (name)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS permissions (
+        id SERIAL NOT NULL,
+        name VARCHAR(50) NOT NULL,
+        description VARCHAR(255),
+        PRIMARY KEY (id),
+        UNIQUE (name)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS roles (
+        id SERIAL NOT NULL,
+        name VARCHAR(50) NOT NULL,
+        description VARCHAR(255),
+        version INTEGER DEFAULT '1' NOT NULL,
+        PRIMARY KEY (id),
+        UNIQUE (name)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS seed_versions (
+        name VARCHAR(50) NOT NULL,
+        checksum VARCHAR(64) NOT NULL,
+        applied_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now() NOT NULL,
+        PRIMARY KEY (name)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS role_permission_association (
+        role_id INTEGER NOT NULL,
+        permission_id INTEGER NOT NULL,
+        PRIMARY KEY (role_id, permission_id),
+        FOREIGN KEY(role_id) REFERENCES roles (id) ON DELETE CASCADE,
+        FOREIGN KEY(permission_id) REFERENCES permissions (id)
+            ON DELETE CASCADE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS sub_categories (
+        id SERIAL NOT NULL,
+        name VARCHAR(50) NOT NULL,
+        category_id INTEGER NOT NULL,
+        PRIMARY KEY (id),
+        UNIQUE (name),
+        FOREIGN KEY(category_id) REFERENCES categories (id) ON DELETE CASCADE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id SERIAL NOT NULL,
+        username VARCHAR(255) NOT NULL,
+        password VARCHAR(255) NOT NULL,
+        email VARCHAR(255),
+        full_name VARCHAR(255),
+        role_id INTEGER NOT NULL,
+        phone VARCHAR(255),
+        created_at TIMESTAMP WITH TIME ZONE,
+        is_internal_user BOOLEAN,
+        date_joined TIMESTAMP WITH TIME ZONE,
+        last_active TIMESTAMP WITH TIME ZONE,
+        PRIMARY KEY (id),
+        UNIQUE (username),
+        UNIQUE (email),
+        FOREIGN KEY(role_id) REFERENCES roles (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS addresses (
+        id SERIAL NOT NULL,
+        user_id INTEGER NOT NULL,
+        name VARCHAR(255) NOT NULL,
+        address VARCHAR(255) NOT NULL,
+        city VARCHAR(255) NOT NULL,
+        state VARCHAR(255) NOT NULL,
+        pincode VARCHAR(255) NOT NULL,
+        country VARCHAR(255) NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES users (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS carts (
+        id SERIAL NOT NULL,
+        user_id INTEGER,
+        name VARCHAR(50) NOT NULL,
+        reminder_date TIMESTAMP WITH TIME ZONE,
+        status cartstatus NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES users (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS products (
+        id SERIAL NOT NULL,
+        name VARCHAR(100) NOT NULL,
+        description VARCHAR(500),
+        user_id INTEGER NOT NULL,
+        price FLOAT NOT NULL,
+        slug VARCHAR(60) NOT NULL,
+        tags VARCHAR(255),
+        discount FLOAT,
+        tax FLOAT,
+        stock INTEGER NOT NULL,
+        category_id INTEGER NOT NULL,
+        is_active BOOLEAN NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES users (id),
+        FOREIGN KEY(category_id) REFERENCES categories (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS cart_items (
+        id SERIAL NOT NULL,
+        cart_id INTEGER,
+        product_id INTEGER,
+        quantity INTEGER NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(cart_id) REFERENCES carts (id),
+        FOREIGN KEY(product_id) REFERENCES products (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS product_subcategory_association (
+        product_id INTEGER NOT NULL,
+        sub_category_id INTEGER NOT NULL,
+        PRIMARY KEY (product_id, sub_category_id),
+        FOREIGN KEY(product_id) REFERENCES products (id) ON DELETE CASCADE,
+        FOREIGN KEY(sub_category_id) REFERENCES sub_categories (id)
+            ON DELETE CASCADE
+    )
+    """,
+)
+
+# Columns added to tables which ``create_all`` may have created without
+# them. Postgres computes the generated ones for the existing rows.
+ADD_COLUMNS = (
+    "ALTER TABLE roles ADD COLUMN IF NOT EXISTS "
+    "version INTEGER DEFAULT '1' NOT NULL",
+    "ALTER TABLE products ADD COLUMN IF NOT EXISTS "
+    "tag_list TEXT[] GENERATED ALWAYS AS ("
+    "CASE WHEN coalesce(btrim(tags), '') = '' THEN '{}'::text[] "
+    r"ELSE regexp_split_to_array(lower(btrim(tags)), '\s*,\s*') END"
+    ") STORED",
+    "ALTER TABLE products ADD COLUMN IF NOT EXISTS "
+    "search_vector TSVECTOR GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(tags, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'C')"
+    ") STORED",
+)
+
+CREATE_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS ix_carts_status_reminder_date "
+    "ON carts (status, reminder_date)",
+    "CREATE INDEX IF NOT EXISTS ix_products_price ON products (price)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_products_slug ON products (slug)",
+    "CREATE INDEX IF NOT EXISTS ix_products_search_vector "
+    "ON products USING gin (search_vector)",
+    "CREATE INDEX IF NOT EXISTS ix_products_tag_list "
+    "ON products USING gin (tag_list)",
+)
+
+UNIQUE_ITEMS_INDEX = "uq_cart_items_cart_id_product_id"
+
+# Carts used to get a new row every time a product was added, fold those
+# into one row per product before the unique index can be built
+MERGE_DUPLICATE_ITEMS = text(
+    """
+    WITH duplicates AS (
+        SELECT cart_id, product_id,
+               min(id) AS kept_id, sum(quantity) AS quantity
+        FROM cart_items
+        GROUP BY cart_id, product_id
+        HAVING count(*) > 1
+    ), merged AS (
+        UPDATE cart_items SET quantity = duplicates.quantity
+        FROM duplicates
+        WHERE cart_items.id = duplicates.kept_id
+    )
+    DELETE FROM cart_items USING duplicates
+    WHERE cart_items.cart_id = duplicates.cart_id
+      AND cart_items.product_id = duplicates.product_id
+      AND cart_items.id <> duplicates.kept_id
+    """
+)
+
+CREATE_UNIQUE_ITEMS_INDEX = (
+    f"CREATE UNIQUE INDEX IF NOT EXISTS {UNIQUE_ITEMS_INDEX} "
+    "ON cart_items (cart_id, product_id)"
+)
+
+
+def get_upgrade_statements() -> list[str]:
+    """Return the DDL run before the cart items are deduplicated."""
+    return [CREATE_CART_STATUS, *CREATE_TABLES, *ADD_COLUMNS, *CREATE_INDEXES]
+
+
+async def upgrade(connection: AsyncConnection):
+    for statement in get_upgrade_statements():
+        logger.debug(f"Upgrading baseline: {statement}")
+        await connection.exec_driver_sql(statement)
+
+    q = text("SELECT to_regclass(:index)")
+    if not await connection.scalar(q, {"index": UNIQUE_ITEMS_INDEX}):
+        result = await connection.execute(MERGE_DUPLICATE_ITEMS)
+        logger.info(f"Merged {result.rowcount} duplicate cart items")
+        await connection.exec_driver_sql(CREATE_UNIQUE_ITEMS_INDEX)
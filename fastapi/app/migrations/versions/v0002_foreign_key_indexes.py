@@ -0,0 +1,17 @@
+"""Index the foreign keys which addresses and products are listed by."""
+
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.migrations.operations import create_index_concurrently
+
+TRANSACTIONAL = False
+
+INDEXES = (
+    ("ix_addresses_user_id", "ON addresses (user_id)"),
+    ("ix_products_category_id", "ON products (category_id)"),
+)
+
+
+async def upgrade(connection: AsyncConnection):
+    for name, definition in INDEXES:
+        await create_index_concurrently(connection, name, definition)
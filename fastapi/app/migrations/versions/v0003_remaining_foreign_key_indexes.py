@@ -0,0 +1,19 @@
+"""Index the remaining foreign keys carts, products and users filter on."""
+
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.migrations.operations import create_index_concurrently
+
+TRANSACTIONAL = False
+
+INDEXES = (
+    ("ix_carts_user_id", "ON carts (user_id)"),
+    ("ix_cart_items_product_id", "ON cart_items (product_id)"),
+    ("ix_products_user_id", "ON products (user_id)"),
+    ("ix_users_role_id", "ON users (role_id)"),
+)
+
+
+async def upgrade(connection: AsyncConnection):
+    for name, definition in INDEXES:
+        await create_index_concurrently(connection, name, definition)
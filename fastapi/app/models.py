@@ -1,5 +1,6 @@
-from typing import Generic, TypeVar
+from typing import Generic, Optional, TypeVar
 
+from fastapi import Response
 from pydantic import BaseModel, Field, computed_field, field_validator
 
 T = TypeVar("T")
@@ -10,18 +11,29 @@ class PaginationParams(BaseModel):
     page_size: int = Field(
         default=10, gt=0, le=100, description="Items per page"
     )
+    cursor: Optional[str] = Field(
+        default=None,
+        description="Cursor of the next page, takes precedence over page",
+    )
+    with_total: bool = Field(
+        default=True, description="Whether to count the matching items"
+    )
 
 
 class PaginatedResponse(BaseModel, Generic[T]):
     items: list[T]
-    total: int
+    total: Optional[int] = None
     page: int
     page_size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+    total_is_estimate: bool = False
 
     @computed_field
     @property
     def has_next(self) -> bool:
+        if self.total_pages is None or self.total_is_estimate:
+            return self.next_cursor is not None
         return self.page < self.total_pages
 
     @computed_field
@@ -34,3 +46,41 @@ class PaginatedResponse(BaseModel, Generic[T]):
         if value < 1:
             raise ValueError("Value must be greater than 0")
         return value
+
+
+def get_total_pages(total: Optional[int], page_size: int) -> Optional[int]:
+    if total is None:
+        return None
+    return (total + page_size - 1) // page_size
+
+
+class RawJSONResponse(Response):
+    """Response whose content is JSON encoded already."""
+
+    media_type = "application/json"
+
+
+def encode_json(model: BaseModel) -> bytes:
+    """Encode a model to JSON bytes with its precompiled serializer."""
+    return model.__pydantic_serializer__.to_json(model)
+
+
+def encode_page(
+    page_model: type[PaginatedResponse], result, page: int, page_size: int
+) -> bytes:
+    """Encode a repository page of trusted items straight to JSON.
+
+    The items of ``result`` are built with ``model_construct`` from
+    database rows, so neither they nor the page are validated again.
+    """
+    return encode_json(
+        page_model.model_construct(
+            items=result.items,
+            total=result.total,
+            page=page,
+            page_size=page_size,
+            total_pages=get_total_pages(result.total, page_size),
+            next_cursor=result.next_cursor,
+            total_is_estimate=result.total_is_estimate,
+        )
+    )
@@ -0,0 +1,139 @@
+from typing import NamedTuple, Optional
+
+from loguru import logger
+from sqlalchemy import bindparam, select
+
+from app.cache import TTLCache
+from app.config import PERMISSION_CACHE_CONFIGS
+from app.database import DatabaseManager
+from app.exceptions import EntityNotFoundError
+from app.permissions.schema import Permission, role_permission_association
+from app.roles.schema import Role
+from app.users.schema import User
+
+# Hot queries are built once at module level with bind parameters, here
+# and in the repositories, so that every execution sends the same SQL:
+# SQLAlchemy reuses its compiled form and asyncpg the statement it
+# prepared on each connection
+_USER_ROLE_QUERY = select(User.role_id).where(User.id == bindparam("user_id"))
+_ROLE_PERMISSIONS_QUERY = (
+    select(Role.version, Permission.id, Permission.name)
+    .select_from(Role)
+    .outerjoin(
+        role_permission_association,
+        Role.id == role_permission_association.c.role_id,
+    )
+    .outerjoin(
+        Permission,
+        Permission.id == role_permission_association.c.permission_id,
+    )
+    .where(Role.id == bindparam("role_id"))
+)
+_PERMISSION_IDS_QUERY = select(Permission.name, Permission.id)
+
+
+class RolePermissions(NamedTuple):
+    version: int
+    permissions: frozenset[str]
+    # Bit ``permission.id`` is set for every permission of the role
+    bitmap: int
+
+
+class PermissionCache:
+    """In-process cache of user -> role and role -> permissions lookups.
+
+    Entries expire after ``ttl`` seconds, so writes made by other
+    processes become visible within that window. Writes made through
+    this process invalidate the affected roles right away.
+    """
+
+    PERMISSION_IDS_KEY = "permission_ids"
+
+    def __init__(
+        self,
+        max_size: int = PERMISSION_CACHE_CONFIGS["max_size"],
+        ttl: float = PERMISSION_CACHE_CONFIGS["ttl"],
+    ) -> None:
+        self.user_roles = TTLCache(max_size=max_size, ttl=ttl)
+        self.roles = TTLCache(max_size=max_size, ttl=ttl)
+        self.permission_ids = TTLCache(max_size=1, ttl=ttl)
+        # Bumped on every invalidation so that a load which started
+        # before the invalidation does not store stale permissions.
+        self._generation = 0
+
+    async def get_role_id(self, user_id: int) -> int:
+        if (role_id := self.user_roles.get(user_id)) is not None:
+            return role_id
+
+        db_instance = DatabaseManager._instance
+        async with db_instance.begin() as connection:
+            role_id = await connection.scalar(
+                _USER_ROLE_QUERY, {"user_id": user_id}
+            )
+            if role_id is None:
+                raise EntityNotFoundError(entity="User")
+
+        self.user_roles.set(user_id, role_id)
+        return role_id
+
+    async def get_role(self, role_id: int) -> Optional[RolePermissions]:
+        """Return the permissions of a role, or None if it is gone."""
+        if (role := self.roles.get(role_id)) is not None:
+            return role
+
+        generation = self._generation
+        db_instance = DatabaseManager._instance
+        async with db_instance.begin() as connection:
+            result = await connection.execute(
+                _ROLE_PERMISSIONS_QUERY, {"role_id": role_id}
+            )
+            rows = result.fetchall()
+
+        if not rows:
+            return None
+
+        role = RolePermissions(
+            version=rows[0].version,
+            permissions=frozenset(row.name for row in rows if row.name),
+            bitmap=sum(1 << row.id for row in rows if row.id is not None),
+        )
+        if generation == self._generation:
+            self.roles.set(role_id, role)
+
+        return role
+
+    async def get_permission_ids(self) -> dict[str, int]:
+        """Return a mapping of every permission name to its id."""
+        key = self.PERMISSION_IDS_KEY
+        if (permission_ids := self.permission_ids.get(key)) is not None:
+            return permission_ids
+
+        generation = self._generation
+        db_instance = DatabaseManager._instance
+        async with db_instance.begin() as connection:
+            result = await connection.execute(_PERMISSION_IDS_QUERY)
+            permission_ids = {row.name: row.id for row in result}
+
+        if generation == self._generation:
+            self.permission_ids.set(key, permission_ids)
+
+        return permission_ids
+
+    def invalidate_role(self, role_id: int):
+        logger.debug(f"Invalidating cached permissions of {role_id=}")
+        self._generation += 1
+        self.roles.delete(role_id)
+
+    def invalidate_permissions(self):
+        logger.debug("Invalidating cached permission ids")
+        self._generation += 1
+        self.permission_ids.clear()
+
+    def invalidate_all(self):
+        logger.debug("Invalidating all cached permissions")
+        self._generation += 1
+        self.roles.clear()
+        self.permission_ids.clear()
+
+
+permission_cache = PermissionCache()
@@ -1,15 +1,17 @@
 from loguru import logger
-from sqlalchemy import delete, func, insert, select
+from sqlalchemy import delete, func, insert, select, update
 from sqlalchemy.exc import IntegrityError
 
 from app.database import DatabaseManager
 from app.exceptions import EntityIntegrityError, EntityNotFoundError
+from app.permissions.cache import permission_cache
 from app.permissions.models import (
     PermissionCreateModel,
     PermissionResponseModel,
 )
-from app.permissions.schema import Permission
-from app.repository import BaseRepository
+from app.permissions.schema import Permission, role_permission_association
+from app.repository import BaseRepository, Page
+from app.roles.schema import Role
 
 
 class PermissionRepository(BaseRepository):
@@ -20,14 +22,16 @@ class PermissionRepository(BaseRepository):
     async def create(
         self, permission: PermissionCreateModel
     ) -> PermissionResponseModel:
-        async with self.db.engine.begin() as connection:
+        async with self.db.begin() as connection:
             try:
                 q = insert(Permission).values(
                     name=permission.name,
                     description=permission.description,
                 )
                 result = await connection.execute(q)
-                await connection.commit()
+                await self.db.after_commit(
+                    permission_cache.invalidate_permissions
+                )
 
                 return PermissionResponseModel(
                     id=result.inserted_primary_key[0],
@@ -46,28 +50,39 @@ class PermissionRepository(BaseRepository):
         permission_id: int | None = None,
         page: int = 1,
         page_size: int = 10,
-    ) -> tuple[list[dict], int]:
+        cursor: str | None = None,
+        with_total: bool = True,
+    ) -> Page:
         query = select(Permission)
         if permission_id is not None:
             query = query.where(Permission.id == permission_id)
-            async with self.db.engine.begin() as connection:
+            async with self.db.begin() as connection:
                 result = await connection.execute(query)
                 if not result.fetchone():
                     raise EntityNotFoundError(entity="Permission")
 
-        items, total = await self.get_paginated(query, page, page_size)
+        result = await self.get_paginated(
+            query,
+            page,
+            page_size,
+            cursor=cursor,
+            keys=[Permission.id],
+            with_total=with_total,
+        )
 
-        return [
-            PermissionResponseModel(
-                id=item["id"],
-                name=item["name"],
-                description=item["description"],
-            ).model_dump()
-            for item in items
-        ], total
+        return result._replace(
+            items=[
+                PermissionResponseModel.model_construct(
+                    id=item["id"],
+                    name=item["name"],
+                    description=item["description"],
+                )
+                for item in result.items
+            ]
+        )
 
     async def get(self, id: int = None) -> PermissionResponseModel:
-        async with self.db.engine.begin() as connection:
+        async with self.db.begin() as connection:
             if id is None:
                 q = select(Permission).order_by(func.random()).limit(1)
             else:
@@ -81,16 +96,27 @@ class PermissionRepository(BaseRepository):
             return permission._asdict()
 
     async def delete(self, id: int):
-        async with self.db.engine.begin() as connection:
+        async with self.db.begin() as connection:
             try:
                 q = select(Permission).where(Permission.id == id)
                 result = await connection.execute(q)
                 if not result.fetchone():
                     raise EntityNotFoundError(entity="Permission")
 
+                # Reject tokens granting the permission being deleted
+                roles_with_permission = select(
+                    role_permission_association.c.role_id
+                ).where(role_permission_association.c.permission_id == id)
+                q = (
+                    update(Role)
+                    .where(Role.id.in_(roles_with_permission))
+                    .values(version=Role.version + 1)
+                )
+                await connection.execute(q)
+
                 q = delete(Permission).where(Permission.id == id)
                 await connection.execute(q)
-                await connection.commit()
+                await self.db.after_commit(permission_cache.invalidate_all)
                 return True
             except EntityNotFoundError as e:
                 logger.error(f"Error deleting permission: {e=}")
@@ -9,8 +9,12 @@ from starlette.status import (
     HTTP_500_INTERNAL_SERVER_ERROR,
 )
 
-from app.exceptions import EntityIntegrityError, EntityNotFoundError
-from app.models import PaginationParams
+from app.exceptions import (
+    EntityIntegrityError,
+    EntityNotFoundError,
+    InvalidCursorError,
+)
+from app.models import PaginationParams, RawJSONResponse, encode_page
 from app.permissions.models import (
     AllPermissionsResponseModel,
     PermissionCreateModel,
@@ -67,22 +71,24 @@ async def get_all_permissions(
 ):
     try:
         repo = PermissionRepository()
-        permissions, total = await repo.get_all(
+        result = await repo.get_all(
             permission_id=permission_id,
             page=pagination.page,
             page_size=pagination.page_size,
+            cursor=pagination.cursor,
+            with_total=pagination.with_total,
         )
 
-        response = {
-            "items": permissions,
-            "total": total,
-            "page": pagination.page,
-            "page_size": pagination.page_size,
-            "total_pages": (total + pagination.page_size - 1)
-            // pagination.page_size,
-        }
-
-        return JSONResponse(content=response, status_code=HTTP_200_OK)
+        return RawJSONResponse(
+            encode_page(
+                AllPermissionsResponseModel,
+                result,
+                pagination.page,
+                pagination.page_size,
+            )
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail=str(e))
     except EntityNotFoundError as e:
         raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail=str(e))
     except Exception as e:
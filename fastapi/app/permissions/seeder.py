@@ -1,11 +1,13 @@
 from loguru import logger
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from app.address.permissions import PERMISSIONS as ADDRESS_PERMISSIONS
 from app.cart.permissions import PERMISSIONS as CART_PERMISSIONS
 from app.categories.permissions import PERMISSIONS as CATEGORY_PERMISSIONS
-from app.exceptions import EntityIntegrityError
+from app.database import DatabaseManager
+from app.internal.permissions import PERMISSIONS as INTERNAL_PERMISSIONS
+from app.permissions.cache import permission_cache
 from app.permissions.permissions import PERMISSIONS as PERMISSION_PERMISSIONS
-from app.permissions.repository import PermissionRepository
 from app.permissions.schema import Permission
 from app.products.permissions import PERMISSIONS as PRODUCT_PERMISSIONS
 from app.roles.permissions import PERMISSIONS as ROLE_PERMISSIONS
@@ -24,17 +26,22 @@ class Seeder:
         *PRODUCT_PERMISSIONS,
         *CART_PERMISSIONS,
         *ADDRESS_PERMISSIONS,
+        *INTERNAL_PERMISSIONS,
     ]
 
     async def run(self):
-        # delete all permission from existing table
-        repo = PermissionRepository()
-        for value in self.VALUES:
-            try:
-                await repo.create(value)
-            except EntityIntegrityError:
-                pass
-            except Exception as e:
-                logger.error(f"Error seeding permission: {e=}")
+        """Insert the missing permissions in a single statement."""
+        q = (
+            pg_insert(Permission)
+            .values([value.model_dump() for value in self.VALUES])
+            .on_conflict_do_nothing(index_elements=[Permission.name])
+        )
+        db_instance = DatabaseManager._instance
+        async with db_instance.begin() as connection:
+            result = await connection.execute(q)
 
-        logger.info("Seeding permissions completed")
+        if result.rowcount:
+            await db_instance.after_commit(
+                permission_cache.invalidate_permissions
+            )
+        logger.info(f"Seeding permissions completed, {result.rowcount} new")
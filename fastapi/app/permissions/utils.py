@@ -2,72 +2,65 @@ from functools import wraps
 
 from fastapi import Depends, HTTPException
 from loguru import logger
-from sqlalchemy import select
-from starlette.status import HTTP_403_FORBIDDEN
+from starlette.status import HTTP_401_UNAUTHORIZED, HTTP_403_FORBIDDEN
 
-from app.database import DatabaseManager
-from app.exceptions import EntityNotFoundError, NotEnoughPermissionsError
-from app.permissions.schema import Permission, role_permission_association
-from app.users.schema import User
-from app.users.utils import get_current_user_id
+from app.exceptions import NotEnoughPermissionsError
+from app.permissions.cache import permission_cache
+from app.users.utils import get_current_token_claims
+
+PERMISSION_CLAIMS = frozenset({"role_id", "role_version", "permissions"})
+
+
+async def create_permission_claims(role_id: int) -> dict:
+    """Build the role and permission claims embedded in access tokens."""
+    if (role := await permission_cache.get_role(role_id)) is None:
+        raise NotEnoughPermissionsError(message="Role does not exist")
+
+    return {
+        "role_id": role_id,
+        "role_version": role.version,
+        "permissions": format(role.bitmap, "x"),
+    }
+
+
+async def check_permission_claims(claims: dict, required: frozenset[str]):
+    """Authorize a request from the permission claims of its token."""
+    role = await permission_cache.get_role(claims["role_id"])
+    if role is None or role.version != claims["role_version"]:
+        logger.warning(f"Stale permission claims for {claims['user_id']=}")
+        raise HTTPException(
+            status_code=HTTP_401_UNAUTHORIZED,
+            detail="Token is stale, please login again",
+        )
+
+    permission_ids = await permission_cache.get_permission_ids()
+    if not required <= permission_ids.keys():
+        raise NotEnoughPermissionsError(message="Missing permissions")
+
+    required_bitmap = sum(1 << permission_ids[name] for name in required)
+    granted_bitmap = int(claims["permissions"], 16)
+    if granted_bitmap & required_bitmap != required_bitmap:
+        raise NotEnoughPermissionsError(message="Missing permissions")
 
 
 def allowed_permissions(required_permissions: list):
+    required = frozenset(required_permissions)
+
     async def permission_checker(
-        user_id: int = Depends(get_current_user_id),
+        claims: dict = Depends(get_current_token_claims),
     ):
         try:
-            db_instance = DatabaseManager._instance
-            async with db_instance.engine.begin() as connection:
-
-                # Get User's Role ID
-                q = select(User).where(User.id == user_id)
-                result = await connection.execute(q)
-
-                if not (user := result.fetchone()):
-                    raise EntityNotFoundError(entity="User")
-
-                user_asdict = user._asdict()
-                role_id = user_asdict["role_id"]
-
-                associations_to_check = []
-
-                # Get ID of all required permissions and populate associations to check
-                for permission in required_permissions:
-                    q = select(Permission).where(Permission.name == permission)
-                    result = await connection.execute(q)
-                    permission_asdict = result.fetchone()._asdict()
-                    associations_to_check.append(
-                        {
-                            "role_id": role_id,
-                            "permission_id": permission_asdict["id"],
-                        }
-                    )
-
-                # Check if all the associations exists
-                q = select(role_permission_association).where(
-                    role_permission_association.c.role_id.in_(
-                        [
-                            association["role_id"]
-                            for association in associations_to_check
-                        ]
-                    ),
-                    role_permission_association.c.permission_id.in_(
-                        [
-                            association["permission_id"]
-                            for association in associations_to_check
-                        ]
-                    ),
-                )
-                result = await connection.execute(q)
-                associations = result.fetchall()
-                if len(associations) != len(required_permissions):
-                    logger.error("User does not have enough permissions")
-                    raise NotEnoughPermissionsError(
-                        message="Missing permissions"
-                    )
-
-                return user
+            if PERMISSION_CLAIMS <= claims.keys():
+                await check_permission_claims(claims, required)
+                return claims["user_id"]
+
+            role_id = await permission_cache.get_role_id(claims["user_id"])
+            role = await permission_cache.get_role(role_id)
+            if role is None or not required <= role.permissions:
+                logger.error("User does not have enough permissions")
+                raise NotEnoughPermissionsError(message="Missing permissions")
+
+            return claims["user_id"]
         except NotEnoughPermissionsError as e:
             raise HTTPException(status_code=HTTP_403_FORBIDDEN, detail=str(e))
 
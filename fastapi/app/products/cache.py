@@ -0,0 +1,5 @@
+from app.cache import ResponseCache, cache_backend
+
+# Serialized product listings and facets, invalidated by any write to
+# products, categories or subcategories
+product_cache = ResponseCache("products", cache_backend)
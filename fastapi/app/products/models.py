@@ -7,6 +7,7 @@ from pydantic import (
     Field,
     computed_field,
     field_serializer,
+    field_validator,
 )
 
 
@@ -62,6 +63,15 @@ class ProductResponseModel(BaseProductModel):
     id: int = Field(..., description="The unique identifier of the product")
     model_config: ConfigDict = ConfigDict(from_attributes=True)
 
+    @classmethod
+    def from_row(cls, row: dict) -> "ProductResponseModel":
+        """Build from a trusted database row, without validating it."""
+        for name in ("price", "discount", "tax"):
+            # The columns are floats, the computed price needs decimals
+            if (value := row.get(name)) is not None:
+                row[name] = Decimal(str(value))
+        return cls.model_construct(**row)
+
     @computed_field
     @property
     def computed_price(self) -> Decimal:
@@ -75,6 +85,9 @@ class UpdateProductRequestModel(BaseProductModel):
 class ProductQueryParams(BaseModel):
     """Model for product query parameters"""
 
+    # Full-text search, ranks the results by relevance unless sorted
+    q: Optional[str] = Field(None, min_length=1, max_length=255)
+
     # Basic fields
     id: Optional[int] = None
     name: Optional[str] = Field(None, min_length=3, max_length=100)
@@ -97,7 +110,12 @@ class ProductQueryParams(BaseModel):
     sub_category_id: Optional[int] = None
 
     # Other filters
-    tags: Optional[str] = Field(None, max_length=255)
+    tags: Optional[str] = Field(
+        None, max_length=255, description="Comma-separated product tags"
+    )
+    tags_match: Literal["any", "all"] = Field(
+        "any", description="Whether products need any or all of the tags"
+    )
     is_active: Optional[bool] = None
 
     # Sorting
@@ -117,6 +135,43 @@ class ProductQueryParams(BaseModel):
 
     model_config: ConfigDict = ConfigDict(from_attributes=True)
 
+    @field_validator("tags")
+    def normalize_tags(cls, value: Optional[str]) -> Optional[str]:
+        """Normalize tags the way ``Product.tag_list`` stores them"""
+        if value is None:
+            return None
+        tags = {tag.strip().lower() for tag in value.split(",")}
+        return ",".join(sorted(tag for tag in tags if tag)) or None
+
     def to_filter_dict(self) -> dict:
         """Convert the model to a dictionary of non-None values"""
         return {k: v for k, v in self.model_dump().items() if v is not None}
+
+
+class FacetCountModel(BaseModel):
+    id: int = Field(..., description="ID of the category or subcategory")
+    name: str
+    count: int
+
+
+class PriceBucketCountModel(BaseModel):
+    min_price: Optional[float] = Field(
+        None, description="Inclusive lower bound, None if unbounded"
+    )
+    max_price: Optional[float] = Field(
+        None, description="Exclusive upper bound, None if unbounded"
+    )
+    count: int
+
+
+class TagCountModel(BaseModel):
+    tag: str
+    count: int
+
+
+class ProductFacetsResponseModel(BaseModel):
+    total: int = Field(..., description="Number of matching products")
+    categories: list[FacetCountModel]
+    sub_categories: list[FacetCountModel]
+    price_buckets: list[PriceBucketCountModel]
+    tags: list[TagCountModel]
@@ -1,17 +1,60 @@
 from loguru import logger
-from sqlalchemy import delete, insert, select, update
+from sqlalchemy import (
+    Float,
+    bindparam,
+    delete,
+    distinct,
+    func,
+    insert,
+    literal,
+    select,
+    true,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
 
+from app.cart.pricing import cart_pricing
 from app.categories.repository import ProductCategoryRepository
+from app.categories.schema import Category
+from app.config import PRODUCT_FACETS_CONFIGS
 from app.database import DatabaseManager
 from app.exceptions import EntityNotFoundError
+from app.products.cache import product_cache
 from app.products.models import (
     CreateProductRequestModel,
     UpdateProductRequestModel,
 )
-from app.products.schema import Product
-from app.repository import BaseRepository
+from app.products.schema import SEARCH_CONFIG, Product
+from app.repository import BaseRepository, Page
 from app.subcategories.repository import ProductSubCategoryRepository
-from app.subcategories.schema import product_subcategory_association
+from app.subcategories.schema import (
+    SubCategory,
+    product_subcategory_association,
+)
+
+# Simple filters of product listings, by query parameter
+PRODUCT_FILTERS = {
+    "id": lambda v: Product.id == v,
+    "name": lambda v: Product.name.ilike(f"%{v}%"),
+    "slug": lambda v: Product.slug == v,
+    "min_price": lambda v: Product.price >= v,
+    "max_price": lambda v: Product.price <= v,
+    "min_discount": lambda v: Product.discount >= v,
+    "max_discount": lambda v: Product.discount <= v,
+    "min_tax": lambda v: Product.tax >= v,
+    "max_tax": lambda v: Product.tax <= v,
+    "min_stock": lambda v: Product.stock >= v,
+    "max_stock": lambda v: Product.stock <= v,
+    "category_id": lambda v: Product.category_id == v,
+    "is_active": lambda v: Product.is_active == v,
+}
+
+_PRODUCT_BY_ID_QUERY = select(Product).where(Product.id == bindparam("id"))
+
+
+def _search_query(q: str):
+    return func.websearch_to_tsquery(SEARCH_CONFIG, q)
 
 
 class ProductRepository(BaseRepository):
@@ -21,7 +64,7 @@ class ProductRepository(BaseRepository):
     async def create(
         self, user_id: int, product: CreateProductRequestModel
     ) -> int:
-        async with self.db.engine.begin() as connection:
+        async with self.db.begin() as connection:
             # Check if the category exist
             category_repo = ProductCategoryRepository()
             await category_repo.get_by_id(product.category_id)
@@ -54,36 +97,29 @@ class ProductRepository(BaseRepository):
                 )
                 result = await connection.execute(q)
 
-            await connection.commit()
+            await self.db.after_commit(product_cache.invalidate)
             return created_product_id
 
-    async def get_products(
-        self, filters: dict, page: int = 1, page_size: int = 10
-    ) -> tuple[list[dict], int]:
-        # Build base query
-        query = select(Product)
-
-        filter_mappings = {
-            "id": lambda v: Product.id == v,
-            "name": lambda v: Product.name.ilike(f"%{v}%"),
-            "slug": lambda v: Product.slug == v,
-            "min_price": lambda v: Product.price >= v,
-            "max_price": lambda v: Product.price <= v,
-            "min_discount": lambda v: Product.discount >= v,
-            "max_discount": lambda v: Product.discount <= v,
-            "min_tax": lambda v: Product.tax >= v,
-            "max_tax": lambda v: Product.tax <= v,
-            "min_stock": lambda v: Product.stock >= v,
-            "max_stock": lambda v: Product.stock <= v,
-            "category_id": lambda v: Product.category_id == v,
-            "tags": lambda v: Product.tags.ilike(f"%{v}%"),
-            "is_active": lambda v: Product.is_active == v,
-        }
-
-        # Apply filters
+    def _apply_filters(self, query, filters: dict):
+        """Restrict ``query`` over products to the ones matching filters."""
         for filter_name, filter_value in filters.items():
-            if filter_name in filter_mappings and filter_value is not None:
-                query = query.where(filter_mappings[filter_name](filter_value))
+            if filter_name in PRODUCT_FILTERS and filter_value is not None:
+                query = query.where(PRODUCT_FILTERS[filter_name](filter_value))
+
+        # Full-text search, served by the GIN index on search_vector
+        if filters.get("q"):
+            query = query.where(
+                Product.search_vector.op("@@")(_search_query(filters["q"]))
+            )
+
+        # Match whole tags, served by the GIN index on tag_list
+        if filters.get("tags"):
+            tags = filters["tags"].split(",")
+            query = query.where(
+                Product.tag_list.contains(tags)
+                if filters.get("tags_match") == "all"
+                else Product.tag_list.overlap(tags)
+            )
 
         # Handle subcategory filter separately due to join logic
         if filters.get("sub_category_id"):
@@ -97,25 +133,167 @@ class ProductRepository(BaseRepository):
                 Product.id.in_(association_query.scalar_subquery())
             )
 
-        # Apply sorting
-        if filters.get("sort_by"):
-            sort_column = getattr(Product, filters["sort_by"])
-            query = query.order_by(
-                sort_column.desc()
-                if filters.get("sort_order") == "desc"
-                else sort_column
+        return query
+
+    async def get_products(
+        self,
+        filters: dict,
+        page: int = 1,
+        page_size: int = 10,
+        cursor: str | None = None,
+        with_total: bool = True,
+    ) -> Page:
+        query = self._apply_filters(select(Product), filters)
+
+        # Apply sorting, the id breaks ties so that cursors are stable
+        keys = [Product.id]
+        descending = filters.get("sort_order") == "desc"
+        if filters.get("sort_by") and filters["sort_by"] != "id":
+            keys.insert(0, getattr(Product, filters["sort_by"]))
+        elif filters.get("q") and not filters.get("sort_by"):
+            # Rank search results by relevance
+            rank = func.ts_rank_cd(
+                Product.search_vector, _search_query(filters["q"]), type_=Float
+            ).label("search_rank")
+            query = query.add_columns(rank)
+            keys, descending = [rank, Product.id], True
+
+        return await self.get_paginated(
+            query,
+            page,
+            page_size,
+            cursor=cursor,
+            keys=keys,
+            descending=descending,
+            with_total=with_total,
+        )
+
+    async def get_facets(self, filters: dict) -> dict:
+        """Count the products matching filters per category, subcategory,
+        price bucket and tag, in a single grouped query.
+        """
+        price_buckets = PRODUCT_FACETS_CONFIGS["price_buckets"]
+        price_bucket = func.width_bucket(
+            Product.price, literal(price_buckets, ARRAY(Float))
+        )
+        filtered = self._apply_filters(
+            select(
+                Product.id,
+                Product.category_id,
+                Product.tag_list,
+                price_bucket.label("price_bucket"),
+            ),
+            filters,
+        ).subquery("filtered")
+        tags = (
+            func.unnest(filtered.c.tag_list)
+            .table_valued("tag")
+            .lateral("tags")
+        )
+
+        facet_columns = (
+            Category.id,
+            SubCategory.id,
+            filtered.c.price_bucket,
+            tags.c.tag,
+        )
+        q = (
+            select(
+                Category.id.label("category_id"),
+                Category.name.label("category_name"),
+                SubCategory.id.label("sub_category_id"),
+                SubCategory.name.label("sub_category_name"),
+                filtered.c.price_bucket,
+                tags.c.tag,
+                func.count(distinct(filtered.c.id)).label("count"),
+                func.grouping(*facet_columns).label("grouping"),
+            )
+            .select_from(filtered)
+            .join(Category, Category.id == filtered.c.category_id)
+            .outerjoin(
+                product_subcategory_association,
+                product_subcategory_association.c.product_id == filtered.c.id,
+            )
+            .outerjoin(
+                SubCategory,
+                SubCategory.id
+                == product_subcategory_association.c.sub_category_id,
+            )
+            .outerjoin(tags, true())
+            .group_by(
+                func.grouping_sets(
+                    tuple_(Category.id, Category.name),
+                    tuple_(SubCategory.id, SubCategory.name),
+                    tuple_(filtered.c.price_bucket),
+                    tuple_(tags.c.tag),
+                    tuple_(),
+                )
             )
+        )
+
+        facets = {
+            "total": 0,
+            "categories": [],
+            "sub_categories": [],
+            "price_buckets": [],
+            "tags": [],
+        }
+        async with self.db.begin(readonly=True) as connection:
+            result = await connection.execute(q)
+            for row in result:
+                # Bits of grouping(), most significant first, are set for
+                # the facet columns a row is not grouped by
+                if row.grouping == 0b1111:
+                    facets["total"] = row.count
+                elif row.grouping == 0b0111:
+                    facets["categories"].append(
+                        {
+                            "id": row.category_id,
+                            "name": row.category_name,
+                            "count": row.count,
+                        }
+                    )
+                elif row.grouping == 0b1011 and row.sub_category_id:
+                    facets["sub_categories"].append(
+                        {
+                            "id": row.sub_category_id,
+                            "name": row.sub_category_name,
+                            "count": row.count,
+                        }
+                    )
+                elif row.grouping == 0b1101:
+                    bucket = row.price_bucket
+                    facets["price_buckets"].append(
+                        {
+                            "min_price": (
+                                price_buckets[bucket - 1] if bucket else None
+                            ),
+                            "max_price": (
+                                price_buckets[bucket]
+                                if bucket < len(price_buckets)
+                                else None
+                            ),
+                            "count": row.count,
+                        }
+                    )
+                elif row.grouping == 0b1110 and row.tag:
+                    facets["tags"].append({"tag": row.tag, "count": row.count})
 
-        items, total = await self.get_paginated(query, page, page_size)
-        return items, total
+        for name in ("categories", "sub_categories", "tags"):
+            facets[name].sort(key=lambda facet: facet["count"], reverse=True)
+        facets["tags"] = facets["tags"][: PRODUCT_FACETS_CONFIGS["max_tags"]]
+        facets["price_buckets"].sort(key=lambda facet: facet["min_price"] or 0)
+
+        return facets
 
     async def update(
         self, product_id: int, product_update: UpdateProductRequestModel
     ) -> dict:
-        async with self.db.engine.begin() as connection:
+        async with self.db.begin() as connection:
             # Check if the product exist
-            q = select(Product).where(Product.id == product_id)
-            result = await connection.execute(q)
+            result = await connection.execute(
+                _PRODUCT_BY_ID_QUERY, {"id": product_id}
+            )
             if not (_ := result.fetchone()):
                 raise EntityNotFoundError(entity="Product")
 
@@ -154,17 +332,18 @@ class ProductRepository(BaseRepository):
 
             await connection.execute(q)
             logger.debug(f"Update product: {q}")
-            await connection.commit()
+            await self.db.after_commit(product_cache.invalidate)
+            await self.db.after_commit(cart_pricing.invalidate_all)
             return product_update.model_dump()
 
     async def delete(self, id: int):
-        async with self.db.engine.begin() as connection:
-            q = select(Product).where(Product.id == id)
-            result = await connection.execute(q)
+        async with self.db.begin() as connection:
+            result = await connection.execute(_PRODUCT_BY_ID_QUERY, {"id": id})
             if not (product := result.fetchone()):
                 raise EntityNotFoundError(entity="Product")
 
             q = delete(Product).where(Product.id == product.id)
             await connection.execute(q)
-            await connection.commit()
+            await self.db.after_commit(product_cache.invalidate)
+            await self.db.after_commit(cart_pricing.invalidate_all)
             return product._asdict()
@@ -1,6 +1,4 @@
-from math import ceil
-
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import JSONResponse
 from loguru import logger
 from starlette.status import (
@@ -11,11 +9,17 @@ from starlette.status import (
     HTTP_500_INTERNAL_SERVER_ERROR,
 )
 
-from app.exceptions import EntityIntegrityError, EntityNotFoundError
-from app.models import PaginatedResponse, PaginationParams
+from app.exceptions import (
+    EntityIntegrityError,
+    EntityNotFoundError,
+    InvalidCursorError,
+)
+from app.models import PaginatedResponse, PaginationParams, encode_page
 from app.permissions.utils import allowed_permissions
+from app.products.cache import product_cache
 from app.products.models import (
     CreateProductRequestModel,
+    ProductFacetsResponseModel,
     ProductQueryParams,
     ProductResponseModel,
     UpdateProductRequestModel,
@@ -74,27 +78,37 @@ async def create_product(
     },
 )
 async def get_products(
+    request: Request,
     query_params: ProductQueryParams = Depends(),
     pagination: PaginationParams = Depends(),
 ):
-    try:
-        repo = ProductRepository()
+    filters = query_params.to_filter_dict()
 
-        products, total = await repo.get_products(
-            filters=query_params.to_filter_dict(),
+    async def build() -> bytes:
+        repo = ProductRepository()
+        result = await repo.get_products(
+            filters=filters,
             page=pagination.page,
             page_size=pagination.page_size,
+            cursor=pagination.cursor,
+            with_total=pagination.with_total,
         )
 
-        total_pages = ceil(total / pagination.page_size)
-
-        return PaginatedResponse(
-            items=products,
-            total=total,
-            page=pagination.page,
-            page_size=pagination.page_size,
-            total_pages=total_pages,
+        result = result._replace(
+            items=[ProductResponseModel.from_row(row) for row in result.items]
         )
+        return encode_page(
+            PaginatedResponse[ProductResponseModel],
+            result,
+            pagination.page,
+            pagination.page_size,
+        )
+
+    try:
+        key = product_cache.make_key("list", filters, pagination.model_dump())
+        return await product_cache.respond(request, key, build)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail=str(e))
     except EntityNotFoundError as e:
         raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail=str(e))
     except Exception as e:
@@ -102,6 +116,37 @@ async def get_products(
         raise HTTPException(status_code=HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@router.get(
+    "/facets",
+    response_model=ProductFacetsResponseModel,
+    status_code=HTTP_200_OK,
+    openapi_extra={
+        "security": [
+            {"cookieAuth": [], "oauth2Auth": []},
+        ]
+    },
+)
+async def get_product_facets(
+    request: Request, query_params: ProductQueryParams = Depends()
+):
+    # Sorting never changes the facets, leave it out of the cache key
+    filters = query_params.model_dump(
+        exclude={"sort_by", "sort_order"}, exclude_none=True
+    )
+
+    async def build() -> bytes:
+        repo = ProductRepository()
+        facets = await repo.get_facets(filters=filters)
+        return ProductFacetsResponseModel(**facets).model_dump_json().encode()
+
+    try:
+        key = product_cache.make_key("facets", filters)
+        return await product_cache.respond(request, key, build)
+    except Exception as e:
+        logger.error(f"Error getting product facets: {e=}")
+        raise HTTPException(status_code=HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 @router.put(
     "/update/{id}",
     response_model=ProductResponseModel,
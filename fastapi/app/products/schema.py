@@ -1,12 +1,36 @@
-from sqlalchemy import Boolean, Column, Float, ForeignKey, Integer, String
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Computed,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 
 from app.config import Base
 from app.subcategories.schema import product_subcategory_association
 
+# Text search configuration of ``Product.search_vector`` and its queries
+SEARCH_CONFIG = "english"
+
 
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        Index(
+            "ix_products_search_vector",
+            "search_vector",
+            postgresql_using="gin",
+        ),
+        Index("ix_products_tag_list", "tag_list", postgresql_using="gin"),
+        Index("ix_products_category_id", "category_id"),
+        Index("ix_products_user_id", "user_id"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String(100), nullable=False)
@@ -21,6 +45,36 @@ class Product(Base):
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)
 
+    # Normalized ``tags``: lower-cased, trimmed and split on commas
+    tag_list = deferred(
+        Column(
+            ARRAY(Text),
+            Computed(
+                "CASE WHEN coalesce(btrim(tags), '') = '' THEN '{}'::text[] "
+                "ELSE regexp_split_to_array(lower(btrim(tags)), "
+                r"'\s*,\s*') END",
+                persisted=True,
+            ),
+        )
+    )
+
+    # Weighted document for full-text search, kept up to date by Postgres.
+    # Deferred so that it is never loaded along with the product itself.
+    search_vector = deferred(
+        Column(
+            TSVECTOR,
+            Computed(
+                f"setweight(to_tsvector('{SEARCH_CONFIG}', "
+                f"coalesce(name, '')), 'A') || "
+                f"setweight(to_tsvector('{SEARCH_CONFIG}', "
+                f"coalesce(tags, '')), 'B') || "
+                f"setweight(to_tsvector('{SEARCH_CONFIG}', "
+                f"coalesce(description, '')), 'C')",
+                persisted=True,
+            ),
+        )
+    )
+
     # One-to-many relationship with User
     user = relationship("User", back_populates="products")
 
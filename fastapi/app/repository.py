@@ -1,20 +1,217 @@
-from sqlalchemy import func, select
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+from sqlalchemy import Table, and_, func, or_, select, text, tuple_
+
+from app.cache import TTLCache
+from app.config import PAGINATION_CONFIGS
+from app.exceptions import InvalidCursorError
+
+# Label of the ``count(*) OVER ()`` column added to offset pages
+TOTAL_COLUMN = "_total"
+
+# Planner row estimates per table, see ``BaseRepository._estimate_total``
+_row_estimates = TTLCache(max_size=256, ttl=PAGINATION_CONFIGS["estimate_ttl"])
+
+
+class Page(NamedTuple):
+    items: list[dict]
+    total: Optional[int]
+    next_cursor: Optional[str]
+    total_is_estimate: bool = False
+
+
+def encode_cursor(keys: list, values: list, descending: bool) -> str:
+    """Encode the sort key values of the last row into an opaque cursor."""
+    payload = {
+        "k": [key.key for key in keys],
+        "d": descending,
+        "v": values,
+    }
+    raw = json.dumps(payload, default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, keys: list, descending: bool) -> list:
+    """Decode a cursor made by ``encode_cursor`` for the same sort keys."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        names, values = payload["k"], payload["v"]
+        cursor_descending = payload["d"]
+    except (binascii.Error, ValueError, TypeError, KeyError) as e:
+        raise InvalidCursorError() from e
+
+    if (
+        names != [key.key for key in keys]
+        or cursor_descending != descending
+        or len(values) != len(keys)
+    ):
+        raise InvalidCursorError(message="Cursor does not match the sorting")
+
+    try:
+        return [_coerce(key, value) for key, value in zip(keys, values)]
+    except (TypeError, ValueError) as e:
+        raise InvalidCursorError() from e
+
+
+def _coerce(key, value):
+    """Restore values which JSON stored as strings to the column type."""
+    python_type = key.type.python_type
+    if value is None or isinstance(value, python_type):
+        return value
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    return python_type(value)
+
+
+def _nullable(key) -> bool:
+    return getattr(key, "nullable", False)
+
+
+def _sort(key, descending: bool):
+    """Order by ``key``, with the NULLs of nullable keys always last."""
+    ordered = key.desc() if descending else key
+    return ordered.nulls_last() if _nullable(key) else ordered
+
+
+def _after_cursor(keys: list, values: list, descending: bool):
+    """Match the rows sorted after the row whose key values are ``values``.
+
+    Without nullable keys this is a row comparison, which an index on the
+    keys serves. A row comparison is never true against NULL though, so
+    with nullable keys it is spelled out key by key: NULLs sort last, a
+    NULL is followed only by rows tied on it, and a value by the NULLs.
+    """
+    if not any(_nullable(key) for key in keys):
+        if descending:
+            return tuple_(*keys) < tuple_(*values)
+        return tuple_(*keys) > tuple_(*values)
+
+    branches = []
+    for i, (key, value) in enumerate(zip(keys, values)):
+        if value is None:
+            continue
+        after = key < value if descending else key > value
+        if _nullable(key):
+            after = or_(after, key.is_(None))
+        ties = [
+            tied.is_(None) if tied_value is None else tied == tied_value
+            for tied, tied_value in zip(keys[:i], values[:i])
+        ]
+        branches.append(and_(*ties, after))
+    return or_(*branches)
 
 
 class BaseRepository:
     def __init__(self, db):
         self.db = db
 
+    async def _estimate_total(self, connection, query) -> Optional[int]:
+        """Return the planner's row estimate for an unfiltered huge table.
+
+        Returns None, meaning an exact count is needed, when estimates
+        are disabled, the query filters or joins, or the table is below
+        the configured threshold.
+        """
+        threshold = PAGINATION_CONFIGS["estimate_threshold"]
+        froms = query.get_final_froms()
+        if (
+            threshold <= 0
+            or query.whereclause is not None
+            or len(froms) != 1
+            or not isinstance(froms[0], Table)
+        ):
+            return None
+
+        table = froms[0].fullname
+        if (estimate := _row_estimates.get(table)) is None:
+            estimate = await connection.scalar(
+                text(
+                    "SELECT reltuples::bigint FROM pg_class "
+                    "WHERE oid = to_regclass(:table)"
+                ),
+                {"table": table},
+            )
+            # reltuples is -1 for tables which were never analyzed
+            estimate = -1 if estimate is None else estimate
+            _row_estimates.set(table, estimate)
+
+        return estimate if estimate >= threshold else None
+
     async def get_paginated(
-        self, query, page: int = 1, page_size: int = 10
-    ) -> tuple[list[dict], int]:
-        async with self.db.engine.begin() as connection:
-            count_query = select(func.count()).select_from(query.subquery())
-            total = await connection.scalar(count_query)
-
-            offset = (page - 1) * page_size
-            paginated_query = query.offset(offset).limit(page_size)
-            result = await connection.execute(paginated_query)
-            items = result.fetchall()
-
-            return [item._asdict() for item in items], total
+        self,
+        query,
+        page: int = 1,
+        page_size: int = 10,
+        cursor: str | None = None,
+        keys: list | None = None,
+        descending: bool = False,
+        with_total: bool = True,
+    ) -> Page:
+        """Paginate ``query`` by offset, or by keyset when given a cursor.
+
+        ``keys`` are the columns the rows are ordered by, ending with a
+        unique one. When given, every page except the last comes with a
+        cursor for the next one. NULLs of nullable keys sort last in
+        either direction.
+
+        Offset pages count the matching rows with a window function in
+        the same statement as the page itself. Keyset pages, and pages
+        requested ``with_total=False``, skip the count and have a total
+        of None.
+        """
+        if cursor and not keys:
+            raise InvalidCursorError(message="Cursor is not supported here")
+
+        if keys:
+            query = query.order_by(*(_sort(key, descending) for key in keys))
+
+        total = None
+        total_is_estimate = False
+        count_rows = False
+        async with self.db.begin(readonly=True) as connection:
+            if cursor:
+                values = decode_cursor(cursor, keys, descending)
+                query = query.where(_after_cursor(keys, values, descending))
+            else:
+                if with_total:
+                    total = await self._estimate_total(connection, query)
+                    total_is_estimate = total is not None
+                    count_rows = not total_is_estimate
+
+                if count_rows:
+                    count_query = select(func.count()).select_from(
+                        query.order_by(None).subquery()
+                    )
+                    query = query.add_columns(
+                        func.count().over().label(TOTAL_COLUMN)
+                    )
+                query = query.offset((page - 1) * page_size)
+
+            # Fetch one extra row to know whether there is a next page
+            result = await connection.execute(query.limit(page_size + 1))
+            items = [item._asdict() for item in result.fetchall()]
+
+            if count_rows:
+                if items:
+                    total = items[0][TOTAL_COLUMN]
+                    for item in items:
+                        del item[TOTAL_COLUMN]
+                elif page > 1:
+                    # Past the last page there is no row to carry the count
+                    total = await connection.scalar(count_query)
+                else:
+                    total = 0
+
+        next_cursor = None
+        if keys and len(items) > page_size:
+            next_cursor = encode_cursor(
+                keys,
+                [items[page_size - 1][key.key] for key in keys],
+                descending,
+            )
+
+        return Page(items[:page_size], total, next_cursor, total_is_estimate)
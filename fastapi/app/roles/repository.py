@@ -1,13 +1,15 @@
+from functools import partial
+
 from loguru import logger
 from sqlalchemy import delete, insert, select, update
 from sqlalchemy.exc import IntegrityError
 
 from app.database import DatabaseManager
 from app.exceptions import EntityIntegrityError, EntityNotFoundError
+from app.permissions.cache import permission_cache
 from app.permissions.schema import Permission, role_permission_association
-from app.repository import BaseRepository
+from app.repository import BaseRepository, Page
 from app.roles.models import (
-    AllRolesResponseModel,
     RoleCreateModel,
     RoleResponseModel,
     RoleUpdateModel,
@@ -20,14 +22,13 @@ class RoleRepository(BaseRepository):
         self.db = DatabaseManager._instance
 
     async def create(self, role: RoleCreateModel) -> RoleResponseModel:
-        async with self.db.engine.begin() as connection:
+        async with self.db.begin() as connection:
             try:
                 q = insert(Role).values(
                     name=role.name,
                     description=role.description,
                 )
                 result = await connection.execute(q)
-                await connection.commit()
 
                 return RoleResponseModel(
                     id=result.inserted_primary_key[0],
@@ -42,23 +43,6 @@ class RoleRepository(BaseRepository):
                 logger.error(f"Error creating role: {e=}")
                 raise e
 
-    async def _build_base_query(self, include_permissions: bool) -> select:
-        """Build the base query with or without permissions join."""
-        if include_permissions:
-            return (
-                select(Role, Permission.name.label("permission_name"))
-                .outerjoin(
-                    role_permission_association,
-                    Role.id == role_permission_association.c.role_id,
-                )
-                .outerjoin(
-                    Permission,
-                    Permission.id
-                    == role_permission_association.c.permission_id,
-                )
-            )
-        return select(Role)
-
     async def _apply_role_filter(
         self, query: select, role_id: int | None
     ) -> select:
@@ -67,25 +51,34 @@ class RoleRepository(BaseRepository):
             return query.where(Role.id >= role_id)
         return query
 
-    async def _process_items_with_permissions(
-        self, items: list[dict]
-    ) -> list[dict]:
-        """Process items to include grouped permissions."""
-        role_permissions = {}
-        for item in items:
-            role_id = item["id"]
-            if role_id not in role_permissions:
-                role_permissions[role_id] = {
-                    "id": item["id"],
-                    "name": item["name"],
-                    "description": item["description"],
-                    "permissions": [],
-                }
-            if item["permission_name"]:
-                role_permissions[role_id]["permissions"].append(
-                    item["permission_name"]
+    async def _attach_permissions(self, items: list[dict]) -> list[dict]:
+        """Attach the permission names of each role in a single query."""
+        role_permissions = {item["id"]: [] for item in items}
+        if not role_permissions:
+            return items
+
+        async with self.db.begin() as connection:
+            q = (
+                select(
+                    role_permission_association.c.role_id,
+                    Permission.name,
+                )
+                .join(
+                    Permission,
+                    Permission.id
+                    == role_permission_association.c.permission_id,
+                )
+                .where(
+                    role_permission_association.c.role_id.in_(role_permissions)
                 )
-        return list(role_permissions.values())
+            )
+            result = await connection.execute(q)
+            for row in result:
+                role_permissions[row.role_id].append(row.name)
+
+        for item in items:
+            item["permissions"] = role_permissions[item["id"]]
+        return items
 
     async def get_all(
         self,
@@ -93,7 +86,9 @@ class RoleRepository(BaseRepository):
         page_size: int = 10,
         role_id: int = None,
         include_permissions: bool = False,
-    ) -> dict:
+        cursor: str | None = None,
+        with_total: bool = True,
+    ) -> Page:
         """
         Get all roles with pagination and optional permissions.
 
@@ -102,45 +97,43 @@ class RoleRepository(BaseRepository):
             page_size: Number of items per page
             role_id: Optional role ID filter
             include_permissions: Whether to include permissions in the response
+            cursor: Optional cursor of the next page, replaces page
+            with_total: Whether to count the matching roles
         """
-        async with self.db.engine.begin() as connection:
-            try:
-                # Build and configure query
-                query = await self._build_base_query(include_permissions)
-                query = await self._apply_role_filter(query, role_id)
-
-                # Get paginated results
-                items, total = await self.get_paginated(query, page, page_size)
-
-                # Process items if permissions are included
-                if include_permissions:
-                    items = await self._process_items_with_permissions(items)
-
-                # Create and return response
-                total_pages = (total + page_size - 1) // page_size
-
-                return AllRolesResponseModel(
-                    items=[
-                        RoleResponseModel(
-                            id=item["id"],
-                            name=item["name"],
-                            description=item["description"],
-                            permissions=item.get("permissions", []),
-                        )
-                        for item in items
-                    ],
-                    total=total,
-                    page=page,
-                    page_size=page_size,
-                    total_pages=total_pages,
-                ).model_dump()
+        try:
+            # Paginate the roles themselves, permissions are fetched after
+            query = await self._apply_role_filter(select(Role), role_id)
+            result = await self.get_paginated(
+                query,
+                page,
+                page_size,
+                cursor=cursor,
+                keys=[Role.id],
+                with_total=with_total,
+            )
 
-            except Exception as e:
-                logger.error(f"Error in get_all roles: {e}")
-                raise
+            items = result.items
+            if include_permissions:
+                items = await self._attach_permissions(items)
+
+            return result._replace(
+                items=[
+                    RoleResponseModel.model_construct(
+                        id=item["id"],
+                        name=item["name"],
+                        description=item["description"],
+                        permissions=item.get("permissions", []),
+                    )
+                    for item in items
+                ]
+            )
+
+        except Exception as e:
+            logger.error(f"Error in get_all roles: {e}")
+            raise
 
     async def get(self, id: int) -> RoleResponseModel:
-        async with self.db.engine.begin() as connection:
+        async with self.db.begin() as connection:
             # Get role and join with permissions
             q = (
                 select(Role, Permission.name.label("permission_name"))
@@ -180,7 +173,7 @@ class RoleRepository(BaseRepository):
             ).model_dump()
 
     async def update(self, id: int, role_update: RoleUpdateModel) -> dict:
-        async with self.db.engine.begin() as connection:
+        async with self.db.begin() as connection:
             try:
                 # Check if the role exists
                 q = select(Role).where(Role.id == id)
@@ -222,6 +215,9 @@ class RoleRepository(BaseRepository):
                         q = insert(role_permission_association).values(values)
                         await connection.execute(q)
 
+                    # Reject tokens carrying the previous permissions
+                    update_values["version"] = Role.version + 1
+
                 # Update role if there are values to update
                 if update_values:
                     q = (
@@ -262,7 +258,9 @@ class RoleRepository(BaseRepository):
                     ],
                 }
 
-                await connection.commit()
+                await self.db.after_commit(
+                    partial(permission_cache.invalidate_role, id)
+                )
                 return role_data
 
             except Exception as e:
@@ -270,7 +268,7 @@ class RoleRepository(BaseRepository):
                 raise
 
     async def associate_permission(self, role: int, permission: str):
-        async with self.db.engine.begin() as connection:
+        async with self.db.begin() as connection:
             try:
                 # Get the role id from role name
                 q = select(Role).where(Role.name == role)
@@ -297,7 +295,16 @@ class RoleRepository(BaseRepository):
                     role_id=role_id, permission_id=permission_id
                 )
                 await connection.execute(q)
-                await connection.commit()
+
+                q = (
+                    update(Role)
+                    .where(Role.id == role_id)
+                    .values(version=Role.version + 1)
+                )
+                await connection.execute(q)
+                await self.db.after_commit(
+                    partial(permission_cache.invalidate_role, role_id)
+                )
                 return True
             except IntegrityError:
                 logger.warning(
@@ -312,7 +319,7 @@ class RoleRepository(BaseRepository):
                 raise e
 
     async def delete(self, id: int):
-        async with self.db.engine.begin() as connection:
+        async with self.db.begin() as connection:
             try:
                 q = select(Role).where(Role.id == id)
                 result = await connection.execute(q)
@@ -321,7 +328,9 @@ class RoleRepository(BaseRepository):
 
                 q = delete(Role).where(Role.id == id)
                 await connection.execute(q)
-                await connection.commit()
+                await self.db.after_commit(
+                    partial(permission_cache.invalidate_role, id)
+                )
                 return True
             except EntityNotFoundError as e:
                 logger.error(f"Error deleting role: {e=}")
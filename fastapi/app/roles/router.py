@@ -15,9 +15,10 @@ from starlette.status import (
 from app.exceptions import (
     EntityIntegrityError,
     EntityNotFoundError,
+    InvalidCursorError,
     NotEnoughPermissionsError,
 )
-from app.models import PaginationParams
+from app.models import PaginationParams, RawJSONResponse, encode_page
 from app.permissions.utils import allowed_permissions
 from app.roles.models import (
     AllRolesResponseModel,
@@ -77,13 +78,24 @@ async def get_all_roles(
 ):
     try:
         repo = RoleRepository()
-        all_roles = await repo.get_all(
+        result = await repo.get_all(
             page=pagination.page,
             page_size=pagination.page_size,
             role_id=role_id,
             include_permissions=include_permissions,
+            cursor=pagination.cursor,
+            with_total=pagination.with_total,
         )
-        return JSONResponse(content=all_roles, status_code=HTTP_200_OK)
+        return RawJSONResponse(
+            encode_page(
+                AllRolesResponseModel,
+                result,
+                pagination.page,
+                pagination.page_size,
+            )
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting all roles: {e=}")
         raise HTTPException(status_code=HTTP_500_INTERNAL_SERVER_ERROR)
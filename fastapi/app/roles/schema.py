@@ -11,6 +11,9 @@ class Role(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String(50), unique=True, nullable=False)
     description = Column(String(255), nullable=True)
+    # Bumped whenever the role's permissions change, so that tokens
+    # carrying permission claims for an older version get rejected.
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
     users = relationship("User", back_populates="role")
 
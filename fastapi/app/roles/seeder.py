@@ -1,8 +1,11 @@
 from loguru import logger
+from sqlalchemy import String, column, select, update, values
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
-from app.exceptions import EntityIntegrityError
+from app.database import DatabaseManager
+from app.permissions.cache import permission_cache
+from app.permissions.schema import Permission, role_permission_association
 from app.roles.models import RoleCreateModel
-from app.roles.repository import RoleRepository
 from app.roles.schema import Role
 
 
@@ -122,27 +125,62 @@ class Seeder(object):
             {"role": "seller", "permission": "update_address"},
             {"role": "seller", "permission": "delete_address"},
         ]
+        + [
+            {"role": "admin", "permission": "read_internal_stats"},
+            {"role": "tester", "permission": "read_internal_stats"},
+        ]
     )
 
     @staticmethod
     async def run():
-        repo = RoleRepository()
-        for value in Seeder.ROLE_VALUES:
-            try:
-                await repo.create(value)
-            except EntityIntegrityError:
-                pass
-            except Exception as e:
-                logger.error(f"Error seeding role: {e=}")
+        """Insert the missing roles and associations, set-based.
+
+        Roles which gain permissions get their version bumped, like
+        ``RoleRepository.associate_permission`` does.
+        """
+        roles = (
+            pg_insert(Role)
+            .values([value.model_dump() for value in Seeder.ROLE_VALUES])
+            .on_conflict_do_nothing(index_elements=[Role.name])
+        )
+
+        pairs = values(
+            column("role", String),
+            column("permission", String),
+            name="seed_role_permissions",
+        ).data(
+            [
+                (value["role"], value["permission"])
+                for value in Seeder.ROLE_PERMISSION_ASSOCIATION
+            ]
+        )
+        associations = (
+            pg_insert(role_permission_association)
+            .from_select(
+                ["role_id", "permission_id"],
+                select(Role.id, Permission.id)
+                .select_from(pairs)
+                .join(Role, Role.name == pairs.c.role)
+                .join(Permission, Permission.name == pairs.c.permission),
+            )
+            .on_conflict_do_nothing()
+            .returning(role_permission_association.c.role_id)
+        )
+
+        db_instance = DatabaseManager._instance
+        async with db_instance.begin() as connection:
+            result = await connection.execute(roles)
+            logger.info(f"Seeding roles, {result.rowcount} new")
 
-        for value in Seeder.ROLE_PERMISSION_ASSOCIATION:
-            try:
-                await repo.associate_permission(
-                    value["role"], value["permission"]
+            result = await connection.execute(associations)
+            if role_ids := set(result.scalars()):
+                await connection.execute(
+                    update(Role)
+                    .where(Role.id.in_(role_ids))
+                    .values(version=Role.version + 1)
                 )
-            except EntityIntegrityError:
-                pass
-            except Exception as e:
-                logger.error(f"Error seeding role: {e=}")
+                await db_instance.after_commit(permission_cache.invalidate_all)
 
-        logger.info("Seeding roles completed")
+        logger.info(
+            f"Seeding roles completed, {len(role_ids)} roles gained permissions"
+        )
@@ -0,0 +1,80 @@
+import hashlib
+import json
+
+from loguru import logger
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.database import DatabaseManager, UnitOfWork
+from app.permissions.seeder import Seeder as PermissionSeeder
+from app.roles.seeder import Seeder as RoleSeeder
+from app.seeding.schema import SeedVersion
+from app.users.seeder import Seeder as UserSeeder
+
+SEED_NAME = "default"
+
+# Bump when the seeders change in a way their values do not show
+SEED_FORMAT = 1
+
+# Serializes the seeding of processes booting at the same time
+SEED_LOCK_ID = 0x5EED
+
+
+def checksum() -> str:
+    """Hash every seeded value, so that any change triggers a new run."""
+    payload = {
+        "format": SEED_FORMAT,
+        "permissions": [
+            value.model_dump(mode="json") for value in PermissionSeeder.VALUES
+        ],
+        "roles": [
+            value.model_dump(mode="json") for value in RoleSeeder.ROLE_VALUES
+        ],
+        "role_permissions": RoleSeeder.ROLE_PERMISSION_ASSOCIATION,
+        "users": [
+            value.model_dump(mode="json") for value in UserSeeder.VALUES
+        ],
+    }
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+async def run_seeders():
+    """Seed the database unless these exact values were seeded already.
+
+    Everything runs in one transaction under an advisory lock, so
+    processes booting together seed once and the others find the marker.
+    """
+    db_instance = DatabaseManager._instance
+    expected = checksum()
+
+    async with UnitOfWork(db_instance):
+        async with db_instance.begin() as connection:
+            await connection.execute(
+                text("SELECT pg_advisory_xact_lock(:lock_id)"),
+                {"lock_id": SEED_LOCK_ID},
+            )
+            current = await connection.scalar(
+                select(SeedVersion.checksum).where(
+                    SeedVersion.name == SEED_NAME
+                )
+            )
+            if current == expected:
+                logger.info("Seeding skipped, seeds are up to date")
+                return
+
+            await PermissionSeeder().run()
+            await RoleSeeder().run()
+            await UserSeeder().run()
+
+            q = pg_insert(SeedVersion).values(
+                name=SEED_NAME, checksum=expected
+            )
+            await connection.execute(
+                q.on_conflict_do_update(
+                    index_elements=[SeedVersion.name],
+                    set_={"checksum": expected, "applied_at": func.now()},
+                )
+            )
+
+    logger.info(f"Seeding completed, seed version {expected[:12]}")
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, DateTime, String, func
+
+from app.config import Base
+
+
+class SeedVersion(Base):
+    __tablename__ = "seed_versions"
+
+    name = Column(String(50), primary_key=True)
+    # sha256 of the seeded values, see ``app.seeding.runner.checksum``
+    checksum = Column(String(64), nullable=False)
+    applied_at = Column(DateTime, nullable=False, server_default=func.now())
@@ -4,9 +4,11 @@ from sqlalchemy.exc import IntegrityError, NoResultFound
 from app.categories.schema import Category
 from app.database import DatabaseManager
 from app.exceptions import EntityIntegrityError, EntityNotFoundError
+from app.products.cache import product_cache
 from app.subcategories.models import (
     AllSubCategoriesResponseModel,
     SubCategoryCreateModel,
+    SubCategoryResponseModel,
 )
 from app.subcategories.schema import SubCategory
 
@@ -16,7 +18,7 @@ class ProductSubCategoryRepository:
         self.db = DatabaseManager._instance
 
     async def create(self, sub_category: SubCategoryCreateModel):
-        async with self.db.engine.begin() as connection:
+        async with self.db.begin() as connection:
             try:
                 # check if the category exists
                 q = select(Category).where(
@@ -34,7 +36,6 @@ class ProductSubCategoryRepository:
                         category_id=sub_category.category_id,
                     )
                 )
-                await connection.commit()
                 return {
                     "id": result.inserted_primary_key[0],
                     "name": sub_category.name,
@@ -44,7 +45,7 @@ class ProductSubCategoryRepository:
                 raise EntityIntegrityError(entity="Sub-Category")
 
     async def get_by_id(self, id: int) -> SubCategory:
-        async with self.db.engine.begin() as connection:
+        async with self.db.begin(readonly=True) as connection:
             q = select(SubCategory).where(SubCategory.id == id)
             result = await connection.execute(q)
             sub_category = result.fetchone()
@@ -54,22 +55,21 @@ class ProductSubCategoryRepository:
             return sub_category._asdict()
 
     async def get_all(self) -> AllSubCategoriesResponseModel:
-        async with self.db.engine.begin() as connection:
+        async with self.db.begin(readonly=True) as connection:
             result = await connection.execute(select(SubCategory))
-            sub_categories = result.fetchall()
-            return AllSubCategoriesResponseModel(
+            return AllSubCategoriesResponseModel.model_construct(
                 sub_categories=[
-                    {
-                        "id": sub_category.id,
-                        "name": sub_category.name,
-                        "category_id": sub_category.category_id,
-                    }
-                    for sub_category in sub_categories
+                    SubCategoryResponseModel.model_construct(
+                        id=sub_category.id,
+                        name=sub_category.name,
+                        category_id=sub_category.category_id,
+                    )
+                    for sub_category in result
                 ]
             )
 
     async def delete(self, id: int):
-        async with self.db.engine.begin() as connection:
+        async with self.db.begin() as connection:
             q = select(SubCategory).where(SubCategory.id == id)
             result = await connection.execute(q)
             if not (sub_category := result.fetchone()):
@@ -77,5 +77,5 @@ class ProductSubCategoryRepository:
 
             q = delete(SubCategory).where(SubCategory.id == sub_category.id)
             await connection.execute(q)
-            await connection.commit()
+            await self.db.after_commit(product_cache.invalidate)
             return sub_category._asdict()
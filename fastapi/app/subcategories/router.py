@@ -15,6 +15,7 @@ from app.exceptions import (
     EntityNotFoundError,
     NotEnoughPermissionsError,
 )
+from app.models import RawJSONResponse, encode_json
 from app.permissions.utils import allowed_permissions
 from app.subcategories.models import (
     AllSubCategoriesResponseModel,
@@ -96,8 +97,8 @@ async def get_sub_category():
     try:
         repo = ProductSubCategoryRepository()
         all_sub_categories = await repo.get_all()
-        return JSONResponse(
-            content=all_sub_categories.model_dump(),
+        return RawJSONResponse(
+            encode_json(all_sub_categories),
             status_code=(
                 HTTP_200_OK if all_sub_categories else HTTP_404_NOT_FOUND
             ),
@@ -84,3 +84,104 @@ async def test_add_items_to_cart_without_id(
     response_json = response.json()
     logger.debug(response_json)
     assert response.status_code == HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_add_items_to_cart_with_negative_quantity(
+    client: AsyncClient,
+    cart: dict,
+    product: dict,
+    add_to_cart_request_payload: dict,
+    tester_access_token: str,
+):
+    request_payload = add_to_cart_request_payload.copy()
+
+    request_payload["cart_id"] = cart["id"]
+    request_payload["product_id"] = product["id"]
+    request_payload["quantity"] = -1
+
+    response = await client.post(
+        "/api/v1/cart/add-item",
+        json=request_payload,
+        headers={"Authorization": f"Bearer {tester_access_token}"},
+    )
+    response_json = response.json()
+    logger.debug(response_json)
+    assert response.status_code == HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_add_many_items_to_cart(
+    client: AsyncClient,
+    cart: dict,
+    product: dict,
+    tester_access_token: str,
+):
+    cart_id, product_id = cart["id"], product["id"]
+    request_payload = {
+        "cart_id": cart_id,
+        "items": [
+            {"product_id": product_id, "quantity": 1},
+            {"product_id": product_id, "quantity": 2},
+        ],
+    }
+
+    response = await client.post(
+        "/api/v1/cart/add-items",
+        json=request_payload,
+        headers={"Authorization": f"Bearer {tester_access_token}"},
+    )
+    response_json = response.json()
+    logger.debug(response_json)
+    assert response.status_code == HTTP_200_OK
+    assert response_json["id"] == cart_id
+    assert [
+        (item["product_id"], item["quantity"])
+        for item in response_json["items"]
+    ] == [(product_id, 3)]
+
+    # Items come with a snapshot of their product
+    item_product = response_json["items"][0]["product"]
+    assert item_product["name"] == product["name"]
+    assert float(item_product["price"]) == float(product["price"])
+
+    # Adding a product already in the cart updates its quantity
+    response = await client.post(
+        "/api/v1/cart/add-items",
+        json=request_payload,
+        headers={"Authorization": f"Bearer {tester_access_token}"},
+    )
+    response_json = response.json()
+    assert response.status_code == HTTP_200_OK
+    assert [
+        (item["product_id"], item["quantity"])
+        for item in response_json["items"]
+    ] == [(product_id, 6)]
+
+    response = await client.delete(
+        f"/api/v1/cart/remove-item/{cart_id}/{product_id}",
+        headers={"Authorization": f"Bearer {tester_access_token}"},
+    )
+    assert response.status_code == HTTP_200_OK
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_add_many_items_with_unknown_product(
+    client: AsyncClient,
+    cart: dict,
+    product: dict,
+    tester_access_token: str,
+):
+    response = await client.post(
+        "/api/v1/cart/add-items",
+        json={
+            "cart_id": cart["id"],
+            "items": [
+                {"product_id": product["id"], "quantity": 1},
+                {"product_id": 2**31 - 1, "quantity": 1},
+            ],
+        },
+        headers={"Authorization": f"Bearer {tester_access_token}"},
+    )
+    assert response.status_code == HTTP_404_NOT_FOUND
+    assert response.json()["detail"] == "This Product does not exist"
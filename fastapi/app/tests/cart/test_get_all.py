@@ -133,6 +133,7 @@ async def test_get_nonexistent_cart_id(
     assert response.status_code == HTTP_200_OK
     assert len(response_json["items"]) == 0
     assert response_json["total"] == 1
+    assert response_json["total_pages"] == 1
 
 
 @pytest.mark.asyncio(loop_scope="session")
@@ -0,0 +1,68 @@
+from decimal import Decimal
+
+import pytest
+
+from app.cache import MemoryCacheBackend
+from app.cart.models import CartTotalsResponseModel
+from app.cart.pricing import CartPricing
+
+
+class SharedBackend(MemoryCacheBackend):
+    """Stands in for Redis, as if every process saw these entries."""
+
+    shared = True
+
+
+def make_pricing(backend, state) -> tuple[CartPricing, list]:
+    computed = []
+    pricing = CartPricing(backend=backend, state=state, ttl=60)
+
+    async def compute(user_id: int, cart_id: int):
+        computed.append(cart_id)
+        return CartTotalsResponseModel(
+            cart_id=cart_id,
+            items_count=1,
+            quantity=2,
+            subtotal=Decimal("10.00"),
+            discount=Decimal("0.00"),
+            tax=Decimal("1.00"),
+            total=Decimal("11.00"),
+        )
+
+    pricing._compute = compute
+    return pricing, computed
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_totals_cached_per_cart_version():
+    cart_pricing, computed = make_pricing(SharedBackend(), SharedBackend())
+    assert cart_pricing.enabled
+
+    totals = await cart_pricing.get_totals(user_id=1, cart_id=1)
+    assert await cart_pricing.get_totals(user_id=1, cart_id=1) == totals
+    assert computed == [1]
+
+    await cart_pricing.get_totals(user_id=1, cart_id=2)
+    await cart_pricing.invalidate_cart(1)
+    await cart_pricing.get_totals(user_id=1, cart_id=1)
+    await cart_pricing.get_totals(user_id=1, cart_id=2)
+    assert computed == [1, 2, 1]
+
+    await cart_pricing.invalidate_all()
+    await cart_pricing.get_totals(user_id=1, cart_id=1)
+    await cart_pricing.get_totals(user_id=1, cart_id=2)
+    assert computed == [1, 2, 1, 1, 2]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_totals_not_cached_in_process_local_backends():
+    for backend, state in (
+        (MemoryCacheBackend(), SharedBackend()),
+        (SharedBackend(), MemoryCacheBackend()),
+    ):
+        cart_pricing, computed = make_pricing(backend, state)
+        assert not cart_pricing.enabled
+
+        await cart_pricing.get_totals(user_id=1, cart_id=1)
+        await cart_pricing.get_totals(user_id=1, cart_id=1)
+        assert computed == [1, 1]
@@ -0,0 +1,88 @@
+import datetime
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select, update
+from starlette.status import HTTP_200_OK, HTTP_201_CREATED
+
+from app.cart.schema import Cart, CartStatus
+from app.cart.sweeper import AbandonedCartSweeper
+from app.database import DatabaseManager
+
+
+async def create_cart(client: AsyncClient, token: str) -> int:
+    response = await client.post(
+        "/api/v1/cart/create",
+        json={"name": str(uuid4()), "reminder_date": None},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == HTTP_201_CREATED
+    return response.json()["id"]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_sweep_abandons_stale_carts(
+    client: AsyncClient, tester_access_token: str
+):
+    now = datetime.datetime.now(tz=datetime.timezone.utc)
+    stale = now - datetime.timedelta(days=4)
+    carts = {
+        "stale active": (CartStatus.ACTIVE, stale),
+        "stale inactive": (CartStatus.INACTIVE, stale),
+        "fresh active": (CartStatus.ACTIVE, now - datetime.timedelta(days=1)),
+        "abandoned": (CartStatus.ABANDONED, stale),
+    }
+    cart_ids = {}
+    db_instance = DatabaseManager._instance
+    for name, (status, reminder_date) in carts.items():
+        cart_ids[name] = await create_cart(client, tester_access_token)
+        async with db_instance.begin() as connection:
+            await connection.execute(
+                update(Cart)
+                .where(Cart.id == cart_ids[name])
+                .values(status=status, reminder_date=reminder_date)
+            )
+
+    try:
+        # The application's own sweeper may get to some of them first
+        sweeper = AbandonedCartSweeper(interval=0, abandon_after_days=3)
+        await sweeper.sweep()
+
+        async with db_instance.begin() as connection:
+            result = await connection.execute(
+                select(Cart.id, Cart.status, Cart.reminder_date).where(
+                    Cart.id.in_(cart_ids.values())
+                )
+            )
+            rows = {row.id: row for row in result}
+
+        for name in ("stale active", "stale inactive"):
+            row = rows[cart_ids[name]]
+            assert row.status == CartStatus.ABANDONED
+            assert row.reminder_date is None
+
+        fresh = rows[cart_ids["fresh active"]]
+        assert fresh.status == CartStatus.ACTIVE
+        assert fresh.reminder_date is not None
+
+        # Carts abandoned before are left alone
+        abandoned = rows[cart_ids["abandoned"]]
+        assert abandoned.status == CartStatus.ABANDONED
+        assert abandoned.reminder_date is not None
+    finally:
+        for cart_id in cart_ids.values():
+            response = await client.delete(
+                "/api/v1/cart",
+                params={"id": cart_id},
+                headers={"Authorization": f"Bearer {tester_access_token}"},
+            )
+            assert response.status_code == HTTP_200_OK
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_sweeper_disabled_by_zero_interval():
+    sweeper = AbandonedCartSweeper(interval=0)
+    sweeper.start()
+    assert sweeper._task is None
+    await sweeper.stop()
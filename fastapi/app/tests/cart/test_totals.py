@@ -0,0 +1,72 @@
+from decimal import Decimal
+
+import pytest
+from httpx import AsyncClient
+from loguru import logger
+from starlette.status import HTTP_200_OK, HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_get_cart_totals(
+    client: AsyncClient,
+    cart: dict,
+    product: dict,
+    tester_access_token: str,
+):
+    headers = {"Authorization": f"Bearer {tester_access_token}"}
+    cart_id, product_id = cart["id"], product["id"]
+    price = Decimal(str(product["price"]))
+    discount = Decimal(str(product["discount"]))
+
+    for quantity in (2, 3):
+        response = await client.post(
+            "/api/v1/cart/add-items",
+            json={
+                "cart_id": cart_id,
+                "items": [{"product_id": product_id, "quantity": quantity}],
+            },
+            headers=headers,
+        )
+        assert response.status_code == HTTP_200_OK
+
+        # Totals follow every change to the cart items
+        response = await client.get(
+            f"/api/v1/cart/totals/{cart_id}", headers=headers
+        )
+        response_json = response.json()
+        logger.debug(response_json)
+        assert response.status_code == HTTP_200_OK
+
+    subtotal = price * 5
+    assert response_json["items_count"] == 1
+    assert response_json["quantity"] == 5
+    assert Decimal(response_json["subtotal"]) == subtotal
+    assert Decimal(response_json["discount"]) == subtotal * discount / 100
+    assert Decimal(response_json["total"]) == (
+        subtotal
+        - Decimal(response_json["discount"])
+        + Decimal(response_json["tax"])
+    )
+
+    response = await client.delete(
+        f"/api/v1/cart/remove-item/{cart_id}/{product_id}", headers=headers
+    )
+    assert response.status_code == HTTP_200_OK
+
+    response = await client.get(
+        f"/api/v1/cart/totals/{cart_id}", headers=headers
+    )
+    assert response.status_code == HTTP_200_OK
+    assert response.json()["quantity"] == 0
+    assert Decimal(response.json()["total"]) == 0
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_get_someone_else_cart_totals(
+    client: AsyncClient, cart: dict, customer_access_token: str
+):
+    response = await client.get(
+        f"/api/v1/cart/totals/{cart['id']}",
+        headers={"Authorization": f"Bearer {customer_access_token}"},
+    )
+    assert response.status_code == HTTP_404_NOT_FOUND
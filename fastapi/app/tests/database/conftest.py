@@ -0,0 +1,23 @@
+import pytest
+
+from app import database
+from app.cache import MemoryCacheBackend
+from app.config import DB_CONFIGS
+from app.database import DatabaseManager
+from app.tests.database.fakes import FakeEngine
+
+
+@pytest.fixture
+def db(monkeypatch) -> DatabaseManager:
+    """A database manager on a fake primary and a fake replica."""
+    # Bypass the singleton, the application may hold the real one
+    db = object.__new__(DatabaseManager)
+    DatabaseManager.__init__(db)
+    db.engine = FakeEngine("primary")
+    db.replica_hosts = ["replica"]
+    db.replica_engines = [FakeEngine("replica")]
+
+    monkeypatch.setattr(DatabaseManager, "_instance", db)
+    monkeypatch.setattr(database, "state_backend", MemoryCacheBackend())
+    monkeypatch.setitem(DB_CONFIGS, "read_your_writes_window", 5)
+    return db
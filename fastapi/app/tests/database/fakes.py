@@ -0,0 +1,33 @@
+class FakeConnection:
+    """Records what a unit of work does with a pooled connection."""
+
+    def __init__(self, engine: "FakeEngine") -> None:
+        self.engine = engine
+        self.info = {}
+        self.events = []
+
+    async def begin(self):
+        self.events.append("begin")
+
+    async def commit(self):
+        self.events.append("commit")
+        if self.engine.fail_commit:
+            raise RuntimeError(f"{self.engine.name} commit failed")
+
+    async def rollback(self):
+        self.events.append("rollback")
+
+    async def close(self):
+        self.events.append("close")
+
+
+class FakeEngine:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.fail_commit = False
+        self.connections: list[FakeConnection] = []
+
+    async def connect(self) -> FakeConnection:
+        connection = FakeConnection(self)
+        self.connections.append(connection)
+        return connection
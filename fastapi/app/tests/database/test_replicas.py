@@ -0,0 +1,91 @@
+import pytest
+from loguru import logger
+from starlette.requests import Request
+
+from app.config import DB_CONFIGS
+from app.database import WROTE_KEY, DatabaseManager, UnitOfWork
+from app.tests.database.fakes import FakeEngine
+from app.users.utils import create_access_token, token_manager
+
+
+async def write(db: DatabaseManager, user_id: int):
+    async with UnitOfWork(db) as scope:
+        scope.user_id = user_id
+        async with db.begin() as connection:
+            connection.info[WROTE_KEY] = True
+
+
+async def read(db: DatabaseManager, user_id: int) -> FakeEngine:
+    async with UnitOfWork(db) as scope:
+        scope.user_id = user_id
+        async with db.begin(readonly=True) as connection:
+            return connection.engine
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_reads_go_to_replicas_in_turn(db: DatabaseManager):
+    db.replica_engines.append(FakeEngine("second replica"))
+
+    engines = [await read(db, user_id=1) for _ in range(3)]
+    assert engines == [*db.replica_engines, db.replica_engines[0]]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_reads_after_write_in_scope_use_primary(db: DatabaseManager):
+    async with UnitOfWork(db):
+        async with db.begin() as primary:
+            pass
+        async with db.begin(readonly=True) as connection:
+            assert connection is primary
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_read_your_writes_window(db: DatabaseManager):
+    await write(db, user_id=1)
+
+    assert await read(db, user_id=1) is db.engine
+    # Other users are not held back by the writer
+    assert await read(db, user_id=2) is db.replica_engines[0]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_read_your_writes_disabled(db: DatabaseManager, monkeypatch):
+    monkeypatch.setitem(DB_CONFIGS, "read_your_writes_window", 0)
+    await write(db, user_id=1)
+
+    assert await read(db, user_id=1) is db.replica_engines[0]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_token_attributes_unit_of_work(db: DatabaseManager):
+    token = create_access_token(data={"user_id": 42})
+    request = Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/",
+            "query_string": b"",
+            "headers": [(b"authorization", f"Bearer {token}".encode())],
+        }
+    )
+
+    async with UnitOfWork(db) as scope:
+        await token_manager.get_claims(request)
+        assert scope.user_id == 42
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_warn_on_process_local_recent_writes(monkeypatch):
+    monkeypatch.setitem(DB_CONFIGS, "replica_hosts", ["replica:5433"])
+    db = object.__new__(DatabaseManager)
+    DatabaseManager.__init__(db)
+
+    messages = []
+    sink = logger.add(messages.append, level="WARNING")
+    try:
+        await db.connect()
+        await db.disconnect()
+    finally:
+        logger.remove(sink)
+
+    assert any("STATE_CACHE_BACKEND" in message for message in messages)
@@ -0,0 +1,107 @@
+import pytest
+from fastapi import Depends, FastAPI, HTTPException
+from httpx import ASGITransport, AsyncClient
+from starlette.status import HTTP_200_OK, HTTP_404_NOT_FOUND
+
+from app.database import WROTE_KEY, DatabaseManager, UnitOfWork, unit_of_work
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_commit_on_clean_exit(db: DatabaseManager):
+    async with db.begin() as connection:
+        assert connection.engine is db.engine
+
+    assert connection.events == ["begin", "commit", "close"]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_rollback_on_error(db: DatabaseManager):
+    with pytest.raises(ValueError):
+        async with db.begin() as connection:
+            raise ValueError
+
+    assert connection.events == ["begin", "rollback", "close"]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_request_rollback_on_http_exception(db: DatabaseManager):
+    called = []
+    app = FastAPI(dependencies=[Depends(unit_of_work)])
+
+    @app.get("/found")
+    async def found():
+        async with db.begin():
+            await db.after_commit(lambda: called.append("found"))
+        return {}
+
+    @app.get("/missing")
+    async def missing():
+        async with db.begin():
+            await db.after_commit(lambda: called.append("missing"))
+        raise HTTPException(status_code=HTTP_404_NOT_FOUND)
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.get("/found")
+        assert response.status_code == HTTP_200_OK
+        response = await client.get("/missing")
+        assert response.status_code == HTTP_404_NOT_FOUND
+
+    committed, rolled_back = db.engine.connections
+    assert committed.events == ["begin", "commit", "close"]
+    assert rolled_back.events == ["begin", "rollback", "close"]
+    assert called == ["found"]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_after_commit_runs_after_the_commit(db: DatabaseManager):
+    seen = []
+    async with UnitOfWork(db):
+        async with db.begin() as connection:
+            await db.after_commit(lambda: seen.append(list(connection.events)))
+        assert seen == []
+
+    assert seen == [["begin", "commit", "close"]]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_release_then_new_statements(db: DatabaseManager):
+    called = []
+    with pytest.raises(ValueError):
+        async with UnitOfWork(db):
+            async with db.begin() as first:
+                await db.after_commit(lambda: called.append("released"))
+            await db.release()
+            # Committed work keeps its callbacks even if the scope fails
+            assert called == ["released"]
+
+            async with db.begin() as second:
+                await db.after_commit(lambda: called.append("rolled back"))
+            raise ValueError
+
+    assert second is not first
+    assert first.events == ["begin", "commit", "close"]
+    assert second.events == ["begin", "rollback", "close"]
+    assert called == ["released"]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_failed_commit_closes_every_connection(db: DatabaseManager):
+    called = []
+    db.engine.fail_commit = True
+    with pytest.raises(RuntimeError, match="primary commit failed"):
+        async with UnitOfWork(db) as scope:
+            scope.user_id = 1
+            async with db.begin(readonly=True) as replica:
+                pass
+            async with db.begin() as primary:
+                primary.info[WROTE_KEY] = True
+                await db.after_commit(lambda: called.append("committed"))
+
+    assert replica.engine is db.replica_engines[0]
+    assert primary.events == ["begin", "commit", "close"]
+    assert replica.events == ["begin", "rollback", "close"]
+    assert called == []
+    # Nothing was written, so reads need not stick to the primary
+    assert not await db.wrote_recently(1)
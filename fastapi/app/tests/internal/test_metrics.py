@@ -0,0 +1,59 @@
+import pytest
+from httpx import AsyncClient
+from loguru import logger
+from starlette.status import HTTP_200_OK, HTTP_403_FORBIDDEN
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_get_metrics(client: AsyncClient, tester_access_token: str):
+    response = await client.get("/api/v1/product")
+    assert response.status_code == HTTP_200_OK
+
+    response = await client.get(
+        "/api/v1/internal/metrics",
+        headers={"Authorization": f"Bearer {tester_access_token}"},
+    )
+    logger.debug(response.text)
+    assert response.status_code == HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/plain")
+    assert (
+        'http_requests_total{method="GET",route="/api/v1/product",'
+        'status="200"}' in response.text
+    )
+    assert (
+        'http_request_db_statements_count{method="GET",'
+        'route="/api/v1/product"}' in response.text
+    )
+    assert "db_pool_checked_out" in response.text
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_get_metrics_password_hashing(
+    client: AsyncClient, tester_access_token: str
+):
+    response = await client.get(
+        "/api/v1/internal/metrics",
+        headers={"Authorization": f"Bearer {tester_access_token}"},
+    )
+    logger.debug(response.text)
+    assert response.status_code == HTTP_200_OK
+    assert "password_hash_in_flight 0" in response.text
+    assert "password_hash_waiting 0" in response.text
+    # The tester logged in, which verified a password
+    completed = next(
+        line
+        for line in response.text.splitlines()
+        if line.startswith("password_hash_completed_total ")
+    )
+    assert int(completed.split()[1]) >= 1
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_get_metrics_not_allowed(
+    client: AsyncClient, customer_access_token: str
+):
+    response = await client.get(
+        "/api/v1/internal/metrics",
+        headers={"Authorization": f"Bearer {customer_access_token}"},
+    )
+    assert response.status_code == HTTP_403_FORBIDDEN
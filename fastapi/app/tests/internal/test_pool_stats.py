@@ -0,0 +1,31 @@
+import pytest
+from httpx import AsyncClient
+from loguru import logger
+from starlette.status import HTTP_200_OK, HTTP_403_FORBIDDEN
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_get_pool_stats(client: AsyncClient, tester_access_token: str):
+    response = await client.get(
+        "/api/v1/internal/pool-stats",
+        headers={"Authorization": f"Bearer {tester_access_token}"},
+    )
+    response_json = response.json()
+    logger.debug(response_json)
+    assert response.status_code == HTTP_200_OK
+    assert response_json["size"] > 0
+    assert response_json["wait"]["count"] > 0
+    assert response_json["wait"]["buckets"]["+Inf"] == (
+        response_json["wait"]["count"]
+    )
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_get_pool_stats_not_allowed(
+    client: AsyncClient, customer_access_token: str
+):
+    response = await client.get(
+        "/api/v1/internal/pool-stats",
+        headers={"Authorization": f"Bearer {customer_access_token}"},
+    )
+    assert response.status_code == HTTP_403_FORBIDDEN
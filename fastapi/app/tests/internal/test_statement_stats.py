@@ -0,0 +1,23 @@
+import pytest
+from httpx import AsyncClient
+from loguru import logger
+from starlette.status import HTTP_200_OK
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_get_statement_stats(
+    client: AsyncClient, tester_access_token: str
+):
+    headers = {"Authorization": f"Bearer {tester_access_token}"}
+    # The same listing twice compiles its SQL at most once
+    for _ in range(2):
+        await client.get("/api/v1/category/get-all", headers=headers)
+
+    response = await client.get(
+        "/api/v1/internal/statement-stats", headers=headers
+    )
+    response_json = response.json()
+    logger.debug(response_json)
+    assert response.status_code == HTTP_200_OK
+    assert response_json["hits"] > 0
+    assert response_json["compiled_cache_entries"] > 0
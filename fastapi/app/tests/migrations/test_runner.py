@@ -0,0 +1,101 @@
+import asyncio
+import importlib
+import sys
+
+import pytest
+from sqlalchemy import text
+
+from app.database import DatabaseManager
+from app.migrations import runner
+
+MIGRATION = "async def upgrade(connection):\n    pass\n"
+
+
+@pytest.fixture
+def versions(tmp_path, monkeypatch):
+    """Point the runner at an empty package of migration modules."""
+    package = tmp_path / "fake_versions"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(
+        runner, "versions", importlib.import_module("fake_versions")
+    )
+    yield package
+    for name in list(sys.modules):
+        if name.split(".")[0] == "fake_versions":
+            del sys.modules[name]
+
+
+def test_migrations_sorted_by_version(versions):
+    (versions / "v10_last.py").write_text(MIGRATION)
+    (versions / "v2_second.py").write_text(
+        MIGRATION + "\nTRANSACTIONAL = False\n"
+    )
+    (versions / "v0001_first.py").write_text(MIGRATION)
+    (versions / "helpers.py").write_text("")
+
+    migrations = runner.get_migrations()
+    assert [(m.version, m.name) for m in migrations] == [
+        (1, "first"),
+        (2, "second"),
+        (10, "last"),
+    ]
+    assert [m.transactional for m in migrations] == [True, False, True]
+
+
+def test_duplicate_migration_versions(versions):
+    (versions / "v1_first.py").write_text(MIGRATION)
+    (versions / "v0001_again.py").write_text(MIGRATION)
+
+    with pytest.raises(ValueError, match="Duplicate migration 1"):
+        runner.get_migrations()
+
+
+def test_shipped_migrations_have_unique_versions():
+    migrations = runner.get_migrations()
+    assert [m.version for m in migrations] == sorted(
+        {m.version for m in migrations}
+    )
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_upgrade_again_does_nothing(lifespanned_app):
+    # The database was migrated before the tests started
+    assert await runner.upgrade() == []
+    assert all(applied for _, applied in await runner.status())
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_upgrade_waits_for_the_lock(lifespanned_app):
+    lock = {"lock_id": runner.MIGRATION_LOCK_ID}
+    db_instance = DatabaseManager._instance
+    async with db_instance.engine.connect() as connection:
+        connection = await connection.execution_options(
+            isolation_level="AUTOCOMMIT"
+        )
+        await connection.execute(
+            text("SELECT pg_advisory_lock(:lock_id)"), lock
+        )
+        upgrade = asyncio.create_task(runner.upgrade())
+        try:
+            waiting = 0
+            for _ in range(100):
+                waiting = await connection.scalar(
+                    text(
+                        "SELECT count(*) FROM pg_locks "
+                        "WHERE locktype = 'advisory' AND NOT granted"
+                    )
+                )
+                if waiting:
+                    break
+                await asyncio.sleep(0.05)
+
+            assert waiting == 1
+            assert not upgrade.done()
+        finally:
+            await connection.execute(
+                text("SELECT pg_advisory_unlock(:lock_id)"), lock
+            )
+
+        assert await asyncio.wait_for(upgrade, timeout=10) == []
@@ -0,0 +1,70 @@
+import pytest
+from httpx import AsyncClient
+from loguru import logger
+from starlette.status import HTTP_200_OK, HTTP_304_NOT_MODIFIED
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_get_product_facets(
+    client: AsyncClient, product: dict, tester_access_token: str
+):
+    response = await client.get(
+        "/api/v1/product/facets",
+        params={"tags": product["tags"]},
+        headers={"Authorization": f"Bearer {tester_access_token}"},
+    )
+    response_json = response.json()
+    logger.debug(response_json)
+    assert response.status_code == HTTP_200_OK
+
+    assert response_json["total"] == 1
+    assert [c["id"] for c in response_json["categories"]] == [
+        product["category_id"]
+    ]
+    assert [s["id"] for s in response_json["sub_categories"]] == product[
+        "sub_category_ids"
+    ]
+    assert response_json["price_buckets"] == [
+        {"min_price": 50000.0, "max_price": None, "count": 1}
+    ]
+    assert response_json["tags"] == [
+        {"tag": product["tags"].lower(), "count": 1}
+    ]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_get_product_facets_without_matches(
+    client: AsyncClient, product: dict, tester_access_token: str
+):
+    response = await client.get(
+        "/api/v1/product/facets",
+        params={"tags": product["tags"], "min_price": 1, "max_price": 2},
+        headers={"Authorization": f"Bearer {tester_access_token}"},
+    )
+    response_json = response.json()
+    assert response.status_code == HTTP_200_OK
+
+    assert response_json["total"] == 0
+    assert response_json["categories"] == []
+    assert response_json["tags"] == []
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_get_product_facets_etag(
+    client: AsyncClient, product: dict, tester_access_token: str
+):
+    headers = {"Authorization": f"Bearer {tester_access_token}"}
+    params = {"tags": product["tags"]}
+    response = await client.get(
+        "/api/v1/product/facets", params=params, headers=headers
+    )
+    assert response.status_code == HTTP_200_OK
+    etag = response.headers["ETag"]
+
+    response = await client.get(
+        "/api/v1/product/facets",
+        params=params,
+        headers={**headers, "If-None-Match": etag},
+    )
+    assert response.status_code == HTTP_304_NOT_MODIFIED
+    assert response.headers["ETag"] == etag
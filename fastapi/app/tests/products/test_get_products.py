@@ -1,7 +1,19 @@
+from uuid import uuid4
+
 import pytest
 from httpx import AsyncClient
 from loguru import logger
-from starlette.status import HTTP_200_OK, HTTP_422_UNPROCESSABLE_ENTITY
+from sqlalchemy import update
+from starlette.status import (
+    HTTP_200_OK,
+    HTTP_201_CREATED,
+    HTTP_304_NOT_MODIFIED,
+    HTTP_422_UNPROCESSABLE_ENTITY,
+)
+
+from app.database import DatabaseManager
+from app.products.repository import ProductRepository
+from app.products.schema import Product
 
 
 @pytest.mark.asyncio(loop_scope="session")
@@ -73,6 +85,49 @@ async def test_get_products_with_pagination(
     assert response_json["total_pages"] >= 1
 
 
+@pytest.mark.asyncio(loop_scope="session")
+async def test_get_products_without_total(
+    client: AsyncClient, product: dict, tester_access_token: str
+):
+    headers = {"Authorization": f"Bearer {tester_access_token}"}
+    response = await client.get(
+        "/api/v1/product", params={"page_size": 1}, headers=headers
+    )
+    assert response.status_code == HTTP_200_OK
+    counted = response.json()
+
+    response = await client.get(
+        "/api/v1/product",
+        params={"page_size": 1, "with_total": False},
+        headers=headers,
+    )
+    assert response.status_code == HTTP_200_OK
+
+    response_json = response.json()
+    logger.debug(response_json)
+
+    assert response_json["total"] is None
+    assert response_json["total_pages"] is None
+    assert response_json["items"] == counted["items"]
+    assert response_json["has_next"] == counted["has_next"]
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_get_products_past_last_page(
+    client: AsyncClient, product: dict, tester_access_token: str
+):
+    response = await client.get(
+        "/api/v1/product",
+        params={"page": 10000, "page_size": 100},
+        headers={"Authorization": f"Bearer {tester_access_token}"},
+    )
+    assert response.status_code == HTTP_200_OK
+
+    response_json = response.json()
+    assert response_json["items"] == []
+    assert response_json["total"] > 0
+
+
 @pytest.mark.asyncio(loop_scope="session")
 async def test_get_products_with_search(
     client: AsyncClient, product: dict, tester_access_token: str
@@ -97,6 +152,98 @@ async def test_get_products_with_search(
         )
 
 
+@pytest.mark.asyncio(loop_scope="session")
+async def test_get_products_full_text_search(
+    client: AsyncClient, product: dict, tester_access_token: str
+):
+    headers = {"Authorization": f"Bearer {tester_access_token}"}
+    for field in ("name", "tags", "description"):
+        response = await client.get(
+            "/api/v1/product", params={"q": product[field]}, headers=headers
+        )
+        assert response.status_code == HTTP_200_OK
+
+        response_json = response.json()
+        logger.debug(response_json)
+        assert response_json["total"] >= 1
+        assert product["id"] in [item["id"] for item in response_json["items"]]
+
+    response = await client.get(
+        "/api/v1/product",
+        params={"q": f"{product['name']} -{product['name']}"},
+        headers=headers,
+    )
+    assert response.status_code == HTTP_200_OK
+    assert response.json()["total"] == 0
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_get_products_by_tags(
+    client: AsyncClient, product: dict, tester_access_token: str
+):
+    headers = {"Authorization": f"Bearer {tester_access_token}"}
+    tag = product["tags"].upper()
+    missing_tag = str(uuid4())
+
+    async def get_product_ids(params: dict) -> list[int]:
+        response = await client.get(
+            "/api/v1/product", params=params, headers=headers
+        )
+        assert response.status_code == HTTP_200_OK
+        return [item["id"] for item in response.json()["items"]]
+
+    assert product["id"] in await get_product_ids({"tags": f" {tag} "})
+    assert product["id"] in await get_product_ids(
+        {"tags": f"{tag},{missing_tag}", "tags_match": "any"}
+    )
+    assert product["id"] not in await get_product_ids(
+        {"tags": f"{tag},{missing_tag}", "tags_match": "all"}
+    )
+    # Tags match whole, not as substrings
+    assert product["id"] not in await get_product_ids({"tags": tag[:8]})
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_get_products_etag(
+    client: AsyncClient,
+    product: dict,
+    product_data: dict,
+    tester_access_token: str,
+):
+    headers = {"Authorization": f"Bearer {tester_access_token}"}
+    params = {"tags": product["tags"]}
+    response = await client.get(
+        "/api/v1/product", params=params, headers=headers
+    )
+    assert response.status_code == HTTP_200_OK
+    etag = response.headers["ETag"]
+
+    response = await client.get(
+        "/api/v1/product",
+        params=params,
+        headers={**headers, "If-None-Match": etag},
+    )
+    assert response.status_code == HTTP_304_NOT_MODIFIED
+    assert response.content == b""
+
+    # Writes invalidate the cached listing
+    response = await client.put(
+        f"/api/v1/product/update/{product['id']}",
+        json={**product_data, "stock": product_data["stock"] + 1},
+        headers=headers,
+    )
+    assert response.status_code == HTTP_200_OK
+
+    response = await client.get(
+        "/api/v1/product",
+        params=params,
+        headers={**headers, "If-None-Match": etag},
+    )
+    assert response.status_code == HTTP_200_OK
+    assert response.headers["ETag"] != etag
+    assert response.json()["items"][0]["stock"] == product_data["stock"] + 1
+
+
 @pytest.mark.asyncio(loop_scope="session")
 async def test_get_products_invalid_sort(
     client: AsyncClient, tester_access_token: str
@@ -122,3 +269,71 @@ async def test_get_products_invalid_pagination(
         headers={"Authorization": f"Bearer {tester_access_token}"},
     )
     assert response.status_code == HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_get_products_cursor_with_null_discounts(
+    client: AsyncClient,
+    sub_category: tuple,
+    product_data: dict,
+    tester_access_token: str,
+):
+    """Test following next_cursor by discount visits NULL discounts too"""
+    headers = {"Authorization": f"Bearer {tester_access_token}"}
+    category_id, subcategory_id = sub_category
+    tag = str(uuid4())
+    product_ids = []
+    for discount in (10, None, 5, None, 10):
+        response = await client.post(
+            "/api/v1/product/create",
+            json={
+                **product_data,
+                "name": str(uuid4()),
+                "slug": str(uuid4()),
+                "tags": tag,
+                "discount": discount or 0,
+                "category_id": category_id,
+                "sub_category_ids": [subcategory_id],
+            },
+            headers=headers,
+        )
+        assert response.status_code == HTTP_201_CREATED
+        product_ids.append(response.json()["id"])
+
+    null_ids = [product_ids[1], product_ids[3]]
+    async with DatabaseManager._instance.begin() as connection:
+        await connection.execute(
+            update(Product)
+            .where(Product.id.in_(null_ids))
+            .values(discount=None)
+        )
+
+    try:
+        repo = ProductRepository()
+        for sort_order in ("asc", "desc"):
+            filters = {
+                "tags": tag,
+                "sort_by": "discount",
+                "sort_order": sort_order,
+            }
+            page = await repo.get_products(filters, page_size=len(product_ids))
+            expected = [item["id"] for item in page.items]
+            assert sorted(expected) == sorted(product_ids)
+            # NULLs sort last in either direction
+            assert sorted(expected[-2:]) == sorted(null_ids)
+
+            seen, cursor = [], None
+            while True:
+                page = await repo.get_products(
+                    filters, page_size=1, cursor=cursor
+                )
+                seen.extend(item["id"] for item in page.items)
+                if not (cursor := page.next_cursor):
+                    break
+            assert seen == expected
+    finally:
+        for product_id in product_ids:
+            response = await client.delete(
+                f"/api/v1/product/{product_id}", headers=headers
+            )
+            assert response.status_code == HTTP_200_OK
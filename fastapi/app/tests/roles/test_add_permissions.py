@@ -7,6 +7,8 @@ from starlette.status import (
     HTTP_404_NOT_FOUND,
 )
 
+from app.roles.seeder import Seeder as RoleSeeder
+
 
 @pytest.mark.asyncio(loop_scope="session")
 async def test_add_permission_to_role(
@@ -141,3 +143,51 @@ async def test_clear_role_permissions(
     logger.debug(f"Clear permissions response: {response_json}")
     assert response.status_code == HTTP_200_OK
     assert not response_json["permissions"]  # Permissions should be empty
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_role_update_invalidates_cached_permissions(
+    client: AsyncClient, tester_access_token: str, seller_access_token: str
+):
+    tester_headers = {"Authorization": f"Bearer {tester_access_token}"}
+    seller_headers = {"Authorization": f"Bearer {seller_access_token}"}
+
+    response = await client.get(
+        "/api/v1/role?page_size=100", headers=tester_headers
+    )
+    assert response.status_code == HTTP_200_OK
+    seller_role = next(
+        r for r in response.json()["items"] if r["name"] == "seller"
+    )
+    original_permissions = [
+        association["permission"]
+        for association in RoleSeeder.ROLE_PERMISSION_ASSOCIATION
+        if association["role"] == "seller"
+    ]
+
+    # Warm the cache with the seller's current permissions
+    response = await client.get("/api/v1/permission", headers=seller_headers)
+    assert response.status_code == HTTP_403_FORBIDDEN
+
+    try:
+        response = await client.put(
+            f"/api/v1/role/update/{seller_role['id']}",
+            json={"permissions": original_permissions + ["read_permission"]},
+            headers=tester_headers,
+        )
+        assert response.status_code == HTTP_200_OK
+
+        response = await client.get(
+            "/api/v1/permission", headers=seller_headers
+        )
+        assert response.status_code == HTTP_200_OK
+    finally:
+        response = await client.put(
+            f"/api/v1/role/update/{seller_role['id']}",
+            json={"permissions": original_permissions},
+            headers=tester_headers,
+        )
+        assert response.status_code == HTTP_200_OK
+
+    response = await client.get("/api/v1/permission", headers=seller_headers)
+    assert response.status_code == HTTP_403_FORBIDDEN
@@ -203,3 +203,36 @@ async def test_get_all_roles_performance(
     )
     permission_time = time.time() - start_time
     assert permission_time < 1.5  # Response should be under 1.5 seconds
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_get_all_roles_cursor_pagination(
+    client: AsyncClient, role: dict, tester_access_token: str
+):
+    """Test following next_cursor visits every role exactly once"""
+    headers = {"Authorization": f"Bearer {tester_access_token}"}
+    response = await client.get(
+        "/api/v1/role", params={"page_size": 100}, headers=headers
+    )
+    assert response.status_code == HTTP_200_OK
+    expected_ids = [r["id"] for r in response.json()["items"]]
+
+    seen_ids = []
+    params = {"page_size": 1}
+    while True:
+        response = await client.get(
+            "/api/v1/role", params=params, headers=headers
+        )
+        assert response.status_code == HTTP_200_OK
+        response_json = response.json()
+        seen_ids.extend(r["id"] for r in response_json["items"])
+        if not response_json["has_next"]:
+            break
+        params["cursor"] = response_json["next_cursor"]
+
+    assert seen_ids == expected_ids
+
+    response = await client.get(
+        "/api/v1/role", params={"cursor": "not-a-cursor"}, headers=headers
+    )
+    assert response.status_code == HTTP_400_BAD_REQUEST
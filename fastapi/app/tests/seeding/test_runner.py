@@ -0,0 +1,98 @@
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import delete, func, select
+
+from app.database import DatabaseManager
+from app.permissions.models import PermissionCreateModel
+from app.permissions.schema import Permission
+from app.roles.schema import Role
+from app.seeding import runner
+from app.seeding.schema import SeedVersion
+from app.users.schema import User
+
+
+@pytest.fixture
+def seeder_runs(monkeypatch) -> list[str]:
+    """Record which seeders run, still running them."""
+    runs = []
+    for name, seeder in (
+        ("permissions", runner.PermissionSeeder),
+        ("roles", runner.RoleSeeder),
+        ("users", runner.UserSeeder),
+    ):
+        original = seeder().run
+
+        async def run(*_, name=name, original=original):
+            runs.append(name)
+            await original()
+
+        monkeypatch.setattr(seeder, "run", run)
+    return runs
+
+
+async def stored_checksum() -> str:
+    async with DatabaseManager._instance.begin() as connection:
+        return await connection.scalar(
+            select(SeedVersion.checksum).where(
+                SeedVersion.name == runner.SEED_NAME
+            )
+        )
+
+
+async def count(column, names) -> int:
+    async with DatabaseManager._instance.begin() as connection:
+        return await connection.scalar(
+            select(func.count())
+            .select_from(column.table)
+            .where(column.in_(names))
+        )
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_unchanged_seed_is_skipped(lifespanned_app, seeder_runs):
+    # The application seeded the database when it started
+    await runner.run_seeders()
+
+    assert seeder_runs == []
+    assert await stored_checksum() == runner.checksum()
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_changed_checksum_is_reapplied(
+    lifespanned_app, seeder_runs, monkeypatch
+):
+    permission = PermissionCreateModel(
+        name=str(uuid4()), description="Seeded by the tests"
+    )
+    seeded = runner.checksum()
+    monkeypatch.setattr(
+        runner.PermissionSeeder,
+        "VALUES",
+        [*runner.PermissionSeeder.VALUES, permission],
+    )
+    changed = runner.checksum()
+    assert changed != seeded
+
+    try:
+        await runner.run_seeders()
+
+        assert seeder_runs == ["permissions", "roles", "users"]
+        assert await stored_checksum() == changed
+        # The bulk inserts add what is missing and never duplicate rows
+        permissions = [value.name for value in runner.PermissionSeeder.VALUES]
+        roles = [value.name for value in runner.RoleSeeder.ROLE_VALUES]
+        users = [value.username for value in runner.UserSeeder.VALUES]
+        assert await count(Permission.name, permissions) == len(permissions)
+        assert await count(Role.name, roles) == len(roles)
+        assert await count(User.username, users) == len(users)
+    finally:
+        monkeypatch.undo()
+        async with DatabaseManager._instance.begin() as connection:
+            await connection.execute(
+                delete(Permission).where(Permission.name == permission.name)
+            )
+
+    # Seeding the original values again restores their checksum
+    await runner.run_seeders()
+    assert await stored_checksum() == seeded
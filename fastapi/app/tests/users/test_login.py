@@ -1,10 +1,17 @@
 from uuid import uuid4
 
+import jwt
 import pytest
 from httpx import AsyncClient
 from loguru import logger
-from starlette.status import HTTP_200_OK, HTTP_201_CREATED
+from starlette.status import (
+    HTTP_200_OK,
+    HTTP_201_CREATED,
+    HTTP_400_BAD_REQUEST,
+    HTTP_403_FORBIDDEN,
+)
 
+from app.config import HASHING_ALGORITHM, SECRET_KEY
 from app.users.models import UserRoles
 
 
@@ -37,3 +44,49 @@ async def test_user_login_token_cookie(client: AsyncClient, created_user):
     )
     assert login_response.status_code == HTTP_200_OK
     assert "access_token" in login_response.cookies
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_user_login_with_embedded_claims(
+    client: AsyncClient, created_user
+):
+    _, user_data = created_user
+    login_response = await client.post(
+        "/api/v1/users/login",
+        data={
+            "username": user_data["username"],
+            "password": user_data["password"],
+        },
+        params={"embed_claims": "true"},
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+    )
+    assert login_response.status_code == HTTP_200_OK
+    access_token = login_response.json()["access_token"]
+
+    claims = jwt.decode(
+        access_token, SECRET_KEY, algorithms=[HASHING_ALGORITHM]
+    )
+    assert {"role_id", "role_version", "permissions"} <= claims.keys()
+
+    response = await client.get(
+        "/api/v1/cart",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    assert response.status_code == HTTP_200_OK
+
+    response = await client.get(
+        "/api/v1/permission",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    assert response.status_code == HTTP_403_FORBIDDEN
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_user_login_wrong_password(client: AsyncClient, created_user):
+    _, user_data = created_user
+    login_response = await client.post(
+        "/api/v1/users/login",
+        data={"username": user_data["username"], "password": str(uuid4())},
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+    )
+    assert login_response.status_code == HTTP_400_BAD_REQUEST
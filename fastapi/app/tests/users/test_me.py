@@ -1,11 +1,17 @@
+from datetime import timedelta
 from uuid import uuid4
 
 import pytest
 from httpx import AsyncClient
 from loguru import logger
-from starlette.status import HTTP_200_OK, HTTP_201_CREATED
+from starlette.status import (
+    HTTP_200_OK,
+    HTTP_201_CREATED,
+    HTTP_401_UNAUTHORIZED,
+)
 
 from app.users.models import UserRoles
+from app.users.utils import create_access_token
 
 
 @pytest.mark.asyncio(loop_scope="session")
@@ -62,3 +68,20 @@ async def test_get_user_profile_by_access_token(
     assert user_profile["email"] == user_data["email"]
 
     client.cookies.clear()
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_get_user_profile_with_expired_token(
+    client: AsyncClient, created_user
+):
+    user, user_data = created_user
+    token = create_access_token(
+        data={"user_id": user["id"], "email": user_data["email"]},
+        expires_delta=timedelta(seconds=-1),
+    )
+
+    profile_response = await client.get(
+        "/api/v1/users/me",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert profile_response.status_code == HTTP_401_UNAUTHORIZED
@@ -0,0 +1,43 @@
+import time
+from datetime import timedelta
+
+import jwt
+import pytest
+
+from app.users.token import TokenDecoder
+from app.users.utils import create_access_token
+
+
+def test_decode_token_is_cached():
+    decoder = TokenDecoder(max_size=8, ttl=300)
+    token = create_access_token(data={"user_id": 1})
+
+    assert decoder.decode(token)["user_id"] == 1
+    assert decoder.decode(token)["user_id"] == 1
+    assert decoder.cache.hits == 1
+
+
+def test_decode_expired_token():
+    decoder = TokenDecoder(max_size=8, ttl=300)
+    token = create_access_token(
+        data={"user_id": 1}, expires_delta=timedelta(seconds=-1)
+    )
+
+    with pytest.raises(jwt.ExpiredSignatureError):
+        decoder.decode(token)
+    assert len(decoder.cache) == 0
+
+
+def test_decode_cached_token_after_expiry(monkeypatch):
+    decoder = TokenDecoder(max_size=8, ttl=300)
+    token = create_access_token(
+        data={"user_id": 1}, expires_delta=timedelta(seconds=60)
+    )
+    claims = decoder.decode(token)
+    assert len(decoder.cache) == 1
+
+    # The entry is still cached, but the token expired meanwhile
+    monkeypatch.setattr(time, "time", lambda: claims["exp"] + 1)
+    with pytest.raises(jwt.ExpiredSignatureError):
+        decoder.decode(token)
+    assert len(decoder.cache) == 0
@@ -0,0 +1,99 @@
+import asyncio
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+
+import bcrypt
+from loguru import logger
+
+from app.config import PASSWORD_HASHING_CONFIGS
+
+
+def _hash_password(password: str) -> str:
+    hash_bytes = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt())
+    return hash_bytes.decode("utf-8")
+
+
+def _verify_password(password: str, hash: str) -> bool:
+    return bcrypt.checkpw(password.encode("utf-8"), hash.encode("utf-8"))
+
+
+class PasswordHasher:
+    """Runs bcrypt in a bounded worker pool, off the event loop.
+
+    At most ``max_concurrency`` calls are handed to the pool at once; the
+    rest wait on a semaphore, which is what ``waiting`` reports.
+    """
+
+    EXECUTORS = {"thread": ThreadPoolExecutor, "process": ProcessPoolExecutor}
+
+    def __init__(
+        self,
+        executor: str = PASSWORD_HASHING_CONFIGS["executor"],
+        max_workers: int = PASSWORD_HASHING_CONFIGS["max_workers"],
+        max_concurrency: int = PASSWORD_HASHING_CONFIGS["max_concurrency"],
+    ) -> None:
+        if executor not in self.EXECUTORS:
+            raise ValueError(f"Unknown password hashing executor {executor}")
+
+        self.executor_type = executor
+        self.max_workers = max_workers
+        self.max_concurrency = max_concurrency or max_workers
+        self.waiting = 0
+        self.in_flight = 0
+        self.completed = 0
+        self._executor: Executor | None = None
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            executor_class = self.EXECUTORS[self.executor_type]
+            self._executor = executor_class(max_workers=self.max_workers)
+        return self._executor
+
+    async def _run(self, func, *args):
+        self.waiting += 1
+        if self._semaphore.locked():
+            logger.debug(f"Password hashing queue depth: {self.waiting}")
+
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._get_executor(), func, *args
+            )
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self._semaphore.release()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash_password, password)
+
+    async def verify(self, password: str, hash: str) -> bool:
+        return await self._run(_verify_password, password, hash)
+
+    def stats(self) -> dict:
+        return {
+            "executor": self.executor_type,
+            "max_workers": self.max_workers,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "completed": self.completed,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher()
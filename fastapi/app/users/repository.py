@@ -2,7 +2,7 @@ from datetime import datetime, timezone
 
 from fastapi.security import OAuth2PasswordRequestForm
 from loguru import logger
-from sqlalchemy import insert, select, update
+from sqlalchemy import bindparam, insert, select, update
 from sqlalchemy.exc import IntegrityError
 
 from app.database import DatabaseManager
@@ -11,34 +11,47 @@ from app.roles.schema import Role
 from app.users.schema import User
 from app.users.utils import hash_password, verify_password
 
+_USER_BY_ID_QUERY = select(User).where(User.id == bindparam("user_id"))
+_USER_BY_USERNAME_QUERY = select(User).where(
+    User.username == bindparam("username")
+)
+_ROLE_ID_BY_NAME_QUERY = select(Role.id).where(Role.name == bindparam("name"))
+_TOUCH_USER_QUERY = (
+    update(User)
+    .where(User.id == bindparam("user_id"))
+    .values(last_active=bindparam("last_active"))
+)
+
 
 class UserRepository:
     def __init__(self):
         self.db = DatabaseManager._instance
 
     async def create(self, user: User):
-        async with self.db.engine.begin() as connection:
+        # Hash before checking out a connection, bcrypt is slow on purpose
+        hashed_password = await hash_password(user.password)
+        async with self.db.begin() as connection:
             try:
-                q = select(Role).where(Role.name == user.role.value)
-                if not (role := (await connection.execute(q)).fetchone()):
+                role_id = await connection.scalar(
+                    _ROLE_ID_BY_NAME_QUERY, {"name": user.role.value}
+                )
+                if role_id is None:
                     raise EntityNotFoundError(entity="Role")
 
-                role_id = role[0]
                 await connection.execute(
                     insert(User).values(
                         email=user.email,
                         username=user.username,
-                        password=hash_password(user.password),
+                        password=hashed_password,
                         full_name=user.full_name,
                         role_id=role_id,
                         phone=user.phone,
                     ),
                 )
                 result = await connection.execute(
-                    select(User).where(User.username == user.username),
+                    _USER_BY_USERNAME_QUERY, {"username": user.username}
                 )
                 user = result.fetchone()
-                await connection.commit()
 
                 logger.info(f"User {user[0]} created successfully")
                 return user
@@ -50,7 +63,7 @@ class UserRepository:
                 raise e
 
     async def update(self, user: User):
-        async with self.db.engine.begin() as connection:
+        async with self.db.begin() as connection:
             stmt = (
                 select(User)
                 .where(User.id == id)
@@ -62,40 +75,41 @@ class UserRepository:
                 )
             )
             await connection.execute(stmt)
-            await connection.commit()
             logger.info(f"User {user.username} updated successfully")
 
     async def update_last_active(self, user_id: int):
-        async with self.db.engine.begin() as connection:
+        async with self.db.begin() as connection:
             await connection.execute(
-                update(User)
-                .where(User.id == user_id)
-                .values(last_active=datetime.now(timezone.utc)),
+                _TOUCH_USER_QUERY,
+                {
+                    "user_id": user_id,
+                    "last_active": datetime.now(timezone.utc),
+                },
             )
-            await connection.commit()
             logger.info(f"User {user_id} updated successfully")
 
     async def get_by_id(self, user_id: int):
-        async with self.db.engine.begin() as connection:
+        async with self.db.begin() as connection:
             result = await connection.execute(
-                select(User).where(User.id == user_id),
+                _USER_BY_ID_QUERY, {"user_id": user_id}
             )
             return result.fetchone()
 
     async def login(self, user: OAuth2PasswordRequestForm) -> dict:
-        async with self.db.engine.begin() as connection:
-            stmt = select(User).where(User.username == user.username)
-            result = await connection.execute(stmt)
+        async with self.db.begin() as connection:
+            result = await connection.execute(
+                _USER_BY_USERNAME_QUERY, {"username": user.username}
+            )
 
             if not (_user := result.fetchone()):
                 logger.error(f"User {user.username} not found")
                 return
 
-            if verify_password(user.password, _user.password):
-                await connection.commit()
-                logger.info(f"User {_user.username} logged in successfully")
-                return _user
+        # Verify after handing the connection back to the pool
+        await self.db.release()
+        if await verify_password(user.password, _user.password):
+            logger.info(f"User {_user.username} logged in successfully")
+            return _user
 
-            await connection.rollback()
-            logger.error("Incorrect combination of email and password")
-            return _user._asdict()
+        logger.error("Incorrect combination of email and password")
+        return
@@ -20,6 +20,7 @@ from starlette.status import (
 )
 
 from app.exceptions import EntityIntegrityError
+from app.permissions.utils import create_permission_claims
 from app.users.models import (
     UserCreate,
     UserLoginLogoutResponse,
@@ -67,7 +68,9 @@ async def create_user(user: UserCreate):
 
 @router.post("/login", response_model=UserLoginLogoutResponse)
 async def login_user(
-    request: OAuth2PasswordRequestForm = Depends(), set_cookie: bool = False
+    request: OAuth2PasswordRequestForm = Depends(),
+    set_cookie: bool = False,
+    embed_claims: bool = False,
 ):
     try:
         user_repo = UserRepository()
@@ -78,6 +81,10 @@ async def login_user(
             )
 
         encode_payload = {"user_id": user.id, "email": user.email}
+        if embed_claims:
+            # Lets guarded endpoints authorize without querying the user
+            encode_payload.update(await create_permission_claims(user.role_id))
+
         token = create_access_token(
             data=encode_payload, expires_delta=timedelta(hours=1)
         )
@@ -2,7 +2,15 @@ from __future__ import annotations
 
 from datetime import datetime, timezone
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+)
 from sqlalchemy.orm import relationship
 
 from app.config import Base
@@ -10,6 +18,10 @@ from app.config import Base
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Deleting or checking a role looks up the users which have it
+        Index("ix_users_role_id", "role_id"),
+    )
 
     id: int = Column(Integer, primary_key=True, autoincrement=True)
     username: str = Column(String(255), unique=True, nullable=False)
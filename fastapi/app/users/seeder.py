@@ -1,9 +1,14 @@
+import asyncio
+
 from loguru import logger
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
-from app.exceptions import EntityIntegrityError
+from app.database import DatabaseManager
+from app.roles.schema import Role
 from app.users.models import UserCreate
-from app.users.repository import UserRepository
 from app.users.schema import User
+from app.users.utils import hash_password
 
 
 class Seeder(object):
@@ -45,13 +50,48 @@ class Seeder(object):
 
     @staticmethod
     async def run():
-        repo = UserRepository()
-        for value in Seeder.VALUES:
-            try:
-                await repo.create(value)
-            except EntityIntegrityError:
-                pass
-            except Exception as e:
-                logger.error(f"Error seeding user: {e=}")
+        """Insert the missing users, hashing only their passwords."""
+        db_instance = DatabaseManager._instance
+        async with db_instance.begin() as connection:
+            result = await connection.execute(
+                select(User.username).where(
+                    User.username.in_(
+                        [value.username for value in Seeder.VALUES]
+                    )
+                )
+            )
+            existing = set(result.scalars())
+            missing = [
+                value
+                for value in Seeder.VALUES
+                if value.username not in existing
+            ]
+            if not missing:
+                logger.info("Seeding users completed, 0 new")
+                return
+
+            result = await connection.execute(select(Role.name, Role.id))
+            role_ids = {row.name: row.id for row in result}
+            passwords = await asyncio.gather(
+                *(hash_password(value.password) for value in missing)
+            )
+            q = (
+                pg_insert(User)
+                .values(
+                    [
+                        {
+                            "username": value.username,
+                            "password": password,
+                            "email": value.email,
+                            "full_name": value.full_name,
+                            "phone": value.phone,
+                            "role_id": role_ids[value.role.value],
+                        }
+                        for value, password in zip(missing, passwords)
+                    ]
+                )
+                .on_conflict_do_nothing()
+            )
+            result = await connection.execute(q)
 
-        logger.info("Seeding users completed")
+        logger.info(f"Seeding users completed, {result.rowcount} new")
@@ -1,3 +1,4 @@
+import time
 from abc import ABC, abstractmethod
 from typing import List, Optional
 
@@ -9,18 +10,64 @@ from fastapi.security.base import SecurityBase
 from loguru import logger
 from starlette.status import HTTP_401_UNAUTHORIZED
 
-from app.config import HASHING_ALGORITHM, SECRET_KEY
+from app.cache import TTLCache
+from app.config import HASHING_ALGORITHM, SECRET_KEY, TOKEN_CACHE_CONFIGS
+from app.database import DatabaseManager
+
+
+class TokenDecoder:
+    """Decodes access tokens, remembering the claims of valid ones.
+
+    A cached token is dropped no later than its ``exp`` claim, after
+    which it is decoded again and rejected as expired.
+    """
+
+    def __init__(
+        self,
+        max_size: int = TOKEN_CACHE_CONFIGS["max_size"],
+        ttl: float = TOKEN_CACHE_CONFIGS["ttl"],
+    ) -> None:
+        self.cache = TTLCache(max_size=max_size, ttl=ttl)
+
+    def decode(self, token: str) -> dict:
+        if (claims := self.cache.get(token)) is not None:
+            # The entry should expire with the token, but a cache hit
+            # must never outlive exp, whatever the clocks did meanwhile
+            expires_at = claims.get("exp")
+            if expires_at is not None and expires_at <= time.time():
+                self.cache.delete(token)
+                raise jwt.ExpiredSignatureError("Signature has expired")
+            return dict(claims)
+
+        claims = jwt.decode(token, SECRET_KEY, algorithms=[HASHING_ALGORITHM])
+        ttl = self.cache.ttl
+        if (expires_at := claims.get("exp")) is not None:
+            ttl = min(ttl, expires_at - time.time())
+
+        self.cache.set(token, claims, ttl=ttl)
+        return dict(claims)
+
+
+token_decoder = TokenDecoder()
 
 
 class TokenExtractorStrategy(ABC):
+    def __init__(self, decoder: TokenDecoder = token_decoder):
+        self.decoder = decoder
+
     @abstractmethod
     async def extract_token(self, request: Request) -> Optional[str]:
         pass
 
     @abstractmethod
-    async def get_user_id(self, token: str) -> Optional[int]:
+    async def get_claims(self, token: str) -> Optional[dict]:
         pass
 
+    async def get_user_id(self, token: str) -> Optional[int]:
+        if claims := await self.get_claims(token):
+            return claims.get("user_id")
+        return None
+
 
 class CookieTokenExtractor(TokenExtractorStrategy):
     async def extract_token(self, request: Request) -> Optional[str]:
@@ -33,12 +80,9 @@ class CookieTokenExtractor(TokenExtractorStrategy):
             logger.error(f"Error extracting token from cookie: {e}")
             return None
 
-    async def get_user_id(self, token: str) -> Optional[int]:
+    async def get_claims(self, token: str) -> Optional[dict]:
         try:
-            payload = jwt.decode(
-                token, SECRET_KEY, algorithms=[HASHING_ALGORITHM]
-            )
-            return payload.get("user_id")
+            return self.decoder.decode(token)
         except jwt.ExpiredSignatureError:
             raise HTTPException(
                 status_code=HTTP_401_UNAUTHORIZED, detail="Token has expired"
@@ -48,7 +92,7 @@ class CookieTokenExtractor(TokenExtractorStrategy):
                 status_code=HTTP_401_UNAUTHORIZED, detail="Invalid token"
             )
         except Exception as e:
-            logger.error(f"Error getting user id from token: {e}")
+            logger.error(f"Error getting claims from token: {e}")
             raise HTTPException(
                 status_code=HTTP_401_UNAUTHORIZED,
                 detail="Authentication failed",
@@ -56,7 +100,8 @@ class CookieTokenExtractor(TokenExtractorStrategy):
 
 
 class OAuth2TokenExtractor(TokenExtractorStrategy):
-    def __init__(self):
+    def __init__(self, decoder: TokenDecoder = token_decoder):
+        super().__init__(decoder)
         self.oauth2_scheme = OAuth2PasswordBearer(
             tokenUrl="/api/v1/users/login"
         )
@@ -71,12 +116,9 @@ class OAuth2TokenExtractor(TokenExtractorStrategy):
             logger.error(f"Error extracting OAuth2 token: {e}")
             return None
 
-    async def get_user_id(self, token: str) -> Optional[int]:
+    async def get_claims(self, token: str) -> Optional[dict]:
         try:
-            payload = jwt.decode(
-                token, SECRET_KEY, algorithms=[HASHING_ALGORITHM]
-            )
-            return payload.get("user_id")
+            return self.decoder.decode(token)
         except jwt.ExpiredSignatureError as e:
             logger.error(f"Token expired: {e}")
             return None
@@ -84,7 +126,7 @@ class OAuth2TokenExtractor(TokenExtractorStrategy):
             logger.error(f"Invalid token: {e}")
             return None
         except Exception as e:
-            logger.error(f"Error getting user id from token: {e}")
+            logger.error(f"Error getting claims from token: {e}")
             return None
 
 
@@ -92,13 +134,27 @@ class TokenManager:
     def __init__(self, strategies: list[TokenExtractorStrategy]):
         self.strategies = strategies
 
-    async def get_user_id(self, request: Request) -> Optional[int]:
+    async def get_claims(self, request: Request) -> dict:
+        # Dependencies of the same request share the decoded claims
+        claims = getattr(request.state, "token_claims", None)
+        if claims is not None:
+            return claims
+
         for strategy in self.strategies:
             if token := await strategy.extract_token(request):
-                if user_id := await strategy.get_user_id(token):
-                    return user_id
+                claims = await strategy.get_claims(token)
+                if claims and claims.get("user_id"):
+                    request.state.token_claims = claims
+                    # Route the user's reads to the primary right after
+                    # their writes
+                    DatabaseManager.set_user(claims["user_id"])
+                    return claims
 
         logger.debug("No token found")
         raise HTTPException(
             status_code=HTTP_401_UNAUTHORIZED, detail="Not authenticated"
         )
+
+    async def get_user_id(self, request: Request) -> Optional[int]:
+        claims = await self.get_claims(request)
+        return claims["user_id"]
@@ -1,6 +1,5 @@
 from datetime import datetime, timedelta, timezone
 
-import bcrypt
 import jwt
 from fastapi import Depends, HTTPException, Request
 from fastapi.security import OAuth2PasswordBearer
@@ -13,6 +12,7 @@ from app.users.auth import (
     CookieAuthStrategy,
     OAuth2AuthStrategy,
 )
+from app.users.hashing import password_hasher
 from app.users.token import (
     CookieTokenExtractor,
     OAuth2TokenExtractor,
@@ -26,13 +26,12 @@ auth_context = AuthenticationContext([cookie_strategy, oauth2_strategy])
 token_manager = TokenManager([CookieTokenExtractor(), OAuth2TokenExtractor()])
 
 
-def hash_password(password):
-    hash_bytes = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt())
-    return hash_bytes.decode("utf-8")
+async def hash_password(password: str) -> str:
+    return await password_hasher.hash(password)
 
 
-def verify_password(password: str, hash: str):
-    return bcrypt.checkpw(password.encode("utf-8"), hash.encode("utf-8"))
+async def verify_password(password: str, hash: str) -> bool:
+    return await password_hasher.verify(password, hash)
 
 
 def create_access_token(*, data: dict, expires_delta: timedelta = None):
@@ -51,3 +50,7 @@ async def token_exists(request: Request) -> bool:
 
 async def get_current_user_id(request: Request) -> int:
     return await token_manager.get_user_id(request)
+
+
+async def get_current_token_claims(request: Request) -> dict:
+    return await token_manager.get_claims(request)
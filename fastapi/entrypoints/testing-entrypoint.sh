@@ -14,6 +14,13 @@ source venv/bin/activate
 echo "> Done"
 echo "..."
 
+echo "> ============================="
+echo "> Applying Database Migrations"
+echo "> ============================="
+python -m app.migrations upgrade || exit 1
+echo "> Done"
+echo "..."
+
 echo "> ============================="
 echo "> Change owner for shared folder"
 echo "> ============================="